@@ -0,0 +1,85 @@
+"""
+Compare the throughput of compressed searched files with the plain file.
+
+The searched file is compressed with every available codec into a
+temporary directory, then a single word is counted in each version with
+the line and mmap engines. Throughput is given in MiB of uncompressed
+text per second. By default the bundled Pan Tadeusz text, repeated to
+reach a few dozen MiB, is used.
+
+**Usage:**
+
+```bash
+python -m benchmarks.compressed [--repeat N] [SEARCHED_FILE]
+```
+"""
+
+from typing import Callable, Dict
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+
+import click
+
+from benchmarks.engines import CORPUS, best_of
+from ptwordfinder.commands.mmap_engine import count_word_mmap
+from ptwordfinder.commands.pt_word_finder import count_word_in_file
+
+CODECS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+try:
+    import zstandard
+
+    CODECS["zstd"] = zstandard.ZstdCompressor().compress
+except ImportError:
+    pass
+
+
+@click.command()
+@click.argument("searched_file", type=click.Path(exists=True), required=False)
+@click.option("--repeat", "-r", default=3, show_default=True)
+def main(searched_file: str, repeat: int) -> None:
+    """Time counting a word in the plain and compressed versions of a file."""
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "plain.txt")
+        if searched_file:
+            shutil.copyfile(searched_file, plain)
+        else:
+            with open(CORPUS, "rb") as file:
+                data = file.read()
+            with open(plain, "wb") as file:
+                file.write(data * 64)
+
+        with open(plain, "rb") as file:
+            data = file.read()
+        size = len(data) / 2**20
+        versions = {"plain": plain}
+        for codec, compress in CODECS.items():
+            versions[codec] = os.path.join(directory, f"text.{codec}")
+            with open(versions[codec], "wb") as file:
+                file.write(compress(data))
+
+        click.echo(f"{size:.1f} MiB of text, best of {repeat}")
+        click.echo(f"{'codec':<6} {'size':>9} {'lines':>10} {'mmap':>10}")
+        expected = count_word_in_file("Tadeusz", plain)
+        for codec, path in versions.items():
+            assert count_word_in_file("Tadeusz", path) == expected
+            assert count_word_mmap("Tadeusz", path) == expected
+            lines = best_of(repeat, count_word_in_file, "Tadeusz", path)
+            mapped = best_of(repeat, count_word_mmap, "Tadeusz", path)
+            click.echo(
+                f"{codec:<6} {os.path.getsize(path) / 2**20:>5.1f} MiB "
+                f"{size / lines:>6.0f}MiB/s {size / mapped:>6.0f}MiB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
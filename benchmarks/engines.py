@@ -0,0 +1,88 @@
+"""
+Compare the line and mmap counting engines.
+
+Every counting mode is timed with both engines on the same file and the
+best of several runs is reported. By default the bundled Pan Tadeusz text
+is used.
+
+**Usage:**
+
+```bash
+python -m benchmarks.engines [--repeat N] [SEARCHED_FILE]
+```
+"""
+
+from functools import partial
+from typing import Callable, List, Tuple
+
+import os
+import time
+
+import click
+
+from ptwordfinder.commands.mmap_engine import (
+    count_each_word_mmap,
+    count_pattern_mmap,
+    count_word_mmap,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_pattern_in_file,
+    count_word_in_file,
+)
+
+CORPUS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "pan-tadeusz-czyli-ostatni-zajazd-na-litwie.txt",
+)
+
+WORDS = ["Pan", "Tadeusz", "Sędzia", "Hrabia", "Telimena", "i", "w", "się"]
+
+CASES: List[Tuple[str, object, Callable, Callable]] = [
+    ("single word", "Tadeusz", count_word_in_file, count_word_mmap),
+    (
+        "whole word",
+        "pan",
+        partial(count_word_in_file, match="whole"),
+        partial(count_word_mmap, match="whole"),
+    ),
+    ("pattern", "ie, ", count_pattern_in_file, count_pattern_mmap),
+    ("word list", WORDS, count_each_word_in_file, count_each_word_mmap),
+]
+
+
+def best_of(repeat: int, function: Callable, *args) -> float:
+    """Return the fastest of `repeat` runs of a function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@click.command()
+@click.argument(
+    "searched_file", type=click.Path(exists=True), default=CORPUS
+)
+@click.option("--repeat", "-r", default=5, show_default=True)
+def main(searched_file: str, repeat: int) -> None:
+    """Time every counting mode with the line and mmap engines."""
+    size = os.path.getsize(searched_file)
+    click.echo(f"{searched_file} ({size / 2**20:.1f} MiB), best of {repeat}")
+    click.echo(f"{'mode':<12} {'lines':>10} {'mmap':>10} {'speedup':>8}")
+    for name, query, line_function, mmap_function in CASES:
+        assert line_function(query, searched_file) == mmap_function(
+            query, searched_file
+        )
+        lines = best_of(repeat, line_function, query, searched_file)
+        mapped = best_of(repeat, mmap_function, query, searched_file)
+        click.echo(
+            f"{name:<12} {lines * 1000:>8.2f}ms {mapped * 1000:>8.2f}ms "
+            f"{lines / mapped:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Peak memory of the counting modes on a large corpus.
+
+Every case runs `ptwordf` in a fresh process, on a synthetic corpus of the
+requested size (see `benchmarks.suite`), and reports its wall time and
+peak resident set size. Indexes are stored in a temporary cache directory.
+
+**Usage:**
+
+```bash
+python -m benchmarks.memory --size 1G
+```
+"""
+
+from typing import List, Tuple
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+from benchmarks.suite import WORDS, parse_size, synthetic_corpus
+
+CASES: List[Tuple[str, List[str]]] = [
+    ("single_word", ["calculate-words", "-w", "Tadeusz"]),
+    ("words_input_file", ["calculate-words", "-i", "{words}"]),
+    ("per_word", ["calculate-words", "-i", "{words}", "--per-word"]),
+    ("index_build", ["index", "build"]),
+]
+
+
+def peak_rss(arguments: List[str], env: dict) -> Tuple[float, float]:
+    """Run `ptwordf` in a child process.
+
+    Returns:
+        tuple: The wall time in seconds and the peak RSS of the child in
+               MiB. `ru_maxrss` is in KiB on Linux.
+    """
+    # The child reports its own peak, a fresh interpreter per case
+    code = (
+        "import resource, sys\n"
+        "from ptwordfinder.main import cli\n"
+        "try:\n"
+        "    cli()\n"
+        "finally:\n"
+        "    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "    print(peak, file=sys.stderr)\n"
+    )
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", code, *arguments],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        check=True,
+    )
+    duration = time.perf_counter() - start
+    return duration, int(process.stderr.split()[-1]) / 1024
+
+
+@click.command()
+@click.option("--size", default="1G", show_default=True)
+def main(size: str) -> None:
+    """Report the wall time and peak RSS of every counting mode."""
+    corpus = synthetic_corpus(parse_size(size))
+    with tempfile.TemporaryDirectory() as cache:
+        words = os.path.join(cache, "words.txt")
+        with open(words, "w", encoding="utf8") as file:
+            file.write("\n".join(sorted(WORDS)))
+        env = dict(os.environ, PTWORDFINDER_CACHE_DIR=cache)
+        for name, arguments in CASES:
+            arguments = [arg.format(words=words) for arg in arguments]
+            duration, peak = peak_rss(arguments + ["-s", corpus], env)
+            click.echo(f"{name:<20} {duration:>8.1f}s {peak:>8.0f}MiB")
+
+
+if __name__ == "__main__":
+    main()
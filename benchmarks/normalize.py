@@ -0,0 +1,98 @@
+"""
+Measure the overhead of `--ignore-case` and `--fold-diacritics`.
+
+Every counting mode is timed on the exact path, then with case folding,
+diacritic folding and both, and the best of several runs is reported with
+the overhead over the exact path. By default the bundled Pan Tadeusz text
+is used. Indexes are stored in a temporary cache directory, so every case
+scans the file.
+
+**Usage:**
+
+```bash
+python -m benchmarks.normalize [--repeat N] [SEARCHED_FILE]
+```
+"""
+
+from functools import partial
+from typing import Callable, List, Tuple
+
+import os
+import tempfile
+
+import click
+
+from benchmarks.engines import CORPUS, WORDS, best_of
+from ptwordfinder.commands.normalize import (
+    count_normalized_in_file,
+    make_normalizer,
+    normalize_pattern,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_each_word_in_lines,
+    count_pattern_in_file,
+    count_pattern_in_lines,
+    count_regex_in_file,
+    count_regex_in_lines,
+    count_word_in_file,
+    count_word_in_lines,
+)
+
+CASES: List[Tuple[str, object, Callable, Callable]] = [
+    ("single word", "Tadeusz", count_word_in_file, count_word_in_lines),
+    ("pattern", "ie, ", count_pattern_in_file, count_pattern_in_lines),
+    ("regex", r"\w+ie\b", count_regex_in_file, count_regex_in_lines),
+    ("word list", WORDS, count_each_word_in_file, count_each_word_in_lines),
+]
+# --ignore-case, --fold-diacritics
+OPTIONS = [(True, False), (False, True), (True, True)]
+
+
+def normalized_query(query, lines_function: Callable, options):
+    """Normalize a query the way `calculate_words` does."""
+    if lines_function is count_regex_in_lines:
+        return normalize_pattern(query, *options)
+    normalize = make_normalizer(*options)
+    if isinstance(query, str):
+        return normalize(query)
+    return [normalize(word) for word in query]
+
+
+@click.command()
+@click.argument(
+    "searched_file", type=click.Path(exists=True), default=CORPUS
+)
+@click.option("--repeat", "-r", default=5, show_default=True)
+def main(searched_file: str, repeat: int) -> None:
+    """Time every counting mode exactly and with normalization."""
+    size = os.path.getsize(searched_file)
+    click.echo(f"{searched_file} ({size / 2**20:.1f} MiB), best of {repeat}")
+    click.echo(
+        f"{'mode':<12} {'exact':>10} {'case':>16} {'diacritics':>16} "
+        f"{'both':>16}"
+    )
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["PTWORDFINDER_CACHE_DIR"] = cache
+        for name, query, file_function, lines_function in CASES:
+            exact = best_of(repeat, file_function, query, searched_file)
+            line = f"{name:<12} {exact * 1000:>8.2f}ms"
+            for options in OPTIONS:
+                function = partial(
+                    count_normalized_in_file,
+                    lines_function,
+                    make_normalizer(*options),
+                )
+                normalized = best_of(
+                    repeat,
+                    function,
+                    normalized_query(query, lines_function, options),
+                    searched_file,
+                )
+                overhead = normalized / exact - 1
+                line += f" {normalized * 1000:>8.2f}ms {overhead:>+6.0%}"
+            click.echo(line)
+
+
+if __name__ == "__main__":
+    main()
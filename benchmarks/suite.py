@@ -0,0 +1,228 @@
+"""
+Benchmark suite of the counting modes, with regression tracking.
+
+Every counting mode is timed on the bundled Pan Tadeusz text and on
+synthetic corpora of the requested sizes. Synthetic corpora are drawn
+from the vocabulary of Pan Tadeusz with a fixed seed, so the same size
+always gives the same text, and are kept in `benchmarks/.corpora`.
+
+Results are written as JSON. When a baseline is given, the run fails if
+any case is slower than the baseline by more than the threshold. Indexes
+are stored in a temporary cache directory during the run, so every case
+scans the file.
+
+**Usage:**
+
+```bash
+python -m benchmarks.suite --save-baseline
+python -m benchmarks.suite --sizes 10M,100M --threshold 0.2
+```
+"""
+
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import click
+
+from benchmarks.engines import CORPUS
+from ptwordfinder.commands.matches import iter_matches, word_spans
+from ptwordfinder.commands.pt_word_finder import (
+    count_multiple_words_in_file,
+    count_pattern_in_file,
+    count_word_in_file,
+    non_blank_lines,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPORA_DIR = os.path.join(HERE, ".corpora")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(HERE, "results.json")
+UNITS = {"K": 2**10, "M": 2**20, "G": 2**30}
+WORDS = {"Pan", "Tadeusz", "Sędzia", "Hrabia", "Telimena", "i", "w", "się"}
+
+
+def count_non_blank_lines(_, searched_file: str) -> int:
+    """Consume `non_blank_lines` over a file and count its tokens."""
+    with open(searched_file, "r", encoding="utf8") as file:
+        return sum(len(tokens) for tokens in non_blank_lines(file))
+
+
+def count_listed_matches(word: str, searched_file: str) -> int:
+    """Consume the hits of `--show-matches` of a word and count them."""
+    return sum(1 for _ in iter_matches(word_spans, word, [searched_file]))
+
+
+CASES: List[Tuple[str, object, Callable]] = [
+    ("count_word_in_file", "Tadeusz", count_word_in_file),
+    (
+        "count_word_in_file[whole]",
+        "Tadeusz",
+        partial(count_word_in_file, match="whole"),
+    ),
+    ("iter_matches[word]", "Tadeusz", count_listed_matches),
+    ("count_pattern_in_file", "ie, ", count_pattern_in_file),
+    ("count_multiple_words_in_file", WORDS, count_multiple_words_in_file),
+    ("non_blank_lines", None, count_non_blank_lines),
+]
+
+
+def parse_size(size: str) -> int:
+    """Convert a size such as `10M` or `1G` into bytes."""
+    unit = UNITS.get(size[-1:].upper())
+    if unit is None:
+        return int(size)
+    return int(float(size[:-1]) * unit)
+
+
+def synthetic_corpus(size: int) -> str:
+    """Return the path of a synthetic corpus of about `size` bytes.
+
+    The corpus is generated on first use from the lines of Pan Tadeusz,
+    shuffled with a fixed seed, and reused afterwards.
+    """
+    path = os.path.join(CORPORA_DIR, f"synthetic-{size}.txt")
+    if os.path.exists(path):
+        return path
+
+    with open(CORPUS, "r", encoding="utf8") as file:
+        lines = [line for line in file if line.strip()]
+    shuffle = random.Random(size).shuffle
+    os.makedirs(CORPORA_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf8") as file:
+        while written < size:
+            shuffle(lines)
+            block = "".join(lines)
+            file.write(block)
+            written += len(block.encode("utf8"))
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_case(function: Callable, query, path: str, repeat: int) -> Dict:
+    """Time one case and return its timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(query, path)
+        timings.append(time.perf_counter() - start)
+    size = os.path.getsize(path)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mib_per_s": size / 2**20 / min(timings),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """List the cases slower than the baseline by more than threshold."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        ratio = result["min"] / reference["min"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{key}: {result['min'] * 1000:.2f}ms vs "
+                f"{reference['min'] * 1000:.2f}ms ({ratio - 1:+.0%})"
+            )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="10M",
+    show_default=True,
+    help="Comma separated sizes of synthetic corpora, e.g. 10M,100M,1G, "
+    "empty for none",
+)
+@click.option("--repeat", "-r", default=5, show_default=True)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_OUTPUT,
+    show_default=True,
+    help="JSON file the results are written to",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_BASELINE,
+    show_default=True,
+    help="JSON results to compare with, ignored when missing",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Allowed slowdown against the baseline, 0.2 for 20%",
+)
+@click.option(
+    "--save-baseline",
+    is_flag=True,
+    help="Store the results as the new baseline instead of comparing",
+)
+def main(
+    sizes: str,
+    repeat: int,
+    output: str,
+    baseline: str,
+    threshold: float,
+    save_baseline: bool,
+) -> None:
+    """Time every counting mode and compare the results with a baseline."""
+    corpora = {"pan-tadeusz": CORPUS}
+    for size in filter(None, sizes.split(",")):
+        corpora[f"synthetic-{size}"] = synthetic_corpus(parse_size(size))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["PTWORDFINDER_CACHE_DIR"] = cache
+        for corpus, path in corpora.items():
+            for name, query, function in CASES:
+                key = f"{name}[{corpus}]"
+                results[key] = run_case(function, query, path, repeat)
+                click.echo(
+                    f"{key:<50} {results[key]['min'] * 1000:>10.2f}ms "
+                    f"{results[key]['mib_per_s']:>8.1f}MiB/s"
+                )
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+    path = baseline if save_baseline else output
+    with open(path, "w", encoding="utf8") as file:
+        json.dump(report, file, indent=2)
+    click.echo(f"Results written to '{path}'.")
+
+    if save_baseline or not os.path.exists(baseline):
+        return
+    with open(baseline, "r", encoding="utf8") as file:
+        reference = json.load(file)["results"]
+    regressions = compare(results, reference, threshold)
+    for regression in regressions:
+        click.echo(f"Regression: {regression}", err=True)
+    if regressions:
+        sys.exit(1)
+    click.echo(f"No regression beyond {threshold:.0%} of '{baseline}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,22 @@
 """
 Exports for CLI commands.
+
+The commands are imported on first access, so importing one module of
+this package does not import all of them.
 """
 
-from ptwordfinder.commands.pt_word_finder import calculate_words
+from importlib import import_module
+
+_COMMANDS = {
+    "calculate_words": "ptwordfinder.commands.pt_word_finder",
+    "index": "ptwordfinder.commands.word_index",
+    "serve": "ptwordfinder.commands.serve",
+}
+
+__all__ = list(_COMMANDS)
+
+
+def __getattr__(name):
+    if name in _COMMANDS:
+        return getattr(import_module(_COMMANDS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
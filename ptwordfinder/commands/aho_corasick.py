@@ -0,0 +1,199 @@
+"""
+This module provides an Aho–Corasick multi-pattern matcher for word lists.
+
+The automaton is built once from all entries of a `--words-input-file`
+and then finds every occurrence of every entry in a single linear pass
+over the searched text. Entries may be substrings or whole phrases
+containing spaces, and matches can be restricted to whole words.
+
+Building the automaton of a large dictionary takes time, so automatons
+are pickled into the cache directory, keyed by the hash of the word list,
+and reused by later runs.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import hashlib
+import os
+import pickle
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.word_index import cache_dir, dump_atomic
+
+AUTOMATON_FORMAT_VERSION = 1
+
+
+class AhoCorasick:
+    """Aho–Corasick automaton over the characters of a list of words.
+
+    Attributes:
+        words (list): The distinct non-empty words, in the given order.
+        goto (list): Node -> {character: next node} trie transitions.
+        fail (list): Node -> node of the longest proper suffix in the trie.
+        output (list): Node -> indexes of the words ending at the node,
+                       including those reached through failure links.
+        lengths (list): Length of each word.
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.version = AUTOMATON_FORMAT_VERSION
+        self.words: List[str] = [word for word in dict.fromkeys(words) if word]
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+        self.lengths: List[int] = [len(word) for word in self.words]
+
+        for number, word in enumerate(self.words):
+            node = 0
+            for ch in word:
+                next_node = self.goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][ch] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                node = next_node
+            self.output[node] += (number,)
+
+        # Breadth first, so the failure node of a parent is always known
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] += self.output[self.fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Find all occurrences of all words, overlapping ones included.
+
+        Args:
+            text (str): The text to search in.
+
+        Yields:
+            tuple: The index of the word in `words` and the position of
+                   the last character of the occurrence.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for position, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for number in output[node]:
+                yield number, position
+
+    def count(
+        self,
+        text: str,
+        whole_words: bool = False,
+        counts: Optional[List[int]] = None,
+    ) -> List[int]:
+        """Count the occurrences of every word in a text.
+
+        Args:
+            text (str): The text to search in.
+            whole_words (bool): Only count occurrences that are neither
+                                preceded nor followed by an alphanumerical
+                                character.
+            counts (list, optional): Counts to add to, in the order of
+                                     `words`, e.g. when a file is matched
+                                     line by line.
+
+        Returns:
+            list: Occurrences of each word, in the order of `words`.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        lengths = self.lengths
+        if counts is None:
+            counts = [0] * len(self.words)
+        last = len(text) - 1
+        node = 0
+        for position, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            matched = output[node]
+            if not matched:
+                continue
+            if not whole_words:
+                for number in matched:
+                    counts[number] += 1
+                continue
+            # All words ending here share the character that follows
+            if position < last and text[position + 1].isalnum():
+                continue
+            for number in matched:
+                start = position - lengths[number]
+                if start < 0 or not text[start].isalnum():
+                    counts[number] += 1
+        return counts
+
+
+def load_automaton(words: Iterable[str]) -> AhoCorasick:
+    """Return the automaton of a word list, from the cache when possible.
+
+    Args:
+        words (iterable): The words to match.
+
+    Returns:
+        AhoCorasick: The automaton of the distinct non-empty words.
+    """
+    word_list = [word for word in dict.fromkeys(words) if word]
+    key = hashlib.sha256("\n".join(word_list).encode("utf8")).hexdigest()
+    path = os.path.join(cache_dir(), f"{key}.aho")
+
+    try:
+        with open(path, "rb") as file:
+            automaton = pickle.load(file)
+        if automaton.version == AUTOMATON_FORMAT_VERSION:
+            return automaton
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    automaton = AhoCorasick(word_list)
+    os.makedirs(cache_dir(), exist_ok=True)
+    dump_atomic(automaton, path)
+    return automaton
+
+
+def count_matches_in_lines(
+    automaton: AhoCorasick, lines: Iterable[str], whole_words: bool = False
+) -> Dict[str, int]:
+    """Count the occurrences of every word of an automaton in text lines.
+
+    Words never contain line breaks, so each line is matched on its own.
+
+    Args:
+        automaton (AhoCorasick): The automaton of the word list.
+        lines (iterable): Lines of text, e.g. an opened text file.
+        whole_words (bool): Only count whole word occurrences.
+
+    Returns:
+        dict: A mapping of each word to its count of occurrences.
+    """
+    totals = [0] * len(automaton.words)
+    for line in lines:
+        automaton.count(line, whole_words, totals)
+    return dict(zip(automaton.words, totals))
+
+
+def count_matches_in_file(
+    automaton: AhoCorasick, searched_file: str, whole_words: bool = False
+) -> Dict[str, int]:
+    """Count the occurrences of every word of an automaton in a file.
+
+    Args:
+        automaton (AhoCorasick): The automaton of the word list.
+        searched_file (str): The path to the text file to search in.
+        whole_words (bool): Only count whole word occurrences.
+
+    Returns:
+        dict: A mapping of each word to its count of occurrences.
+    """
+    with open_text(searched_file) as file:
+        return count_matches_in_lines(automaton, file, whole_words)
@@ -0,0 +1,93 @@
+"""
+This module provides the word boundary matching behind `--match`.
+
+`--single-word` counts substrings by default, so "pan" is also found in
+"panna" and "Tadeuszpan". The other match modes only count occurrences at
+word boundaries, where a boundary is any character that is not
+alphanumerical, or the start or end of the text:
+
+* `whole`: neither preceded nor followed by an alphanumerical character,
+* `prefix`: not preceded by one, so "pan" is found in "panna",
+* `suffix`: not followed by one, so "pan" is found in "Tadeuszpan".
+
+Candidates are found with `str.find`, which searches in C, and boundaries
+are only checked at those positions, so the text is never tokenized and
+a rare word costs about as much as `str.count`. `find_bounded` yields the
+positions of the same occurrences, for `--show-matches`.
+"""
+
+from typing import Iterator
+
+MATCH_MODES = ("substring", "whole", "prefix", "suffix")
+
+
+def count_bounded(word: str, text: str, match: str = "substring") -> int:
+    """Count the non-overlapping occurrences of a word in a text.
+
+    Args:
+        word (str): The word to search for.
+        text (str): The text to search in, a line or a whole buffer.
+        match (str): One of `MATCH_MODES`.
+
+    Returns:
+        int: The number of occurrences at the required word boundaries.
+             An empty word is never found at a boundary.
+    """
+    if match == "substring":
+        return text.count(word)
+    if not word:
+        return 0
+    check_start = match != "suffix"
+    check_end = match != "prefix"
+    size = len(word)
+    last = len(text) - 1
+    find = text.find
+    count = 0
+    position = find(word)
+    while position >= 0:
+        end = position + size
+        if (
+            not check_start
+            or position == 0
+            or not text[position - 1].isalnum()
+        ) and (not check_end or end > last or not text[end].isalnum()):
+            count += 1
+            position = find(word, end)
+        else:
+            position = find(word, position + 1)
+    return count
+
+
+def find_bounded(
+    word: str, text: str, match: str = "substring"
+) -> Iterator[int]:
+    """Yield the start of the occurrences counted by `count_bounded`.
+
+    Args:
+        word (str): The word to search for.
+        text (str): The text to search in, a line or a whole buffer.
+        match (str): One of `MATCH_MODES`.
+
+    Yields:
+        int: The index in text of every non-overlapping occurrence at the
+             required word boundaries. An empty word is never found.
+    """
+    if not word:
+        return
+    check_start = match in ("whole", "prefix")
+    check_end = match in ("whole", "suffix")
+    size = len(word)
+    last = len(text) - 1
+    find = text.find
+    position = find(word)
+    while position >= 0:
+        end = position + size
+        if (
+            not check_start
+            or position == 0
+            or not text[position - 1].isalnum()
+        ) and (not check_end or end > last or not text[end].isalnum()):
+            yield position
+            position = find(word, end)
+        else:
+            position = find(word, position + 1)
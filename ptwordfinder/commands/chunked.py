@@ -0,0 +1,130 @@
+"""
+This module provides chunked parallel scanning of a single large file.
+
+The file is split into byte ranges that start right after a newline, so
+every line belongs to exactly one range. All counting modes work line by
+line, therefore counting the ranges concurrently and summing the results
+gives exactly the same answer as the sequential scan.
+"""
+
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import io
+import os
+
+from ptwordfinder.commands.multi_file import merge_counts
+
+# Ranges smaller than this are not worth a worker process
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+# Upper bound of the bytes a worker holds in memory at once
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def split_file(searched_file: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into about `parts` byte ranges aligned to line ends.
+
+    Args:
+        searched_file (str): The path to the file to split.
+        parts (int): The wanted number of ranges.
+
+    Returns:
+        list: (start, end) byte offsets. Every range but the last one ends
+              right after a newline character.
+    """
+    size = os.path.getsize(searched_file)
+    bounds = [0]
+    with open(searched_file, "rb") as file:
+        for part in range(1, parts):
+            file.seek(max(size * part // parts, bounds[-1]))
+            # Move to the start of the next line
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def count_in_chunks(
+    lines_function: Callable[[Any, Iterable[str]], Any],
+    query: Any,
+    searched_file: str,
+    jobs: int,
+    parts: Optional[int] = None,
+) -> Any:
+    """Count in a single file by scanning line aligned ranges concurrently.
+
+    Args:
+        lines_function (callable): A module level function taking the query
+                                   and text lines, e.g. `count_word_in_lines`.
+        query: The first argument passed to `lines_function`.
+        searched_file (str): The path to the file to search in.
+        jobs (int): Number of worker processes.
+        parts (int, optional): Number of ranges. By default it is derived
+                               from the file size and the number of jobs.
+
+    Returns:
+        The merged result of all ranges, an int or a {word: count} mapping.
+    """
+    if parts is None:
+        size = os.path.getsize(searched_file)
+        parts = min(jobs * 4, size // MIN_CHUNK_SIZE)
+        parts = max(parts, -(-size // MAX_CHUNK_SIZE), 1)
+
+    ranges = split_file(searched_file, parts)
+    if jobs <= 1 or len(ranges) == 1:
+        results = [
+            count_range(lines_function, query, searched_file, start, end)
+            for start, end in ranges
+        ]
+    else:
+        # Imported here, multiprocessing is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as pool:
+            results = list(
+                pool.map(
+                    count_range,
+                    [lines_function] * len(ranges),
+                    [query] * len(ranges),
+                    [searched_file] * len(ranges),
+                    [start for start, _ in ranges],
+                    [end for _, end in ranges],
+                )
+            )
+
+    total = None
+    for result in results:
+        total = merge_counts(total, result)
+    return total
+
+
+def count_range(
+    lines_function: Callable[[Any, Iterable[str]], Any],
+    query: Any,
+    searched_file: str,
+    start: int,
+    end: int,
+) -> Any:
+    """Count in the lines of one byte range of a file.
+
+    The range is decoded with the same universal newline handling as a
+    file opened in text mode.
+
+    Args:
+        lines_function (callable): The per-line counting function.
+        query: The first argument passed to `lines_function`.
+        searched_file (str): The path to the file to search in.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset just past the last byte of the range.
+
+    Returns:
+        The result of `lines_function` for the range.
+    """
+    with open(searched_file, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding="utf8")
+    return lines_function(query, lines)
@@ -0,0 +1,124 @@
+"""
+This module provides transparent reading of compressed searched files.
+
+The format of a searched file is sniffed from its first bytes, whatever
+its name, and gzip, bzip2, xz and Zstandard files are decompressed on the
+fly in large blocks. The expanded text never touches the disk, so counting
+a compressed archive needs no more space than the archive itself.
+
+Zstandard support needs the optional `zstandard` package:
+
+```bash
+pip install zstandard
+```
+"""
+
+from typing import BinaryIO, Optional, TextIO
+
+import io
+
+from ptwordfinder.commands.stats import TimedText, active_stats
+
+# Bytes decompressed at once
+BLOCK_SIZE = 1024 * 1024
+
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def sniff_codec(searched_file: str) -> Optional[str]:
+    """Detect the compression format of a file from its first bytes.
+
+    Args:
+        searched_file (str): The path to the file.
+
+    Returns:
+        str: "gzip", "bz2", "xz" or "zstd", or None for an uncompressed
+             file, or a file that cannot be read.
+    """
+    try:
+        with io.open(searched_file, "rb") as file:
+            head = file.read(6)
+    except OSError:
+        return None
+    for magic, codec in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def open_binary(searched_file: str) -> BinaryIO:
+    """Open a file for reading bytes, decompressing it if needed.
+
+    Args:
+        searched_file (str): The path to the file.
+
+    Returns:
+        file: A binary stream of the uncompressed content.
+
+    Raises:
+        ImportError: If the file is compressed with Zstandard and the
+                     `zstandard` package is not installed.
+    """
+    codec = sniff_codec(searched_file)
+    if codec is None:
+        return open(searched_file, "rb")
+    # Codecs are imported on first use, most searched files are plain
+    if codec == "gzip":
+        import gzip
+
+        raw = gzip.GzipFile(searched_file, "rb")
+    elif codec == "bz2":
+        import bz2
+
+        raw = bz2.BZ2File(searched_file, "rb")
+    elif codec == "xz":
+        import lzma
+
+        raw = lzma.LZMAFile(searched_file, "rb")
+    else:
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ImportError(
+                f"Reading '{searched_file}' needs the zstandard package, "
+                "install it with `pip install zstandard`."
+            ) from error
+        raw = zstandard.ZstdDecompressor().stream_reader(
+            open(searched_file, "rb"), read_size=BLOCK_SIZE, closefd=True
+        )
+    return io.BufferedReader(raw, buffer_size=BLOCK_SIZE)
+
+
+def open_text(searched_file: str) -> TextIO:
+    """Open a UTF-8 text file for reading, decompressing it if needed.
+
+    Uncompressed files are opened exactly like `open(path, "r",
+    encoding="utf8")`. While `--stats` are collected, the file is timed.
+
+    Args:
+        searched_file (str): The path to the file.
+
+    Returns:
+        file: A text stream of the uncompressed content.
+    """
+    stats = active_stats()
+    if stats is None:
+        return _open_text(searched_file)
+    with stats.phase("open"):
+        file = _open_text(searched_file)
+    return TimedText(file, stats)
+
+
+def _open_text(searched_file: str) -> TextIO:
+    """Open a text file, through a decompressor if it is compressed."""
+    if sniff_codec(searched_file) is None:
+        return open(searched_file, "r", encoding="utf8")
+    text = io.TextIOWrapper(open_binary(searched_file), encoding="utf8")
+    # Decode large blocks instead of the default 8 KiB
+    text._CHUNK_SIZE = BLOCK_SIZE
+    return text
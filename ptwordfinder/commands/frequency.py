@@ -0,0 +1,198 @@
+"""
+This module provides the word frequency table behind `--top K`.
+
+By default every token of `non_blank_lines` is counted exactly, in a
+`Vocabulary`, and the K most frequent words are reported.
+
+When the vocabulary of a corpus does not fit in memory, `--top-capacity N`
+counts with the Space-Saving algorithm (Metwally et al., 2005) instead: at
+most N words are tracked at once. A word that is not tracked replaces the
+tracked word with the lowest count and inherits that count, so counts are
+upper bounds, exceeding the true count by at most the total number of
+tokens divided by N. Every word more frequent than that is guaranteed to
+be tracked.
+
+Tables of several chunks, files or appends are merged the Space-Saving
+way too (Agarwal et al., 2012): a word missing from one table is given
+the highest count that table may have dropped, and only the N highest
+counts of the sum are kept, so merged counts stay upper bounds.
+"""
+
+from collections import Counter
+from heapq import heapify, heappop, heappush, nsmallest
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.tokenizer import tokenize_lines
+from ptwordfinder.commands.vocabulary import Vocabulary
+from ptwordfinder.commands.word_index import load_fresh_index
+
+
+class BoundedCounts(dict):
+    """Word -> count table of the Space-Saving algorithm.
+
+    Attributes:
+        capacity (int): The maximum number of words in the table.
+        floor (int): An upper bound of the count of any word missing from
+                     the table, 0 while no word was dropped.
+    """
+
+    def __init__(self, counts: Dict[str, int], capacity: int, floor: int):
+        super().__init__(counts)
+        self.capacity = capacity
+        self.floor = floor
+
+
+class SpaceSaving:
+    """Space-Saving summary of the most frequent tokens.
+
+    Attributes:
+        capacity (int): The maximum number of tracked tokens.
+        counts (dict): Tracked token -> estimated count, an upper bound.
+        errors (dict): Tracked token -> maximum overestimation of its count.
+        floor (int): The highest count of an evicted token, an upper bound
+                     of the count of any token not tracked.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.floor = 0
+        # (count, token) entries, outdated ones are skipped when popped
+        self._heap: List[Tuple[int, str]] = []
+
+    def update(self, tokens: Iterable[str]) -> None:
+        """Count a batch of tokens.
+
+        Args:
+            tokens (iterable): The tokens, e.g. from `tokenize_text`.
+        """
+        for token, count in Counter(tokens).items():
+            self.add(token, count)
+
+    def add(self, token: str, count: int = 1) -> None:
+        """Count `count` occurrences of a token."""
+        counts = self.counts
+        if token in counts:
+            counts[token] += count
+        elif len(counts) < self.capacity:
+            counts[token] = count
+            self.errors[token] = 0
+        else:
+            minimum, evicted = self._pop_minimum()
+            del counts[evicted], self.errors[evicted]
+            self.floor = minimum
+            counts[token] = minimum + count
+            self.errors[token] = minimum
+        heappush(self._heap, (counts[token], token))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, token) for token, count in counts.items()]
+            heapify(self._heap)
+
+    def as_counts(self) -> BoundedCounts:
+        """Return the tracked tokens and their counts."""
+        return BoundedCounts(self.counts, self.capacity, self.floor)
+
+    def _pop_minimum(self) -> Tuple[int, str]:
+        """Remove and return the lowest count and its tracked token."""
+        counts = self.counts
+        while True:
+            count, token = heappop(self._heap)
+            if counts.get(token) == count:
+                return count, token
+
+
+def count_frequencies_in_lines(
+    capacity: Optional[int], lines: Iterable[str]
+) -> Dict[str, int]:
+    """Count every word of text lines.
+
+    Args:
+        capacity (int, optional): Track at most this many words with the
+                                  Space-Saving algorithm, None to count
+                                  every word exactly.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        dict: Word -> count, exact or an upper bound. Tokens made only of
+              non-alphanumerical characters are left out.
+    """
+    summary = Vocabulary() if capacity is None else SpaceSaving(capacity)
+    for tokens in tokenize_lines(lines):
+        summary.update(tokens)
+    counts = summary.as_dict() if capacity is None else summary.as_counts()
+    counts.pop("", None)
+    return counts
+
+
+def count_frequencies_in_file(
+    capacity: Optional[int], searched_file: str
+) -> Dict[str, int]:
+    """Count every word of a file.
+
+    A fresh index built with `ptwordf index build` gives the exact counts
+    without reading the file.
+
+    Args:
+        capacity (int, optional): Track at most this many words with the
+                                  Space-Saving algorithm, None to count
+                                  every word exactly.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        dict: Word -> count, exact or an upper bound.
+    """
+    if capacity is None:
+        index = load_fresh_index(searched_file)
+        if index is not None:
+            counts = dict(index.term_counts)
+            counts.pop("", None)
+            return counts
+
+    with open_text(searched_file) as file:
+        return count_frequencies_in_lines(capacity, file)
+
+
+def merge_bounded_counts(
+    total: Optional[BoundedCounts], counts: BoundedCounts
+) -> BoundedCounts:
+    """Merge two Space-Saving tables into one of the same capacity.
+
+    Args:
+        total (BoundedCounts, optional): The running total, or None before
+                                         the first table.
+        counts (BoundedCounts): The table of one more chunk or file.
+
+    Returns:
+        BoundedCounts: The summed counts, upper bounds of the counts over
+                       both parts, cut back to the highest `capacity` ones.
+    """
+    if total is None:
+        return BoundedCounts(counts, counts.capacity, counts.floor)
+    capacity = max(total.capacity, counts.capacity)
+    merged = {
+        word: total.get(word, total.floor) + counts.get(word, counts.floor)
+        for word in total.keys() | counts.keys()
+    }
+    floor = total.floor + counts.floor
+    if len(merged) > capacity:
+        merged = most_common(merged, capacity)
+        # Every dropped word counts at most as much as the kept ones
+        floor = max(floor, min(merged.values()))
+    return BoundedCounts(merged, capacity, floor)
+
+
+def most_common(counts: Dict[str, int], k: int) -> Dict[str, int]:
+    """Return the K most frequent words, ties sorted alphabetically.
+
+    Args:
+        counts (dict): Word -> count.
+        k (int): The number of words to keep.
+
+    Returns:
+        dict: Word -> count of the K most frequent words, most frequent
+              first.
+    """
+    top = nsmallest(k, counts.items(), key=lambda item: (-item[1], item[0]))
+    return dict(top)
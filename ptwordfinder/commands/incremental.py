@@ -0,0 +1,181 @@
+"""
+This module provides incremental counting of append-only files.
+
+Counting a file with `--incremental` stores a checkpoint in the cache
+directory: the byte offset just past the last complete line, the counts
+of the lines before it and a digest of the first bytes of the file. The
+next count of the same query in the same file only reads the lines
+appended since, and merges their counts with the stored ones.
+
+A last line without a line break may still grow, so it is counted but
+left out of the checkpoint and read again by the next run; a token split
+across two appends is therefore never counted in halves.
+
+The checkpoint is dropped and the file counted from the start when it was
+rotated or truncated: its inode changed, it is smaller than the
+checkpoint offset, or its first bytes changed.
+
+**Usage:**
+
+```bash
+ptwordf calculate-words -w ERROR -s /var/log/app.log --incremental
+```
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import hashlib
+import os
+import pickle
+
+from ptwordfinder.commands.compressed import open_text, sniff_codec
+from ptwordfinder.commands.multi_file import merge_counts
+from ptwordfinder.commands.stats import active_stats
+from ptwordfinder.commands.stream import decode_lines, iter_line_blocks
+from ptwordfinder.commands.word_index import cache_dir, dump_atomic
+
+CHECKPOINT_FORMAT_VERSION = 2
+# Bytes at the start of the file whose digest detects a rewritten file
+HEAD_SIZE = 64 * 1024
+
+
+def query_key(
+    lines_function: Callable[[Any, Iterable[str]], Any], query: Any
+) -> str:
+    """Return a digest identifying a counting function and its query.
+
+    Args:
+        lines_function (callable): A module level function taking the query
+                                   and text lines, e.g. `count_word_in_lines`.
+        query: The first argument passed to `lines_function`.
+
+    Returns:
+        str: The hex digest of the pickled function and query. Sets are
+             sorted first, so equal queries give equal keys.
+    """
+    if isinstance(query, (set, frozenset)):
+        query = sorted(query)
+    data = pickle.dumps((lines_function, query), protocol=4)
+    return hashlib.sha256(data).hexdigest()
+
+
+def checkpoint_path(searched_file: str, key: str) -> str:
+    """Return the path of the checkpoint of a query in a searched file.
+
+    Args:
+        searched_file (str): The path to the counted text file.
+        key (str): The `query_key` of the query.
+
+    Returns:
+        str: Path of the checkpoint file inside `cache_dir()`.
+    """
+    name = hashlib.sha1(
+        f"{os.path.abspath(searched_file)}\0{key}".encode("utf8")
+    ).hexdigest()
+    return os.path.join(cache_dir(), f"{name}.ckpt")
+
+
+def count_incrementally(
+    lines_function: Callable[[Any, Iterable[str]], Any],
+    query: Any,
+    searched_file: str,
+) -> Any:
+    """Count in a file, reading only what was appended since the last run.
+
+    Compressed files cannot be resumed and are counted from the start.
+
+    Args:
+        lines_function (callable): A module level function taking the query
+                                   and text lines, e.g. `count_word_in_lines`.
+        query: The first argument passed to `lines_function`.
+        searched_file (str): The path to the file to search in.
+
+    Returns:
+        The count over the whole file, an int or a {word: count} mapping.
+    """
+    if sniff_codec(searched_file) is not None:
+        with open_text(searched_file) as file:
+            return lines_function(query, file)
+
+    key = query_key(lines_function, query)
+    path = checkpoint_path(searched_file, key)
+    stats = active_stats()
+    with open(searched_file, "rb") as file:
+        stat = os.fstat(file.fileno())
+        checkpoint = _load_checkpoint(path, key, stat, file)
+        if checkpoint is None:
+            offset, counts = 0, None
+        else:
+            offset, counts = checkpoint["offset"], checkpoint["counts"]
+
+        file.seek(offset)
+        appended = False
+        partial_result = None
+        for block in iter_line_blocks(file):
+            if stats is None:
+                lines = decode_lines(block)
+            else:
+                with stats.phase("read"):
+                    lines = decode_lines(block)
+                    stats.add_bytes(block)
+            result = lines_function(query, lines)
+            if not block.endswith(b"\n"):
+                # The last line may still grow, it is read again next time
+                partial_result = result
+                break
+            counts = merge_counts(counts, result)
+            offset += len(block)
+            appended = True
+
+        if counts is None:
+            counts = lines_function(query, [])
+        if appended or checkpoint is None:
+            file.seek(0)
+            head = file.read(min(offset, HEAD_SIZE))
+            _save_checkpoint(
+                path,
+                {
+                    "version": CHECKPOINT_FORMAT_VERSION,
+                    "path": os.path.abspath(searched_file),
+                    "key": key,
+                    "device": stat.st_dev,
+                    "inode": stat.st_ino,
+                    "offset": offset,
+                    "head": hashlib.sha256(head).hexdigest(),
+                    "counts": counts,
+                },
+            )
+
+    if partial_result is None:
+        return counts
+    return merge_counts(merge_counts(None, counts), partial_result)
+
+
+def _load_checkpoint(
+    path: str, key: str, stat: os.stat_result, file
+) -> Optional[Dict]:
+    """Load a checkpoint, None when missing or the file was rewritten."""
+    try:
+        with open(path, "rb") as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if (
+        checkpoint.get("version") != CHECKPOINT_FORMAT_VERSION
+        or checkpoint["key"] != key
+        or (checkpoint["device"], checkpoint["inode"])
+        != (stat.st_dev, stat.st_ino)
+        or checkpoint["offset"] > stat.st_size
+    ):
+        return None
+    head = file.read(min(checkpoint["offset"], HEAD_SIZE))
+    if hashlib.sha256(head).hexdigest() != checkpoint["head"]:
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: Dict) -> None:
+    """Store a checkpoint, replacing the previous one at once."""
+    os.makedirs(cache_dir(), exist_ok=True)
+    dump_atomic(checkpoint, path)
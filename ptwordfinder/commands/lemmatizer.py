@@ -0,0 +1,143 @@
+"""
+This module provides the lemmatization behind `--lemmatize`.
+
+Every token of the searched text is replaced by its lemma, so counting
+"dom" also counts "domu", "domem" and "domach". Lemmas come from a
+dictionary of word forms, a tab separated `form<TAB>lemma` file read once
+per process, and again when it changes. The bundled
+`ptwordfinder/data/pl_lemmas.tsv` covers the frequent words of Pan
+Tadeusz and works offline; a larger table in the same format can be given
+instead. Forms are matched regardless of case,
+and tokens missing from the dictionary are kept as they are.
+
+Lookups go through an LRU cache of token -> lemma: natural text repeats
+its words, so most tokens are answered by the cache, in C, without
+lowercasing the token again. The hits and lookups are reported by
+`--stats`.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+import os
+
+from ptwordfinder.commands.stats import active_stats
+from ptwordfinder.commands.tokenizer import split_tokens
+
+DEFAULT_DICTIONARY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "pl_lemmas.tsv",
+)
+# Number of distinct tokens whose lemma is remembered
+CACHE_SIZE = 1 << 16
+
+
+def load_dictionary(path: str = DEFAULT_DICTIONARY) -> Dict[str, str]:
+    """Read a dictionary of word forms and their lemmas.
+
+    Args:
+        path (str): The tab separated file, one `form<TAB>lemma` pair per
+                    line. Blank lines and lines starting with `#` are
+                    skipped.
+
+    Returns:
+        dict: Lowercased form -> lemma.
+
+    Raises:
+        ValueError: If a line is not a pair of tab separated fields.
+    """
+    dictionary: Dict[str, str] = {}
+    with open(path, "r", encoding="utf8") as file:
+        for number, line in enumerate(file, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 2 or not all(field.strip() for field in fields):
+                raise ValueError(
+                    f"Line {number} of '{path}' is not a form and a lemma "
+                    "separated by a tab."
+                )
+            form, lemma = (field.strip() for field in fields)
+            dictionary.setdefault(form.lower(), lemma)
+    return dictionary
+
+
+class Lemmatizer:
+    """Token -> lemma mapping with an LRU cache of lookups.
+
+    Attributes:
+        dictionary (dict): Lowercased form -> lemma.
+        lemma (callable): Return the lemma of a token, or the token itself,
+                          through the cache. `lemma.cache_info()` gives its
+                          hits and misses.
+    """
+
+    def __init__(
+        self, dictionary: Dict[str, str], cache_size: int = CACHE_SIZE
+    ) -> None:
+        self.dictionary = dictionary
+        self.lemma = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _lookup(self, token: str) -> str:
+        """Look a token up in the dictionary, regardless of case."""
+        return self.dictionary.get(token.lower(), token)
+
+    def lemmatize(self, tokens: Iterable[str]) -> List[str]:
+        """Return the lemma of every token.
+
+        Args:
+            tokens (iterable): The tokens, e.g. from `tokenize_text`.
+
+        Returns:
+            list: The lemmas, in the order of the tokens.
+        """
+        return list(map(self.lemma, tokens))
+
+
+def get_lemmatizer(path: str = DEFAULT_DICTIONARY) -> Lemmatizer:
+    """Return the lemmatizer of a dictionary, one per process.
+
+    Args:
+        path (str): The dictionary, see `load_dictionary`.
+
+    Returns:
+        Lemmatizer: The lemmatizer, built again when the file changed.
+
+    Raises:
+        OSError: If the dictionary cannot be read.
+        ValueError: If the dictionary is malformed.
+    """
+    stat = os.stat(path)
+    return _cached_lemmatizer(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _cached_lemmatizer(path: str, mtime_ns: int, size: int) -> Lemmatizer:
+    """Build the lemmatizer of a version of a dictionary."""
+    return Lemmatizer(load_dictionary(path))
+
+
+def lemmatize_text(text: str, path: str = DEFAULT_DICTIONARY) -> str:
+    """Replace every word of a text by its lemma.
+
+    Args:
+        text (str): Any text, one word or a whole buffer.
+        path (str): The dictionary, see `load_dictionary`.
+
+    Returns:
+        str: The lemmas of the words of the text, separated by spaces.
+             Punctuation and line breaks are dropped, so the result only
+             suits counting on tokens.
+    """
+    lemmatizer = get_lemmatizer(path)
+    tokens = list(filter(None, split_tokens(text)))
+    stats = active_stats()
+    if stats is None:
+        return " ".join(lemmatizer.lemmatize(tokens))
+    hits = lemmatizer.lemma.cache_info().hits
+    lemmas = lemmatizer.lemmatize(tokens)
+    stats.lemma_lookups += len(tokens)
+    stats.lemma_hits += lemmatizer.lemma.cache_info().hits - hits
+    return " ".join(lemmas)
@@ -0,0 +1,296 @@
+"""
+This module provides the positional hit reporting behind `--show-matches`.
+
+Instead of a count, every occurrence found by the single word, word list
+and pattern modes is reported with its file, line number, column and the
+text around it, like `grep`. The same occurrences are counted by the
+counting functions, so listing them gives as many hits as the count:
+
+* a single word is any non-overlapping occurrence, or one at word
+  boundaries with `--match`, see `ptwordfinder.commands.boundaries`,
+* a word of a word list is a token, without the punctuation around it,
+* a pattern is any match of the regular expression, or of the escaped
+  text with `--literal`.
+
+Hits are produced by generators, file after file and line after line, so
+every hit is printed as soon as its line is read, memory does not grow
+with the number of hits, and `--max-matches` stops reading the searched
+files right after the line of the last printed hit. Patterns are matched
+under the `--regex-timeout` budget, whose clock does not run while hits
+are printed or lines of standard input are awaited.
+"""
+
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+)
+
+import io
+import re
+import sys
+
+from ptwordfinder.commands.boundaries import find_bounded
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.multi_file import STDIN
+from ptwordfinder.commands.regex_mode import paused_budget, time_budget
+from ptwordfinder.commands.tokenizer import split_tokens, strip_token
+
+# Characters of context kept on each side of a hit
+CONTEXT_CHARS = 30
+# A whitespace separated token, as split by the tokenizer
+_RAW_TOKEN = re.compile(r"\S+")
+# Characters stripped from the start and the end of a token
+_LEADING_NON_ALNUM = re.compile(r"(?:[^\w\s]|_)*")
+_TRAILING_NON_ALNUM = re.compile(r"(?:[^\w\s]|_)*\Z")
+
+# Return the start and end of every hit of a query in one line
+SpanFinder = Callable[[object, str], List[Tuple[int, int]]]
+
+
+@dataclass
+class Match:
+    """One occurrence of a query in a searched file.
+
+    Attributes:
+        file (str): The searched file, `-` for standard input.
+        line (int): The line number, starting at 1.
+        column (int): The column of the first character of the hit, in
+                      characters, starting at 1.
+        text (str): The text of the hit.
+        context (str): The hit with up to `CONTEXT_CHARS` characters of
+                       its line on each side, `...` marking cut text.
+    """
+
+    file: str
+    line: int
+    column: int
+    text: str
+    context: str
+
+    def as_record(self) -> dict:
+        """Return the hit as a record of `--format` json, csv or ndjson."""
+        return {
+            "file": self.file,
+            "line": self.line,
+            "column": self.column,
+            "match": self.text,
+            "context": self.context,
+        }
+
+    def __str__(self) -> str:
+        return f"{self.file}:{self.line}:{self.column}: {self.context}"
+
+
+def word_spans(
+    word: str, line: str, match: str = "substring"
+) -> List[Tuple[int, int]]:
+    """Find the hits of a single word in a line.
+
+    Args:
+        word (str): The word to search for.
+        line (str): The line to search in.
+        match (str): One of `ptwordfinder.commands.boundaries.MATCH_MODES`.
+
+    Returns:
+        list: The start and end of every occurrence counted by
+              `count_word_in_lines`.
+    """
+    if word not in line:
+        return []
+    size = len(word)
+    return [
+        (start, start + size) for start in find_bounded(word, line, match)
+    ]
+
+
+def token_spans(words: Set[str], line: str) -> List[Tuple[int, int]]:
+    """Find the tokens of a line that belong to a word list.
+
+    Args:
+        words (set): The words to search for.
+        line (str): The line to search in.
+
+    Returns:
+        list: The start and end of every token counted by
+              `count_each_word_in_lines`, without its leading and trailing
+              punctuation. Punctuation inside the token, like the hyphen
+              of "a-b" counted as "ab", is kept in the span.
+    """
+    if words.isdisjoint(split_tokens(line)):
+        return []
+    spans = []
+    for raw in _RAW_TOKEN.finditer(line):
+        token = strip_token(raw.group())
+        if token and token in words:
+            start = _LEADING_NON_ALNUM.match(line, raw.start()).end()
+            end = raw.start() + _TRAILING_NON_ALNUM.search(raw.group()).start()
+            spans.append((start, end))
+    return spans
+
+
+def pattern_spans(
+    pattern: Pattern[str], line: str
+) -> List[Tuple[int, int]]:
+    """Find the matches of a regular expression in a line.
+
+    Args:
+        pattern (Pattern): The regular expression, compiled by
+                           `compile_pattern`.
+        line (str): The line to search in.
+
+    Returns:
+        list: The start and end of every match, empty ones included, as
+              counted by `count_regex_in_lines`.
+    """
+    if pattern.search(line) is None:
+        return []
+    return [found.span() for found in pattern.finditer(line)]
+
+
+def find_in_lines(
+    spans: SpanFinder,
+    query,
+    lines: Iterable[str],
+    timeout: Optional[float] = None,
+    blocking: bool = False,
+) -> Iterator[Tuple[int, int, int, str]]:
+    """Yield the hits of a query in text lines, line by line.
+
+    Args:
+        spans (callable): `word_spans`, `token_spans` or `pattern_spans`,
+                          or a partial of them.
+        query: The word, set of words or compiled pattern given to spans.
+        lines (iterable): Lines of text, e.g. an opened text file.
+        timeout (float, optional): Seconds allowed to search the lines,
+                                   not counting the time spent in the
+                                   caller between hits.
+        blocking (bool): Lines can take long to arrive, e.g. from a pipe,
+                         so the time spent reading them is not counted
+                         either. Pausing the budget for every line slows
+                         the search down, so regular files are not.
+
+    Yields:
+        tuple: The line number, the start and end of the hit in the line
+               and the line itself.
+
+    Raises:
+        TimeoutError: If searching took longer than timeout.
+    """
+    if not timeout:
+        for number, line in enumerate(lines, 1):
+            for begin, end in spans(query, line):
+                yield number, begin, end, line
+        return
+
+    with time_budget(timeout):
+        if not blocking:
+            for number, line in enumerate(lines, 1):
+                for begin, end in spans(query, line):
+                    with paused_budget():
+                        yield number, begin, end, line
+            return
+
+        # The clock of the budget only runs while a line is searched
+        lines = iter(lines)
+        number = 0
+        while True:
+            with paused_budget():
+                line = next(lines, None)
+            if line is None:
+                return
+            number += 1
+            for begin, end in spans(query, line):
+                with paused_budget():
+                    yield number, begin, end, line
+
+
+def iter_matches(
+    spans: SpanFinder,
+    query,
+    searched_files: Iterable[str],
+    timeout: Optional[float] = None,
+) -> Iterator[Match]:
+    """Yield the hits of a query in searched files, one file after another.
+
+    Files are only opened when the previous ones are exhausted, so
+    stopping the iteration stops reading.
+
+    Args:
+        spans (callable): See `find_in_lines`.
+        query: See `find_in_lines`.
+        searched_files (iterable): Paths to the text files to search in,
+                                   `-` for standard input.
+        timeout (float, optional): Seconds allowed to search each file.
+
+    Yields:
+        Match: Every hit, in the order of the files and of their lines.
+    """
+    for searched_file in searched_files:
+        if searched_file == STDIN:
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf8")
+            try:
+                yield from _matches_in_lines(
+                    spans, query, searched_file, stream, timeout, True
+                )
+            finally:
+                # Keep standard input open once the wrapper is collected
+                stream.detach()
+        else:
+            with open_text(searched_file) as file:
+                yield from _matches_in_lines(
+                    spans, query, searched_file, file, timeout
+                )
+
+
+def _matches_in_lines(
+    spans: SpanFinder,
+    query,
+    searched_file: str,
+    lines: Iterable[str],
+    timeout: Optional[float],
+    blocking: bool = False,
+) -> Iterator[Match]:
+    """Turn the hits of `find_in_lines` into `Match` objects."""
+    for number, start, end, line in find_in_lines(
+        spans, query, lines, timeout, blocking
+    ):
+        yield Match(
+            searched_file,
+            number,
+            start + 1,
+            line[start:end],
+            surrounding_text(line, start, end),
+        )
+
+
+def surrounding_text(
+    line: str, start: int, end: int, width: int = CONTEXT_CHARS
+) -> str:
+    """Return a hit with the text around it in its line.
+
+    Args:
+        line (str): The line of the hit.
+        start (int): The start of the hit in the line.
+        end (int): The end of the hit in the line.
+        width (int): Characters kept on each side of the hit.
+
+    Returns:
+        str: The hit and its context on one line, with `...` where the
+             line is cut. Tabs and line breaks are kept out of it.
+    """
+    line = line.rstrip("\r\n")
+    before = max(start - width, 0)
+    after = min(end + width, len(line))
+    context = line[before:after].replace("\t", " ")
+    if before:
+        context = "..." + context
+    if after < len(line):
+        context += "..."
+    return context
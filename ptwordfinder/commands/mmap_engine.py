@@ -0,0 +1,158 @@
+"""
+This module provides a memory-mapped, bytes-level counting engine.
+
+Instead of decoding the searched file line by line, the file is mapped
+into memory and processed in large windows that end right after a
+newline:
+
+* single words and literal patterns are encoded once and counted with
+  `bytes.count` on each window, which never creates a `str`,
+* word lists decode each window once and tokenize it as a whole buffer,
+* single words matched at word boundaries (`--match whole`) decode each
+  window once and scan it as a whole buffer.
+
+UTF-8 is self-synchronizing, so counting the encoded needle in the bytes
+gives the same result as counting the needle in the decoded lines. Needles
+containing a line break depend on the line splitting done in text mode and
+are delegated to the line engine.
+
+Compressed files cannot be mapped, their decompressed content is read in
+windows of the same size instead.
+
+The engine is selected with `--engine mmap`.
+"""
+
+from typing import Dict, Iterable, Iterator, Set
+
+import mmap
+import os
+
+from ptwordfinder.commands.boundaries import count_bounded
+from ptwordfinder.commands.compressed import open_binary, sniff_codec
+from ptwordfinder.commands.stats import active_stats
+from ptwordfinder.commands.stream import iter_line_blocks
+from ptwordfinder.commands.tokenizer import tokenize_text
+
+# Bytes handed to bytes.count or the decoder at once
+WINDOW_SIZE = 16 * 1024 * 1024
+
+
+def count_word_mmap(
+    word: str, searched_file: str, match: str = "substring"
+) -> int:
+    """Count how many times a word appears in a file, on raw bytes.
+
+    Args:
+        word (str): The word to search for.
+        searched_file (str): The path to the file to search in.
+        match (str): "substring", or "whole", "prefix" or "suffix" to count
+                     occurrences at word boundaries only, on decoded
+                     windows.
+
+    Returns:
+        int: The count of occurrences of the word in the file.
+    """
+    if not word or "\n" in word or "\r" in word:
+        # Imported here, the line engine module selects this one
+        from ptwordfinder.commands.pt_word_finder import count_word_in_file
+
+        return count_word_in_file(word, searched_file, match)
+
+    if match != "substring":
+        # Windows end after a newline, a word boundary
+        return sum(
+            count_bounded(word, window.decode("utf8"), match)
+            for window in _windows(searched_file)
+        )
+    needle = word.encode("utf8")
+    return sum(window.count(needle) for window in _windows(searched_file))
+
+
+def count_pattern_mmap(pattern: str, searched_file: str) -> int:
+    """Count occurrences of a literal pattern in a file, on raw bytes.
+
+    Args:
+        pattern (str): The pattern to search for. It is matched literally,
+                       like `count_pattern_in_file` does.
+        searched_file (str): The path to the file to search.
+
+    Returns:
+        int: The number of occurrences of the pattern in the file.
+    """
+    if not isinstance(pattern, str) or not pattern:
+        from ptwordfinder.commands.pt_word_finder import count_pattern_in_file
+
+        return count_pattern_in_file(pattern, searched_file)
+    # A sanitized pattern is a literal, its matches are substring matches
+    return count_word_mmap(pattern, searched_file)
+
+
+def count_each_word_mmap(
+    words: Iterable[str], searched_file: str
+) -> Dict[str, int]:
+    """Count every word from a word list, tokenizing whole windows.
+
+    Args:
+        words (iterable): The words to search for.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        dict: A mapping of each word to its count of occurrences.
+    """
+    counts = dict.fromkeys(words, 0)
+    for window in _windows(searched_file):
+        for token in tokenize_text(window.decode("utf8")):
+            if token in counts:
+                counts[token] += 1
+    return counts
+
+
+def count_multiple_words_mmap(words: Set[str], searched_file: str) -> int:
+    """Count the occurrences of words from a word set, on whole windows.
+
+    Args:
+        words (set): A set containing the words to search for.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        int: The total count of occurrences of words from the word set.
+    """
+    return sum(count_each_word_mmap(words, searched_file).values())
+
+
+def _windows(searched_file: str) -> Iterator[bytes]:
+    """Yield consecutive windows of a file, each ending after a newline."""
+    stats = active_stats()
+    if stats is None:
+        yield from _read_windows(searched_file)
+        return
+    windows = _read_windows(searched_file)
+    while True:
+        with stats.phase("read"):
+            window = next(windows, None)
+        if window is None:
+            return
+        stats.add_bytes(window)
+        yield window
+
+
+def _read_windows(searched_file: str) -> Iterator[bytes]:
+    """Read the windows of a mapped or decompressed file."""
+    if sniff_codec(searched_file) is not None:
+        with open_binary(searched_file) as file:
+            yield from iter_line_blocks(file, WINDOW_SIZE)
+        return
+    with open(searched_file, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            # Empty files cannot be mapped
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < size:
+                end = min(start + WINDOW_SIZE, size)
+                if end < size:
+                    newline = mapped.find(b"\n", end)
+                    end = size if newline == -1 else newline + 1
+                yield mapped[start:end]
+                start = end
@@ -0,0 +1,144 @@
+"""
+This module provides tools for searching many files at once.
+
+It offers two functionalities:
+
+* Expanding the `--searched-file` values (files, directories and glob
+  patterns) into a sorted list of files.
+* Running one of the per-file counting functions over every file,
+  optionally fanned out over a `ProcessPoolExecutor`.
+"""
+
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+import glob
+import os
+
+import click
+
+from ptwordfinder.commands.frequency import (
+    BoundedCounts,
+    merge_bounded_counts,
+)
+
+# Searched path that stands for standard input
+STDIN = "-"
+
+
+def expand_searched_paths(paths: Iterable[str]) -> List[str]:
+    """Expand files, directories and glob patterns into a list of files.
+
+    Directories are walked recursively, skipping hidden files and
+    directories. Every file is listed once, in the order the paths were
+    given, with the files of a directory or a glob pattern sorted by name.
+    `-` stands for standard input and is kept as is.
+
+    Args:
+        paths (iterable): Files, directories or glob patterns.
+
+    Returns:
+        list: Paths of the files to search in.
+
+    Raises:
+        click.BadParameter: If a path does not exist or a pattern does not
+                            match any file.
+    """
+    files: List[str] = []
+    for path in paths:
+        if path == STDIN:
+            matches = [path]
+        elif glob.has_magic(path) and not os.path.exists(path):
+            matches = sorted(glob.glob(path, recursive=True))
+            if not matches:
+                raise click.BadParameter(
+                    f"Pattern '{path}' does not match any file.",
+                    param_hint="'--searched-file'",
+                )
+        elif os.path.exists(path):
+            matches = [path]
+        else:
+            raise click.BadParameter(
+                f"Path '{path}' does not exist.",
+                param_hint="'--searched-file'",
+            )
+
+        for match in matches:
+            if match != STDIN and os.path.isdir(match):
+                files.extend(_walk_files(match))
+            else:
+                files.append(match)
+
+    return list(dict.fromkeys(files))
+
+
+def count_in_files(
+    count_function: Callable[[Any, str], Any],
+    query: Any,
+    searched_files: List[str],
+    jobs: int = 1,
+) -> Iterator[Tuple[str, Any]]:
+    """Apply a per-file counting function to every searched file.
+
+    Args:
+        count_function (callable): A module level function taking the query
+                                   and a file path, e.g. `count_word_in_file`.
+        query: The first argument passed to `count_function`.
+        searched_files (list): Paths of the files to search in.
+        jobs (int): Number of worker processes. With 1 job, or a single
+                    file, the files are counted in the current process.
+
+    Yields:
+        tuple: The file path and its result, in the order of the files.
+    """
+    if jobs <= 1 or len(searched_files) <= 1:
+        for searched_file in searched_files:
+            yield searched_file, count_function(query, searched_file)
+        return
+
+    workers = min(jobs, len(searched_files))
+    # Imported here, multiprocessing is slow to import and rarely needed
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            count_function,
+            [query] * len(searched_files),
+            searched_files,
+            chunksize=max(1, len(searched_files) // (workers * 4)),
+        )
+        yield from zip(searched_files, results)
+
+
+def merge_counts(total: Any, result: Any) -> Any:
+    """Merge the result of one file into the running total.
+
+    Args:
+        total: The running total, or None before the first file.
+        result: An int count or a {word: count} mapping.
+
+    Returns:
+        The merged total, of the same type as `result`. Space-Saving
+        tables are merged by `merge_bounded_counts`.
+    """
+    if isinstance(result, BoundedCounts):
+        return merge_bounded_counts(total, result)
+    if total is None:
+        return dict(result) if isinstance(result, dict) else result
+    if isinstance(result, dict):
+        for word, count in result.items():
+            total[word] = total.get(word, 0) + count
+        return total
+    return total + result
+
+
+def _walk_files(directory: str) -> Iterator[str]:
+    """Yield the files below a directory, sorted by path.
+
+    Hidden files and directories, whose name starts with a dot, such as
+    `.git` or `.DS_Store`, are skipped.
+    """
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+        for name in sorted(names):
+            if not name.startswith("."):
+                yield os.path.join(root, name)
@@ -0,0 +1,187 @@
+"""
+This module provides phrase and n-gram counting over the token stream.
+
+Phrases (`--phrase "Pan Tadeusz"`) and n-grams (`--ngram N`) are matched
+on the words of `non_blank_lines`, one stream for the whole file, so they
+span line breaks and ignore the punctuation around words.
+Punctuation-only tokens such as "—" are not words and are skipped.
+
+Every word is mapped to an integer id, and the window of the last N ids
+is kept as one integer rolled forward with a shift, a mask and an `or`:
+`key = ((key << 32) | id) & mask`. No tuple is built per window, and the
+key is an exact encoding of the ids, so equal keys are equal n-grams and
+the words can be decoded back from the key.
+
+N-gram tables are counted exactly by default. With a capacity, at most
+that many n-grams are tracked with the Space-Saving algorithm of
+`ptwordfinder.commands.frequency`, so the table stays in bounded memory;
+only the vocabulary of single words is kept in full.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.frequency import BoundedCounts, SpaceSaving
+from ptwordfinder.commands.tokenizer import tokenize_lines, tokenize_text
+from ptwordfinder.commands.vocabulary import Vocabulary
+
+ID_BITS = 32
+
+
+class RollingKey:
+    """Key of the window of the last N token ids.
+
+    Attributes:
+        n (int): The number of ids in a window.
+        key (int): The ids of the current window, ID_BITS bits each, the
+                   most recent one in the lowest bits.
+        seen (int): The number of ids fed so far, up to N.
+    """
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.mask = (1 << (ID_BITS * n)) - 1
+        self.key = 0
+        self.seen = 0
+
+    def feed(self, ids: Iterable[int]) -> List[int]:
+        """Roll the window over token ids.
+
+        Args:
+            ids (iterable): The next token ids of the stream.
+
+        Returns:
+            list: The key of every complete window ending at one of ids.
+        """
+        keys: List[int] = []
+        append = keys.append
+        key, mask = self.key, self.mask
+        ids = iter(ids)
+        # Fill the first window
+        while self.seen < self.n - 1:
+            token_id = next(ids, None)
+            if token_id is None:
+                self.key = key
+                return keys
+            key = (key << ID_BITS) | token_id
+            self.seen += 1
+        for token_id in ids:
+            key = ((key << ID_BITS) | token_id) & mask
+            append(key)
+        self.key = key
+        return keys
+
+
+def decode_key(key: int, n: int) -> Tuple[int, ...]:
+    """Return the token ids encoded in the key of a window of N ids."""
+    low = (1 << ID_BITS) - 1
+    return tuple(
+        (key >> (ID_BITS * shift)) & low for shift in range(n - 1, -1, -1)
+    )
+
+
+def count_phrases_in_lines(
+    phrases: Iterable[str], lines: Iterable[str]
+) -> Dict[str, int]:
+    """Count the occurrences of phrases in text lines.
+
+    Args:
+        phrases (iterable): The phrases, tokenized like the text, so
+                            "Pan Tadeusz," and "Pan  Tadeusz" are the same
+                            phrase. Duplicates are counted once.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        dict: Phrase -> count of occurrences, in the given order. A phrase
+              without any word is never found.
+    """
+    phrases = list(dict.fromkeys(phrases))
+    # Words of the phrases get ids from 1, any other word is 0
+    vocabulary = Vocabulary([""])
+    phrase_keys: Dict[str, Tuple[int, int]] = {}
+    for phrase in phrases:
+        words = [word for word in tokenize_text(phrase) if word]
+        if not words:
+            continue
+        rolling = RollingKey(len(words))
+        keys = rolling.feed(vocabulary.add(word) for word in words)
+        phrase_keys[phrase] = (len(words), keys[0])
+
+    counts = dict.fromkeys(phrases, 0)
+    windows = {n: RollingKey(n) for n, _ in phrase_keys.values()}
+    get = vocabulary.ids.get
+    for tokens in tokenize_lines(lines):
+        ids = [get(token, 0) for token in tokens if token]
+        found = {n: Counter(window.feed(ids)) for n, window in windows.items()}
+        for phrase, (n, key) in phrase_keys.items():
+            counts[phrase] += found[n][key]
+    return counts
+
+
+def count_phrases_in_file(
+    phrases: Iterable[str], searched_file: str
+) -> Dict[str, int]:
+    """Count the occurrences of phrases in a file.
+
+    Args:
+        phrases (iterable): The phrases to count.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        dict: Phrase -> count of occurrences.
+    """
+    with open_text(searched_file) as file:
+        return count_phrases_in_lines(phrases, file)
+
+
+def count_ngrams_in_lines(
+    query: Tuple[int, Optional[int]], lines: Iterable[str]
+) -> Dict[str, int]:
+    """Count every sequence of N consecutive words in text lines.
+
+    Args:
+        query (tuple): N, and the maximum number of n-grams tracked with
+                       the Space-Saving algorithm, None to count every
+                       n-gram exactly.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        dict: N-gram, its words joined by a space -> count, exact or an
+              upper bound.
+    """
+    n, capacity = query
+    vocabulary = Vocabulary()
+    window = RollingKey(n)
+    table = Counter() if capacity is None else SpaceSaving(capacity)
+    for tokens in tokenize_lines(lines):
+        words = list(filter(None, tokens))
+        vocabulary.update(words)
+        table.update(window.feed(map(vocabulary.ids.__getitem__, words)))
+
+    counts = table if capacity is None else table.counts
+    words = vocabulary.tokens
+    ngrams = {
+        " ".join(words[token_id] for token_id in decode_key(key, n)): count
+        for key, count in counts.items()
+    }
+    if capacity is None:
+        return ngrams
+    return BoundedCounts(ngrams, capacity, table.floor)
+
+
+def count_ngrams_in_file(
+    query: Tuple[int, Optional[int]], searched_file: str
+) -> Dict[str, int]:
+    """Count every sequence of N consecutive words in a file.
+
+    Args:
+        query (tuple): N, and the maximum number of tracked n-grams or
+                       None, see `count_ngrams_in_lines`.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        dict: N-gram -> count.
+    """
+    with open_text(searched_file) as file:
+        return count_ngrams_in_lines(query, file)
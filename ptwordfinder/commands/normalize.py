@@ -0,0 +1,215 @@
+"""
+This module provides the case and diacritic folding behind `--ignore-case`
+and `--fold-diacritics`, and applies the lemmatization of `--lemmatize`.
+
+Text is normalized once per buffer, never per token: a batch of lines is
+joined, folded with `str.casefold` and `str.translate`, single calls that
+run in C, and split back into lines. Every counting function then works
+unchanged on the normalized lines, with a query normalized the same way,
+so "TADEUSZ" and "Tadeusz" are both found as "tadeusz", and "żołnierz" as
+"zolnierz".
+
+Diacritics are removed with a translation table built once from the
+Unicode decomposition of Latin letters ("ż" -> "z", "Ó" -> "O"), which
+also deletes combining marks. Letters whose diacritic is not a combining
+mark, such as the Polish "ł", do not decompose and are listed explicitly.
+
+`str.translate` looks every character of a non-ASCII text up in the
+table, about five times slower than the counting itself. Instead, the
+distinct non-ASCII characters of a buffer are found on its UTF-8 bytes,
+with ASCII bytes deleted by `bytes.translate`, and each of them that is
+in the table is replaced in one `str.replace` pass. A Polish buffer has a
+few dozen such characters.
+
+Lemmatization, see `ptwordfinder.commands.lemmatizer`, comes first, since
+the dictionary holds forms with their diacritics. It turns every batch
+into one line of lemmas.
+"""
+
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import unicodedata
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.lemmatizer import lemmatize_text
+from ptwordfinder.commands.tokenizer import BATCH_LINES
+
+# Latin-1 Supplement, Latin Extended-A and -B, Latin Extended Additional
+_LATIN_RANGES = (range(0x00C0, 0x0250), range(0x1E00, 0x1F00))
+_COMBINING_MARKS = range(0x0300, 0x0370)
+# Letters with a stroke or a bar, which have no decomposition
+_STROKED = dict(zip("łŁđĐøØħĦŧŦƀı", "lLdDoOhHtTbi"))
+_ASCII = bytes(range(128))
+
+
+@lru_cache(maxsize=None)
+def diacritics_table() -> Dict[str, str]:
+    """Return the translation table removing diacritics.
+
+    Returns:
+        dict: Letter -> the letter without diacritics, combining mark ->
+              the empty string.
+    """
+    table: Dict[str, str] = {}
+    for code_points in _LATIN_RANGES:
+        for letter in map(chr, code_points):
+            decomposed = unicodedata.normalize("NFD", letter)
+            base = "".join(
+                char for char in decomposed if not unicodedata.combining(char)
+            )
+            if base != decomposed:
+                table[letter] = base
+    table.update(dict.fromkeys(map(chr, _COMBINING_MARKS), ""))
+    table.update(_STROKED)
+    return table
+
+
+def remove_diacritics(text: str) -> str:
+    """Remove the diacritics of a text with `diacritics_table`.
+
+    Args:
+        text (str): Any text, one word or a whole buffer.
+
+    Returns:
+        str: The text without diacritics.
+    """
+    if text.isascii():
+        return text
+    table = diacritics_table()
+    others = text.encode("utf8", "surrogatepass").translate(None, _ASCII)
+    for char in set(others.decode("utf8", "surrogatepass")):
+        base = table.get(char)
+        if base is not None:
+            text = text.replace(char, base)
+    return text
+
+
+def normalize_text(
+    text: str,
+    ignore_case: bool = False,
+    fold_diacritics: bool = False,
+    lemmas: Optional[str] = None,
+) -> str:
+    """Fold the case and the diacritics of a text.
+
+    Args:
+        text (str): Any text, one word or a whole buffer.
+        ignore_case (bool): Apply `str.casefold`, e.g. "Straße" -> "strasse".
+        fold_diacritics (bool): Remove diacritics, e.g. "Żołnierz" ->
+                                "Zolnierz".
+        lemmas (str, optional): Path of a lemma dictionary, to replace the
+                                words by their lemmas first.
+
+    Returns:
+        str: The normalized text, the text itself when nothing is folded.
+    """
+    if lemmas is not None:
+        text = lemmatize_text(text, lemmas)
+    if ignore_case:
+        text = text.casefold()
+    if fold_diacritics:
+        text = remove_diacritics(text)
+    return text
+
+
+def make_normalizer(
+    ignore_case: bool, fold_diacritics: bool, lemmas: Optional[str] = None
+) -> Callable[[str], str]:
+    """Return a picklable `normalize_text` with the given options."""
+    return partial(
+        normalize_text,
+        ignore_case=ignore_case,
+        fold_diacritics=fold_diacritics,
+        lemmas=lemmas,
+    )
+
+
+def normalize_pattern(
+    pattern: str, ignore_case: bool = False, fold_diacritics: bool = False
+) -> str:
+    """Adapt a regular expression to normalized text.
+
+    Casefolding a pattern would change its escapes ("\\D" to "\\d"), so the
+    pattern is made case-insensitive with `(?i)` instead. Diacritics are
+    removed from it like from the text.
+
+    Args:
+        pattern (str): The regular expression.
+        ignore_case (bool): Match regardless of case.
+        fold_diacritics (bool): Remove diacritics from the pattern.
+
+    Returns:
+        str: The regular expression to match against normalized text.
+    """
+    if fold_diacritics:
+        pattern = remove_diacritics(pattern)
+    if ignore_case:
+        pattern = "(?i)" + pattern
+    return pattern
+
+
+def normalize_lines(
+    normalize: Callable[[str], str], lines: Iterable[str]
+) -> Iterator[str]:
+    """Normalize text lines, one batch of lines at a time.
+
+    Args:
+        normalize (callable): The normalization, e.g. from
+                              `make_normalizer`.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Yields:
+        str: The normalized lines, with their line breaks.
+    """
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, BATCH_LINES))
+        if not batch:
+            return
+        normalized = normalize("".join(batch)).split("\n")
+        last = normalized.pop()
+        yield from [line + "\n" for line in normalized]
+        if last:
+            yield last
+
+
+def count_normalized_in_lines(
+    lines_function, normalize: Callable[[str], str], query, lines
+):
+    """Count a normalized query in normalized text lines.
+
+    Args:
+        lines_function (callable): Counts the query in lines, e.g.
+                                   `count_word_in_lines`.
+        normalize (callable): The normalization of the text.
+        query: The query, already normalized.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        The result of lines_function.
+    """
+    return lines_function(query, normalize_lines(normalize, lines))
+
+
+def count_normalized_in_file(
+    lines_function, normalize: Callable[[str], str], query, searched_file
+):
+    """Count a normalized query in the normalized lines of a file.
+
+    Indexes store the exact tokens, so the file is always read.
+
+    Args:
+        lines_function (callable): Counts the query in lines.
+        normalize (callable): The normalization of the text.
+        query: The query, already normalized.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        The result of lines_function.
+    """
+    with open_text(searched_file) as file:
+        return count_normalized_in_lines(
+            lines_function, normalize, query, file
+        )
@@ -0,0 +1,188 @@
+"""
+This module provides the machine-readable output formats of
+`calculate-words`.
+
+With `--format json`, `csv` or `ndjson`, one record is written per
+searched file as soon as the file is counted, followed by a total record
+when several files are searched. A record holds:
+
+* `file`: the searched file, null (empty in CSV) for the total,
+* `query_type` and `query`: `words_input_file`, `single_word`,
+  `pattern`, `queries`, `phrases`, `ngram` or `top`, and the file name,
+  word, pattern, phrases, N or K,
+* `count`: the number of occurrences, and `counts`, the count of every
+  word with `--per-word`, of every query or phrase, or of the most
+  frequent words or n-grams,
+* `bytes`: the size of the searched files, null for standard input,
+* `duration`: the seconds spent counting.
+
+JSON is written as an array whose items are flushed one by one, NDJSON as
+one object per line and CSV as one row per record, or per word of the
+word list with `--per-word`.
+
+With `--show-matches`, one record is written per hit instead, holding its
+`file`, `line`, `column`, `match` and `context`, see
+`ptwordfinder.commands.matches`.
+"""
+
+from typing import Dict, List, Optional, TextIO
+
+import csv
+import json
+
+FORMATS = ("text", "json", "csv", "ndjson")
+CSV_FIELDS = [
+    "file",
+    "query_type",
+    "query",
+    "word",
+    "count",
+    "bytes",
+    "duration",
+]
+MATCH_FIELDS = ["file", "line", "column", "match", "context"]
+
+
+def build_record(
+    searched_file: Optional[str],
+    result,
+    query_type: str,
+    query: str,
+    per_word: bool,
+    size: Optional[int],
+    duration: float,
+) -> Dict:
+    """Build the record of the count of a query in a file.
+
+    Args:
+        searched_file (str, optional): The searched file, None for the
+                                       total of several files.
+        result (int or dict): The count, or the count of every word.
+        query_type (str): "words_input_file", "single_word", "pattern",
+                          "queries", "phrases", "ngram" or "top".
+        query (str): The words or queries file name, the word, the
+                     pattern, the phrases, the number of words of the
+                     n-grams or the number of most frequent words.
+        per_word (bool): Keep the count of every word.
+        size (int, optional): Bytes searched, None when unknown.
+        duration (float): Seconds spent counting.
+
+    Returns:
+        dict: The record.
+    """
+    record = {
+        "file": searched_file,
+        "query_type": query_type,
+        "query": query,
+        "count": result,
+        "bytes": size,
+        "duration": duration,
+    }
+    if isinstance(result, dict):
+        record["count"] = sum(result.values())
+        if per_word:
+            record["counts"] = result
+    return record
+
+
+class RecordWriter:
+    """Base class of the writers of records to a text stream."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, record: Dict) -> None:
+        """Write one record and flush it to the stream."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish the output, once every record is written."""
+
+
+class NdjsonWriter(RecordWriter):
+    """Write every record as one JSON object per line."""
+
+    def write(self, record: Dict) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class JsonWriter(RecordWriter):
+    """Write records as the items of a JSON array, one item at a time."""
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.separator = "[\n"
+
+    def write(self, record: Dict) -> None:
+        self.stream.write(
+            self.separator + "  " + json.dumps(record, ensure_ascii=False)
+        )
+        self.separator = ",\n"
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.write("[]\n" if self.separator == "[\n" else "\n]\n")
+        self.stream.flush()
+
+
+class CsvWriter(RecordWriter):
+    """Write records as CSV rows, one row per word with `--per-word`."""
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.writer = csv.DictWriter(
+            stream, fieldnames=CSV_FIELDS, lineterminator="\n"
+        )
+        self.writer.writeheader()
+
+    def write(self, record: Dict) -> None:
+        rows: List[Dict] = [
+            {"word": word, **record, "count": count}
+            for word, count in record.get("counts", {}).items()
+        ]
+        rows.append({**record, "word": ""})
+        for row in rows:
+            row.pop("counts", None)
+            if row["file"] is None:
+                row["file"] = ""
+            if row["bytes"] is None:
+                row["bytes"] = ""
+            self.writer.writerow(row)
+        self.stream.flush()
+
+
+class MatchCsvWriter(RecordWriter):
+    """Write the records of hits as CSV rows, one row per hit."""
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.writer = csv.DictWriter(
+            stream, fieldnames=MATCH_FIELDS, lineterminator="\n"
+        )
+        self.writer.writeheader()
+
+    def write(self, record: Dict) -> None:
+        self.writer.writerow(record)
+        self.stream.flush()
+
+
+def make_writer(
+    output_format: str, stream: TextIO, matches: bool = False
+) -> RecordWriter:
+    """Return the record writer of a machine-readable output format.
+
+    Args:
+        output_format (str): "json", "csv" or "ndjson".
+        stream (file): The text stream to write to, e.g. standard output.
+        matches (bool): Write the records of hits, see
+                        `ptwordfinder.commands.matches.Match`, instead of
+                        counts.
+
+    Returns:
+        RecordWriter: The writer.
+    """
+    writers = {"json": JsonWriter, "csv": CsvWriter, "ndjson": NdjsonWriter}
+    if matches:
+        writers["csv"] = MatchCsvWriter
+    return writers[output_format](stream)
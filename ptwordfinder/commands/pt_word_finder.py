@@ -25,13 +25,90 @@ python word_counter.py [--words-input-file FILE] [--single-word WORD] \
                         [--pattern PATTERN] searched_file
 """
 
-from typing import Iterator, List, Set
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Pattern, Set
 
+import io
+import json
+import os
 import sys
 import time
 import re
 import click
 
+from ptwordfinder.commands.aho_corasick import (
+    count_matches_in_file,
+    count_matches_in_lines,
+    load_automaton,
+)
+from ptwordfinder.commands.boundaries import MATCH_MODES, count_bounded
+from ptwordfinder.commands.chunked import count_in_chunks
+from ptwordfinder.commands.compressed import open_text, sniff_codec
+from ptwordfinder.commands.frequency import (
+    count_frequencies_in_file,
+    count_frequencies_in_lines,
+    most_common,
+)
+from ptwordfinder.commands.incremental import count_incrementally
+from ptwordfinder.commands.lemmatizer import (
+    DEFAULT_DICTIONARY,
+    get_lemmatizer,
+)
+from ptwordfinder.commands.matches import (
+    iter_matches,
+    pattern_spans,
+    token_spans,
+    word_spans,
+)
+from ptwordfinder.commands.mmap_engine import (
+    count_each_word_mmap,
+    count_multiple_words_mmap,
+    count_pattern_mmap,
+    count_word_mmap,
+)
+from ptwordfinder.commands.multi_file import (
+    STDIN,
+    count_in_files,
+    expand_searched_paths,
+    merge_counts,
+)
+from ptwordfinder.commands.ngrams import (
+    count_ngrams_in_file,
+    count_ngrams_in_lines,
+    count_phrases_in_file,
+    count_phrases_in_lines,
+)
+from ptwordfinder.commands.normalize import (
+    count_normalized_in_file,
+    count_normalized_in_lines,
+    make_normalizer,
+    normalize_pattern,
+)
+from ptwordfinder.commands.output import FORMATS, build_record, make_writer
+from ptwordfinder.commands.queries import (
+    QuerySet,
+    count_queries_in_file,
+    count_queries_in_lines,
+    parse_queries,
+)
+from ptwordfinder.commands.regex_mode import (
+    compile_pattern,
+    literal_text,
+    time_budget,
+)
+from ptwordfinder.commands.stats import Stats
+from ptwordfinder.commands.stream import count_in_stream
+from ptwordfinder.commands.tokenizer import (  # noqa: F401 (re-exported)
+    BATCH_LINES,
+    non_blank_lines,
+    tokenize_lines,
+)
+from ptwordfinder.commands.vocabulary import Vocabulary
+from ptwordfinder.commands.watch import follow_counts, open_watcher
+from ptwordfinder.commands.word_index import load_fresh_index
+
 
 @click.command()
 @click.option(
@@ -43,9 +120,12 @@ import click
 @click.option(
     "--searched-file",
     "-s",
-    type=click.Path(exists=True),
+    "searched_files",
+    multiple=True,
     required=True,
-    help="Text file to search in",
+    callback=lambda ctx, param, value: expand_searched_paths(value),
+    help="Text file, directory or glob pattern to search in, - for "
+    "standard input (can be repeated)",
 )
 @click.option(
     "--single-word",
@@ -54,11 +134,180 @@ import click
     help="Specific word to count (exclusive to --words-input-file)",
 )
 @click.option("--pattern", "-p", help="Regular expression pattern to match")
+@click.option(
+    "--queries",
+    "queries_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="File of word:, substring: and regex: queries counted in one pass",
+)
+@click.option(
+    "--phrase",
+    "phrases",
+    multiple=True,
+    help="Phrase of words to count, matched across line breaks "
+    "(can be repeated)",
+)
+@click.option(
+    "--ngram",
+    type=click.IntRange(min=1),
+    help="Count sequences of N words: all of them, or the most frequent "
+    "with --top",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    help="Report the K most frequent words instead of counting given ones",
+)
+@click.option(
+    "--top-capacity",
+    type=click.IntRange(min=1),
+    help="With --top or --ngram, track at most N words or n-grams with "
+    "the Space-Saving algorithm instead of counting all exactly",
+)
+@click.option(
+    "--per-word",
+    is_flag=True,
+    help="Report the count of every word from --words-input-file",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes used to search files, a single large file "
+    "is split into ranges",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["lines", "mmap"]),
+    default="lines",
+    show_default=True,
+    help="Counting engine: decoded line iteration or memory-mapped bytes",
+)
+@click.option(
+    "--aho-corasick",
+    is_flag=True,
+    help="Match --words-input-file entries (substrings or phrases) with an "
+    "Aho-Corasick automaton",
+)
+@click.option(
+    "--match",
+    type=click.Choice(MATCH_MODES),
+    default="substring",
+    show_default=True,
+    help="With --single-word or --aho-corasick, count any occurrence, "
+    "whole words only, or words starting or ending with it",
+)
+@click.option(
+    "--literal",
+    is_flag=True,
+    help="Match --pattern as plain text instead of a regular expression",
+)
+@click.option(
+    "--ignore-case",
+    is_flag=True,
+    help="Match regardless of case, casefolding the text and the query",
+)
+@click.option(
+    "--fold-diacritics",
+    is_flag=True,
+    help="Match regardless of diacritics, so zolnierz finds żołnierz",
+)
+@click.option(
+    "--lemmatize",
+    is_flag=True,
+    help="Count words by their lemma, so dom also finds domu and domem",
+)
+@click.option(
+    "--lemma-dictionary",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Tab separated file of word forms and lemmas used by --lemmatize "
+    "instead of the bundled Polish one",
+)
+@click.option(
+    "--whole-buffer",
+    is_flag=True,
+    help="Match --pattern against whole files, so matches can span lines",
+)
+@click.option(
+    "--regex-timeout",
+    type=click.FloatRange(min=0),
+    default=60.0,
+    show_default=True,
+    help="Seconds allowed to match --pattern in one file, 0 for no limit",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only count what was appended to searched files since the last "
+    "run, from a stored checkpoint",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and print counts again as searched files grow, "
+    "implies --incremental",
+)
+@click.option(
+    "--show-matches",
+    is_flag=True,
+    help="List the file, line, column and context of every hit as it is "
+    "found, instead of counting",
+)
+@click.option(
+    "--max-matches",
+    type=click.IntRange(min=1),
+    help="With --show-matches, stop reading after N hits",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    help="Print timings of every phase and throughput as JSON on stderr",
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write a cProfile dump of the counting to this file",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(FORMATS),
+    default="text",
+    show_default=True,
+    help="Print sentences, or one JSON, CSV or NDJSON record per file",
+)
 def calculate_words(
     words_input_file: click.File,
-    searched_file: str,
+    searched_files: List[str],
     single_word: str,
     pattern: str,
+    queries_file: Optional[str],
+    phrases: List[str],
+    ngram: Optional[int],
+    top: Optional[int],
+    top_capacity: Optional[int],
+    per_word: bool,
+    jobs: int,
+    engine: str,
+    aho_corasick: bool,
+    match: str,
+    literal: bool,
+    ignore_case: bool,
+    fold_diacritics: bool,
+    lemmatize: bool,
+    lemma_dictionary: Optional[str],
+    whole_buffer: bool,
+    regex_timeout: float,
+    incremental: bool,
+    watch: bool,
+    show_matches: bool,
+    max_matches: Optional[int],
+    show_stats: bool,
+    profile: Optional[str],
+    output_format: str,
 ) -> None:
     """
     Count the occurrence of words in a text file.
@@ -66,22 +315,142 @@ def calculate_words(
     Args:
         words_input_file (file, optional): File containing words to search for.
                                            Defaults to None.
-        searched_file (str): Path to the text file to search in. Required.
+        searched_files (list): Paths to the text files to search in,
+                               expanded from files, directories and glob
+                               patterns. `-` reads standard input in
+                               blocks of whole lines. Required.
         single_word (str, optional): Specific word to count. Defaults to None.
         pattern (str, optional): Regular expression pattern to match.
                                  Defaults to None.
+        queries_file (str, optional): File of typed queries, one
+                                      `word:`, `substring:` or `regex:`
+                                      query per line, all counted in a
+                                      single pass. Words from
+                                      words_input_file, single_word and
+                                      pattern are added to them.
+                                      Defaults to None.
+        phrases (list, optional): Phrases of words to count on the token
+                                  stream, across line breaks, see
+                                  `ptwordfinder.commands.ngrams`.
+                                  Defaults to none.
+        ngram (int, optional): Count every sequence of N words and report
+                               them all, or the K most frequent ones with
+                               top. Defaults to None.
+        top (int, optional): Count every word, or every N-gram with
+                             ngram, and report the K most frequent ones,
+                             see `ptwordfinder.commands.frequency`.
+                             Defaults to None.
+        top_capacity (int, optional): Count approximately, tracking at
+                                      most this many words or n-grams,
+                                      for tables too large for memory.
+                                      Counts are then upper bounds.
+                                      Defaults to None, exact counts.
+        per_word (bool, optional): Print the count of every word from
+                                   words_input_file before the total.
+                                   Defaults to False.
+        jobs (int, optional): Number of worker processes. Several files are
+                              searched concurrently, a single large file is
+                              split into line aligned ranges. Defaults to 1.
+        engine (str, optional): "lines" iterates over decoded lines, "mmap"
+                                counts on the memory-mapped bytes of each
+                                file. Defaults to "lines".
+        aho_corasick (bool, optional): Find every entry of words_input_file,
+                                       phrases and substrings included, in
+                                       one pass with an Aho-Corasick
+                                       automaton. Defaults to False.
+        match (str, optional): "substring" counts every occurrence of
+                               single_word or found by the automaton,
+                               "whole" only those not surrounded by
+                               alphanumerical characters. "prefix" and
+                               "suffix" count single_word at the start or
+                               the end of words, see
+                               `ptwordfinder.commands.boundaries`.
+                               Defaults to "substring".
+        literal (bool, optional): Escape pattern and match it as plain text.
+                                  Defaults to False.
+        ignore_case (bool, optional): Casefold the searched text and the
+                                      query, so "TADEUSZ" and "Tadeusz"
+                                      are both counted for "tadeusz".
+                                      Defaults to False.
+        fold_diacritics (bool, optional): Remove diacritics from the
+                                          searched text and the query, so
+                                          "zolnierz" finds "żołnierz", see
+                                          `ptwordfinder.commands.normalize`.
+                                          Defaults to False.
+        lemmatize (bool, optional): Replace every word of the searched
+                                    text and of the query by its lemma,
+                                    from a dictionary of word forms, see
+                                    `ptwordfinder.commands.lemmatizer`.
+                                    Defaults to False.
+        lemma_dictionary (str, optional): Path of the dictionary used by
+                                          lemmatize, which it implies.
+                                          Defaults to None, the bundled
+                                          Polish dictionary.
+        whole_buffer (bool, optional): Match pattern against the whole
+                                       content of each file instead of line
+                                       by line. Defaults to False.
+        regex_timeout (float, optional): Seconds allowed to match pattern in
+                                         one file, 0 for no limit.
+                                         Defaults to 60.
+        incremental (bool, optional): Store a checkpoint of the counts of
+                                      every searched file and only read
+                                      the lines appended since, see
+                                      `ptwordfinder.commands.incremental`.
+                                      Defaults to False.
+        watch (bool, optional): After the first count, wait for searched
+                                files to change, with inotify or by
+                                polling, and print their counts again
+                                whenever they change, until interrupted.
+                                Implies incremental. Defaults to False.
+        show_matches (bool, optional): Print every hit of single_word,
+                                       words_input_file or pattern with
+                                       its file, line, column and
+                                       context, as soon as it is found,
+                                       instead of the counts, see
+                                       `ptwordfinder.commands.matches`.
+                                       Files are read one after another
+                                       in this process. Defaults to False.
+        max_matches (int, optional): Stop reading the searched files once
+                                     this many hits were printed.
+                                     Defaults to None, every hit.
+        show_stats (bool, optional): Print the time spent opening, reading,
+                                     tokenizing, matching and printing,
+                                     with bytes, lines and tokens per
+                                     second, as JSON on stderr.
+                                     Defaults to False.
+        profile (str, optional): Path of a pstats file to dump a cProfile
+                                 profile of the counting to.
+                                 Defaults to None.
+        output_format (str, optional): "text" prints sentences, "json",
+                                       "csv" and "ndjson" print one record
+                                       per file as soon as it is counted,
+                                       see `ptwordfinder.commands.output`.
+                                       Defaults to "text".
 
     Note:
-        --words-input-file and --single-word are mutually exclusive.
-        At least one of --words-input-file, --single-word,
-        or --pattern must be provided.
+        --words-input-file and --single-word are mutually exclusive,
+        unless --queries is given.
+        At least one of --words-input-file, --single-word, --pattern,
+        --queries, --phrase, --ngram or --top must be provided. --phrase,
+        and --top with --ngram, cannot be combined with the others.
+        --ignore-case and --fold-diacritics cannot be combined with
+        --queries, --whole-buffer or --engine mmap. --match requires
+        --single-word, or --aho-corasick with substring or whole.
+        --lemmatize cannot be combined with --pattern, --queries or
+        --match either, and a --single-word must then be one word.
+        --show-matches only lists hits of --words-input-file,
+        --single-word and --pattern, line by line and without
+        normalization, and --max-matches requires it.
     """
 
     op1 = "--words-input-file"
     op2 = "--single-word"
     op3 = "--pattern"
 
-    if words_input_file and single_word:
+    op4 = "--queries"
+    op5 = "--top"
+
+    if words_input_file and single_word and not queries_file:
 
         click.echo(
             f"Error: {op1} and {op2} are mutually exclusive.",
@@ -89,41 +458,703 @@ def calculate_words(
         )
         sys.exit(1)
 
-    if not (words_input_file or single_word or pattern):
+    op6 = "--phrase"
+    op7 = "--ngram"
+
+    queried = words_input_file or single_word or pattern or queries_file
+    if not (queried or phrases or ngram or top):
         click.echo(
-            f"Error: At least one of {op1}, {op2}, or {op3} must be provided.",
+            f"Error: At least one of {op1}, {op2}, {op3}, {op4}, {op6}, "
+            f"{op7}, or {op5} must be provided.",
             err=True,
         )
         sys.exit(1)
 
-    start_time = time.time()
+    if (ngram or top) and (queried or phrases):
+        click.echo(
+            f"Error: {op5} and {op7} cannot be combined with {op1}, {op2}, "
+            f"{op3}, {op4} or {op6}.",
+            err=True,
+        )
+        sys.exit(1)
 
-    if words_input_file:
+    if phrases and queried:
+        click.echo(
+            f"Error: {op6} cannot be combined with {op1}, {op2}, {op3} or "
+            f"{op4}.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if top_capacity and not (top or ngram):
+        click.echo(
+            f"Error: --top-capacity requires {op5} or {op7}.", err=True
+        )
+        sys.exit(1)
+
+    # Phrases and n-grams span lines, so files are never split
+    spanning = bool(phrases or ngram)
+    if spanning and (incremental or watch):
+        click.echo(
+            f"Error: {op6} and {op7} cannot be combined with --incremental "
+            "or --watch.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if aho_corasick and not words_input_file:
+        click.echo(f"Error: --aho-corasick requires {op1}.", err=True)
+        sys.exit(1)
+
+    if per_word and not words_input_file:
+        click.echo(f"Error: --per-word requires {op1}.", err=True)
+        sys.exit(1)
+
+    if whole_buffer and not pattern:
+        click.echo(f"Error: --whole-buffer requires {op3}.", err=True)
+        sys.exit(1)
+
+    if literal and not pattern:
+        click.echo(f"Error: --literal requires {op3}.", err=True)
+        sys.exit(1)
+
+    if match != "substring" and (
+        queries_file or not (single_word or aho_corasick)
+    ):
+        click.echo(
+            f"Error: --match requires {op2} or --aho-corasick, without "
+            f"{op4}.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if aho_corasick and match not in ("substring", "whole"):
+        click.echo(
+            f"Error: --aho-corasick cannot be combined with --match {match}.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if queries_file and (aho_corasick or whole_buffer):
+        click.echo(
+            f"Error: {op4} cannot be combined with --aho-corasick or "
+            "--whole-buffer.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if (incremental or watch) and (whole_buffer or engine == "mmap"):
+        click.echo(
+            "Error: --incremental and --watch cannot be combined with "
+            "--whole-buffer or --engine mmap.",
+            err=True,
+        )
+        sys.exit(1)
+
+    lemmatize = lemmatize or bool(lemma_dictionary)
+    if lemmatize and (pattern or queries_file or match != "substring"):
+        click.echo(
+            f"Error: --lemmatize cannot be combined with {op3}, {op4} or "
+            "--match.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if lemmatize and single_word and len(single_word.split()) > 1:
+        click.echo(
+            f"Error: {op2} must be one word with --lemmatize, count "
+            f"'{single_word}' with {op6} instead.",
+            err=True,
+        )
+        sys.exit(1)
+
+    normalizing = ignore_case or fold_diacritics or lemmatize
+    if normalizing and (queries_file or whole_buffer or engine == "mmap"):
+        click.echo(
+            "Error: --ignore-case, --fold-diacritics and --lemmatize cannot "
+            f"be combined with {op4}, --whole-buffer or --engine mmap.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if max_matches and not show_matches:
+        click.echo("Error: --max-matches requires --show-matches.", err=True)
+        sys.exit(1)
+
+    if show_matches and (
+        queries_file
+        or phrases
+        or ngram
+        or top
+        or aho_corasick
+        or whole_buffer
+        or incremental
+        or watch
+        or normalizing
+    ):
+        click.echo(
+            f"Error: --show-matches cannot be combined with {op4}, {op6}, "
+            f"{op7}, {op5}, --aho-corasick, --whole-buffer, --incremental, "
+            "--watch, --ignore-case, --fold-diacritics or --lemmatize.",
+            err=True,
+        )
+        sys.exit(1)
+
+    lemmas = None
+    if lemmatize:
+        lemmas = lemma_dictionary or DEFAULT_DICTIONARY
+        try:
+            get_lemmatizer(lemmas)
+        except (OSError, ValueError) as error:
+            click.echo(f"Error: Invalid lemma dictionary: {error}", err=True)
+            sys.exit(1)
+
+    if watch and STDIN in searched_files:
+        click.echo("Error: --watch cannot read standard input.", err=True)
+        sys.exit(1)
+    incremental = incremental or watch
+
+    if whole_buffer and STDIN in searched_files:
+        click.echo(
+            "Error: --whole-buffer cannot read standard input.", err=True
+        )
+        sys.exit(1)
+
+    start_time = time.perf_counter_ns()
+
+    timeout = regex_timeout or None
+    # Queries are normalized like the searched text, a no-op by default
+    normalize = make_normalizer(ignore_case, fold_diacritics, lemmas)
+    if ngram:
+        # Count every n-gram, exactly or within a bounded memory
+        count_function, query = count_ngrams_in_file, (ngram, top_capacity)
+        lines_function = count_ngrams_in_lines
+    elif top:
+        # Count every word, exactly or within a bounded memory
+        count_function, query = count_frequencies_in_file, top_capacity
+        lines_function = count_frequencies_in_lines
+    elif phrases:
+        # Count phrases on the token stream
+        query = [normalize(phrase) for phrase in phrases]
+        count_function = count_phrases_in_file
+        lines_function = count_phrases_in_lines
+    elif queries_file:
+        # Count all typed queries in a single pass
+        try:
+            query = _load_queries(
+                queries_file, words_input_file, single_word, pattern, literal
+            )
+        except (ValueError, re.error) as error:
+            click.echo(
+                f"Error: Invalid {op4} '{queries_file}': {error}", err=True
+            )
+            sys.exit(1)
+        count_function = partial(count_queries_in_file, timeout=timeout)
+        lines_function = partial(count_queries_in_lines, timeout=timeout)
+    elif words_input_file:
         # Process list of words
         with open(words_input_file.name, "r", encoding="utf8") as file:
-            word_list = [elt.strip() for elt in file.readlines()]
-            words = set(word_list)
-            counter = count_multiple_words_in_file(words, searched_file)
-            file1 = words_input_file.name
-            file2 = searched_file
-        print(f"Found {counter} matching words from '{file1}' in '{file2}'.")
-
+            word_list = [normalize(elt.strip()) for elt in file.readlines()]
+        if aho_corasick:
+            query = load_automaton(word_list)
+            whole_words = match == "whole"
+            count_function = partial(
+                count_matches_in_file, whole_words=whole_words
+            )
+            lines_function = partial(
+                count_matches_in_lines, whole_words=whole_words
+            )
+        elif per_word:
+            count_function, query = count_each_word_in_file, word_list
+            lines_function = count_each_word_in_lines
+        else:
+            count_function = count_multiple_words_in_file
+            query = set(word_list)
+            lines_function = count_multiple_words_in_lines
+    elif single_word and lemmatize:
+        # The lemma of one word is a whole word, counted like a word list
+        count_function = count_multiple_words_in_file
+        query = set(normalize(single_word).split())
+        lines_function = count_multiple_words_in_lines
     elif single_word:
         # Count specific word
-        counter = count_word_in_file(single_word, searched_file)
-        print(f"Found '{single_word}' {counter} times in '{searched_file}'.")
-
+        count_function, query = count_word_in_file, normalize(single_word)
+        lines_function = count_word_in_lines
+        if match != "substring":
+            count_function = partial(count_word_in_file, match=match)
+            lines_function = partial(count_word_in_lines, match=match)
+    elif literal:
+        # Match escaped pattern
+        count_function, query = count_pattern_in_file, normalize(pattern)
+        lines_function = count_pattern_in_lines
     else:
         # Match regular expression pattern
-        c = count_pattern_in_file(pattern, searched_file)
-        with open(searched_file, "r", encoding="utf8") as f:
-            print(f"Found {c} matches for pattern '{pattern}' in '{f.name}'.")
+        try:
+            compile_pattern(pattern)
+        except (ValueError, re.error) as error:
+            click.echo(f"Error: Invalid {op3} '{pattern}': {error}", err=True)
+            sys.exit(1)
+        count_function = partial(
+            count_regex_in_file, whole_buffer=whole_buffer, timeout=timeout
+        )
+        query = normalize_pattern(pattern, ignore_case, fold_diacritics)
+        lines_function = partial(count_regex_in_lines, timeout=timeout)
 
-    stop_time = time.time()
-    elapsed_time = stop_time - start_time
+    if show_matches:
+        # List the hits of the same query instead of counting them, only
+        # regular expressions need a time budget
+        match_timeout = None
+        if words_input_file:
+            spans, query = token_spans, set(word_list)
+        elif single_word:
+            spans = partial(word_spans, match=match)
+        elif literal:
+            # Escaped text needs no complexity check, whatever its length
+            spans = pattern_spans
+            query = re.compile(sanitize_pattern(pattern))
+        else:
+            spans, query = pattern_spans, compile_pattern(pattern)
+            match_timeout = timeout
+        _show_matches(
+            spans,
+            query,
+            searched_files,
+            max_matches,
+            match_timeout,
+            output_format,
+            start_time,
+        )
+        return
+
+    if normalizing:
+        # Normalize every buffer of lines before counting in it
+        count_function = partial(
+            count_normalized_in_file, lines_function, normalize
+        )
+        lines_function = partial(
+            count_normalized_in_lines, lines_function, normalize
+        )
+    if engine == "mmap":
+        count_function = {
+            count_each_word_in_file: count_each_word_mmap,
+            count_multiple_words_in_file: count_multiple_words_mmap,
+            count_word_in_file: count_word_mmap,
+            count_pattern_in_file: count_pattern_mmap,
+        }.get(count_function, count_function)
+        if single_word and match != "substring":
+            count_function = partial(count_word_mmap, match=match)
+    if incremental:
+        count_function = partial(count_incrementally, lines_function)
+
+    def report(result, where: str) -> None:
+        if ngram or top:
+            lines = format_top_report(result, where, top)
+        elif phrases:
+            lines = format_counts_report(result, where)
+        elif queries_file:
+            lines = format_queries_report(result, where)
+        else:
+            lines = format_report(
+                result,
+                where,
+                words_source=words_input_file
+                and f"'{words_input_file.name}'",
+                single_word=single_word,
+                pattern=pattern,
+                per_word=per_word,
+            )
+        for line in lines:
+            print(line)
+
+    if ngram:
+        query_type, query_text = "ngram", str(ngram)
+    elif top:
+        query_type, query_text = "top", str(top)
+    elif phrases:
+        query_type, query_text = "phrases", ", ".join(phrases)
+    elif queries_file:
+        query_type, query_text = "queries", queries_file
+    elif words_input_file:
+        query_type, query_text = "words_input_file", words_input_file.name
+    elif single_word:
+        query_type, query_text = "single_word", single_word
+    else:
+        query_type, query_text = "pattern", pattern
+    writer = None
+    if output_format != "text":
+        writer = make_writer(output_format, sys.stdout)
+
+    def write(searched_file, result, size, duration_ns) -> None:
+        if ngram or top:
+            result = most_common(result, top or len(result))
+        writer.write(
+            build_record(
+                searched_file,
+                result,
+                query_type,
+                query_text,
+                per_word or bool(queries_file or phrases or ngram or top),
+                size,
+                duration_ns / 1e9,
+            )
+        )
+
+    stats = Stats()
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    count_start = time.perf_counter_ns()
+    try:
+        with stats.activate() if show_stats else nullcontext():
+            if profiler is not None:
+                profiler.enable()
+            results = _count_results(
+                count_function,
+                lines_function,
+                query,
+                searched_files,
+                jobs,
+                chunked=engine == "lines"
+                and not whole_buffer
+                and not incremental,
+                spanning=spanning,
+            )
+            total = None
+            file_results = {}
+            undecodable = []
+            for searched_file, result, duration_ns in results:
+                if isinstance(result, UnicodeDecodeError):
+                    click.echo(
+                        f"Error: '{searched_file}' is not UTF-8 text "
+                        f"({result.reason}).",
+                        err=True,
+                    )
+                    undecodable.append(searched_file)
+                    continue
+                with stats.phase("output"):
+                    if writer is None:
+                        report(result, f"'{searched_file}'")
+                    else:
+                        size = _searched_size(searched_file)
+                        write(searched_file, result, size, duration_ns)
+                total = merge_counts(total, result)
+                file_results[searched_file] = result
+            if profiler is not None:
+                profiler.disable()
+    except (ImportError, TimeoutError) as error:
+        click.echo(f"Error: {error}", err=True)
+        sys.exit(1)
+    count_ns = (
+        time.perf_counter_ns() - count_start - stats.phases_ns["output"]
+    )
+
+    with stats.phase("output"):
+        # The total leaves out the files that could not be decoded
+        several = len(searched_files) > 1 and total is not None
+        if writer is not None:
+            if several:
+                sizes = [_searched_size(path) for path in file_results]
+                size = None if None in sizes else sum(sizes)
+                write(None, total, size, count_ns)
+        else:
+            if several:
+                report(total, f"{len(searched_files)} files")
+
+            elapsed_time = (time.perf_counter_ns() - start_time) / 1e9
+            print(f"Time elapsed: {elapsed_time:.1f} seconds")
+
+    if watch:
+        sys.stdout.flush()
+        try:
+            with open_watcher(searched_files) as watcher:
+                for searched_file, result, duration_ns in follow_counts(
+                    count_function, query, file_results, watcher
+                ):
+                    total = None
+                    for file_result in file_results.values():
+                        total = merge_counts(total, file_result)
+                    if writer is None:
+                        report(result, f"'{searched_file}'")
+                        if len(searched_files) > 1:
+                            report(total, f"{len(searched_files)} files")
+                    else:
+                        size = _searched_size(searched_file)
+                        write(searched_file, result, size, duration_ns)
+                    sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+    if writer is not None:
+        writer.close()
+
+    if profiler is not None:
+        profiler.dump_stats(profile)
+    if show_stats:
+        total_ns = time.perf_counter_ns() - start_time
+        click.echo(json.dumps(stats.report(count_ns, total_ns)), err=True)
+    if undecodable:
+        sys.exit(1)
+
+
+def _show_matches(
+    spans,
+    query,
+    searched_files,
+    max_matches,
+    timeout,
+    output_format,
+    start_time,
+):
+    """Print the hits of a query as they are found, at most max_matches.
+
+    Hits are printed like `grep -n --column`, or written as records with
+    a machine-readable output format, followed by the number of hits.
+    Every hit is flushed at once, so it shows up even through a pipe.
+    """
+    matches = iter_matches(spans, query, searched_files, timeout)
+    writer = None
+    if output_format != "text":
+        writer = make_writer(output_format, sys.stdout, matches=True)
+    shown = 0
+    try:
+        for hit in islice(matches, max_matches):
+            if writer is None:
+                print(hit, flush=True)
+            else:
+                writer.write(hit.as_record())
+            shown += 1
+    except (ImportError, TimeoutError) as error:
+        click.echo(f"Error: {error}", err=True)
+        sys.exit(1)
+    except UnicodeDecodeError as error:
+        click.echo(
+            f"Error: A searched file is not UTF-8 text ({error.reason}).",
+            err=True,
+        )
+        sys.exit(1)
+    finally:
+        # Stop reading, the last searched file is closed
+        matches.close()
+    if writer is not None:
+        writer.close()
+        return
+    where = f"'{searched_files[0]}'"
+    if len(searched_files) > 1:
+        where = f"{len(searched_files)} files"
+    print(f"Showed {shown} matches in {where}.")
+    elapsed_time = (time.perf_counter_ns() - start_time) / 1e9
     print(f"Time elapsed: {elapsed_time:.1f} seconds")
 
 
+def _count_results(
+    count_function,
+    lines_function,
+    query,
+    searched_files,
+    jobs,
+    chunked,
+    spanning=False,
+):
+    """Yield the result and counting time of every searched file.
+
+    Matches that span lines (`spanning`) are counted on whole files and on
+    the whole of standard input instead of blocks or ranges of lines. The
+    result of a file that is not UTF-8 text is its `UnicodeDecodeError`.
+    """
+    if STDIN in searched_files:
+        # Standard input is read in blocks, other files one at a time
+        for searched_file in searched_files:
+            start = time.perf_counter_ns()
+            try:
+                if searched_file == STDIN and spanning:
+                    stream = io.TextIOWrapper(
+                        sys.stdin.buffer, encoding="utf8"
+                    )
+                    try:
+                        result = lines_function(query, stream)
+                    finally:
+                        # Keep standard input open once the wrapper is
+                        # collected
+                        stream.detach()
+                elif searched_file == STDIN:
+                    stream = sys.stdin.buffer
+                    result = count_in_stream(lines_function, query, stream)
+                else:
+                    result = count_function(query, searched_file)
+            except UnicodeDecodeError as error:
+                result = error
+            yield searched_file, result, time.perf_counter_ns() - start
+    elif (
+        len(searched_files) == 1
+        and jobs > 1
+        and chunked
+        and not spanning
+        and sniff_codec(searched_files[0]) is None
+        and load_fresh_index(searched_files[0]) is None
+    ):
+        # A single file is split into line aligned ranges instead
+        searched_file = searched_files[0]
+        start = time.perf_counter_ns()
+        try:
+            result = count_in_chunks(
+                lines_function, query, searched_file, jobs
+            )
+        except UnicodeDecodeError as error:
+            result = error
+        yield searched_file, result, time.perf_counter_ns() - start
+    else:
+        timed_function = partial(_timed_count, count_function)
+        for searched_file, (result, duration_ns) in count_in_files(
+            timed_function, query, searched_files, jobs
+        ):
+            yield searched_file, result, duration_ns
+
+
+def _timed_count(count_function, query, searched_file):
+    """Count in a file and measure how long it takes, in nanoseconds.
+
+    A file that is not UTF-8 text gives its `UnicodeDecodeError` as the
+    result, so the other files are still counted.
+    """
+    start = time.perf_counter_ns()
+    try:
+        result = count_function(query, searched_file)
+    except UnicodeDecodeError as error:
+        result = error
+    return result, time.perf_counter_ns() - start
+
+
+def _searched_size(searched_file: str) -> Optional[int]:
+    """Return the size of a searched file, None for standard input."""
+    if searched_file == STDIN:
+        return None
+    return os.path.getsize(searched_file)
+
+
+def _load_queries(
+    queries_file, words_input_file, single_word, pattern, literal
+) -> QuerySet:
+    """Parse a queries file and add the queries of the other options."""
+    with open(queries_file, "r", encoding="utf8") as file:
+        queries = parse_queries(file)
+    if words_input_file:
+        with open(words_input_file.name, "r", encoding="utf8") as file:
+            for word in file:
+                if word.strip():
+                    queries.add("word", word.strip())
+    if single_word:
+        queries.add("substring", single_word)
+    if pattern:
+        queries.add("substring" if literal else "regex", pattern)
+    return queries
+
+
+def format_report(
+    result,
+    where: str,
+    words_source: Optional[str] = None,
+    single_word: Optional[str] = None,
+    pattern: Optional[str] = None,
+    per_word: bool = False,
+) -> List[str]:
+    """
+    Format the lines reporting the count of a query.
+
+    Args:
+        result (int or dict): The count, or the count of every word of a
+                              word list.
+        where (str): Where the occurrences were found, e.g. "'file.txt'"
+                     or "3 files".
+        words_source (str, optional): Where the word list comes from, for
+                                      word list queries.
+        single_word (str, optional): The counted word, for single word
+                                     queries.
+        pattern (str, optional): The matched pattern, for pattern queries.
+        per_word (bool, optional): Report the count of every word of a
+                                   word list before the total.
+
+    Returns:
+        list: The report lines, as printed by `calculate_words`.
+    """
+    if words_source:
+        lines = []
+        if isinstance(result, dict):
+            if per_word:
+                for word, count in result.items():
+                    lines.append(f"Found '{word}' {count} times in {where}.")
+            result = sum(result.values())
+        lines.append(
+            f"Found {result} matching words from {words_source} in {where}."
+        )
+        return lines
+    if single_word:
+        return [f"Found '{single_word}' {result} times in {where}."]
+    return [f"Found {result} matches for pattern '{pattern}' in {where}."]
+
+
+def format_queries_report(result: Dict[str, int], where: str) -> List[str]:
+    """
+    Format the lines reporting the counts of typed queries.
+
+    Args:
+        result (dict): The count of every query, keyed by `type:value`.
+        where (str): Where the occurrences were found.
+
+    Returns:
+        list: One report line per query, worded like the line of the
+              matching single query option. Word queries are told apart
+              from substring queries.
+    """
+    lines = []
+    for label, count in result.items():
+        query_type, _, value = label.partition(":")
+        if query_type == "regex":
+            line = f"Found {count} matches for pattern '{value}' in {where}."
+        elif query_type == "word":
+            line = f"Found word '{value}' {count} times in {where}."
+        else:
+            line = f"Found '{value}' {count} times in {where}."
+        lines.append(line)
+    return lines
+
+
+def format_counts_report(result: Dict[str, int], where: str) -> List[str]:
+    """
+    Format the lines reporting the count of every word or phrase.
+
+    Args:
+        result (dict): The count of every word or phrase.
+        where (str): Where the occurrences were found.
+
+    Returns:
+        list: One report line per word or phrase, in the order of result.
+    """
+    return [
+        f"Found '{word}' {count} times in {where}."
+        for word, count in result.items()
+    ]
+
+
+def format_top_report(
+    result: Dict[str, int], where: str, top: Optional[int]
+) -> List[str]:
+    """
+    Format the lines reporting the most frequent words or n-grams.
+
+    Args:
+        result (dict): The count of every word or n-gram.
+        where (str): Where the occurrences were found.
+        top (int, optional): The number of words to report, None for all.
+
+    Returns:
+        list: One report line per word, most frequent first.
+    """
+    return format_counts_report(
+        most_common(result, top or len(result)), where
+    )
+
+
 def count_multiple_words_in_file(words: Set[str], searched_file: str) -> int:
     """
     Count the occurrences of words from a given word set in a text file.
@@ -144,38 +1175,104 @@ def count_multiple_words_in_file(words: Set[str], searched_file: str) -> int:
         from the file.
         The function returns the total count of occurrences of words
         from 'words' in the file.
+        A fresh index built with `ptwordf index build` is used instead
+        of reading the file when available.
     """
 
-    counter = 0
-    with open(searched_file, "r", encoding="utf8") as file:
-        for line in non_blank_lines(file):
-            for word in line:
-                if word in words:
-                    counter += 1
-    return counter
+    return sum(count_each_word_in_file(words, searched_file).values())
+
+
+def count_each_word_in_file(
+    words: Iterable[str], searched_file: str
+) -> Dict[str, int]:
+    """
+    Count the occurrences of every word from a word list in a single pass.
+
+    Args:
+        words (iterable): The words to search for. Duplicates are counted
+                          once.
+        searched_file (str): The path to the text file to search in.
+
+    Returns:
+        dict: A mapping of each word to its count of occurrences, in the
+              order the words were first given. Words that do not occur
+              map to 0, and the total is the sum of the values.
+    """
+
+    counts = dict.fromkeys(words, 0)
+
+    index = load_fresh_index(searched_file)
+    if index is not None:
+        for word in counts:
+            counts[word] = index.term_counts.get(word, 0)
+        return counts
+
+    with open_text(searched_file) as file:
+        return count_each_word_in_lines(counts, file)
+
+
+def count_each_word_in_lines(
+    words: Iterable[str], lines: Iterable[str]
+) -> Dict[str, int]:
+    """
+    Count the occurrences of every word from a word list in text lines.
+
+    Args:
+        words (iterable): The words to search for.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        dict: A mapping of each word to its count of occurrences.
+    """
+    vocabulary = Vocabulary(words)
+    for tokens in tokenize_lines(lines):
+        vocabulary.update_known(tokens)
+    return vocabulary.as_dict()
+
+
+def count_multiple_words_in_lines(
+    words: Set[str], lines: Iterable[str]
+) -> int:
+    """
+    Count the occurrences of words from a given word set in text lines.
+
+    Args:
+        words (set): A set containing the words to search for.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        int: The total count of occurrences of words from the word set.
+    """
+    return sum(count_each_word_in_lines(words, lines).values())
 
 
-def count_word_in_file(word: str, searched_file: str) -> int:
+def count_word_in_file(
+    word: str, searched_file: str, match: str = "substring"
+) -> int:
     """Count how many times a word appears in a file.
 
     Args:
         word (str): The word to search for.
         searched_file (str): The path to the file to search in.
+        match (str, optional): "substring" counts every occurrence,
+                               "whole", "prefix" and "suffix" only those at
+                               word boundaries, see
+                               `ptwordfinder.commands.boundaries`.
+                               Defaults to "substring".
 
     Returns:
         int: The count of occurrences of the word in the file.
     """
+    index = load_fresh_index(searched_file)
+    if index is not None:
+        count = index.count_substring(word, match)
+        if count is not None:
+            return count
+
     try:
-        count = 0
         # Open the file in read mode
-        with open(searched_file, "r", encoding="utf8") as file:
-            # Read the file line by line
-            for line in file:
-                # Count occurrences of the word in the line
-                count += line.count(word)
-
-        # Print the count of occurrences
-        return count
+        with open_text(searched_file) as file:
+            return count_word_in_lines(word, file, match)
 
     except FileNotFoundError:
         # If the file is not found,
@@ -184,6 +1281,39 @@ def count_word_in_file(word: str, searched_file: str) -> int:
         raise
 
 
+def count_word_in_lines(
+    word: str, lines: Iterable[str], match: str = "substring"
+) -> int:
+    """Count how many times a word appears in text lines.
+
+    Args:
+        word (str): The word to search for.
+        lines (iterable): Lines of text, e.g. an opened text file.
+        match (str, optional): "substring", or "whole", "prefix" or
+                               "suffix" to count occurrences at word
+                               boundaries only. Defaults to "substring".
+
+    Returns:
+        int: The count of occurrences of the word in the lines.
+    """
+    if match != "substring":
+        # Whole batches of lines are scanned at once, line breaks are
+        # word boundaries
+        lines = iter(lines)
+        count = 0
+        while True:
+            batch = list(islice(lines, BATCH_LINES))
+            if not batch:
+                return count
+            count += count_bounded(word, "\n".join(batch), match)
+    count = 0
+    # Read the text line by line
+    for line in lines:
+        # Count occurrences of the word in the line
+        count += line.count(word)
+    return count
+
+
 def count_pattern_in_file(pattern: str, searched_file: str) -> int:
     """Counts occurrences of a pattern in a file, considering non-blank lines.
 
@@ -194,41 +1324,108 @@ def count_pattern_in_file(pattern: str, searched_file: str) -> int:
     Returns:
         int: The number of occurrences of the pattern in the file.
     """
+    index = load_fresh_index(searched_file)
+    if index is not None and isinstance(pattern, str):
+        # The sanitized pattern is a literal, so it is a substring count
+        count = index.count_substring(pattern)
+        if count is not None:
+            return count
+
     sanitized_pattern = sanitize_pattern(pattern)
+    with open_text(searched_file) as file:
+        return _count_sanitized_pattern(sanitized_pattern, file)
+
+
+def count_pattern_in_lines(pattern: str, lines: Iterable[str]) -> int:
+    """Counts occurrences of a pattern in text lines.
+
+    Args:
+        pattern (str): The pattern to search for.
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Returns:
+        int: The number of occurrences of the pattern in the lines.
+    """
+    return _count_sanitized_pattern(sanitize_pattern(pattern), lines)
+
+
+def _count_sanitized_pattern(
+    sanitized_pattern: str, lines: Iterable[str]
+) -> int:
+    """Count matches of an already sanitized pattern, line by line."""
     counter = 0
-    with open(searched_file, "r", encoding="utf8") as file:
-        # Iterate through each line in the file
-        for line in file:
-            # Count occurrences of the pattern in the line
-            counter += sum(1 for _ in re.finditer(sanitized_pattern, line))
+    # Iterate through each line
+    for line in lines:
+        # Count occurrences of the pattern in the line
+        counter += sum(1 for _ in re.finditer(sanitized_pattern, line))
     return counter
 
 
-def non_blank_lines(text_file: Iterator[str]) -> Iterator[List[str]]:
-    """Generate non-blank lines from a text file.
+def count_regex_in_file(
+    pattern: str,
+    searched_file: str,
+    whole_buffer: bool = False,
+    timeout: Optional[float] = None,
+) -> int:
+    """Counts matches of a regular expression in a file.
+
+    Args:
+        pattern (str): The regular expression to search for. It is checked
+                       for complexity and compiled once.
+        searched_file (str): The path to the file to search.
+        whole_buffer (bool): Match the whole file content at once, so that
+                             matches can span lines. `^` and `$` still
+                             match at every line.
+        timeout (float, optional): Seconds allowed for the search.
+
+    Returns:
+        int: The number of matches of the pattern in the file.
+
+    Raises:
+        ValueError: If the pattern is too complex to be matched safely.
+        re.error: If the pattern is not a valid regular expression.
+        TimeoutError: If the search takes longer than `timeout`.
+    """
+    if not whole_buffer:
+        compiled = compile_pattern(pattern)
+        literal = literal_text(pattern)
+        if literal:
+            # Plain text, the literal path can use a fresh index
+            return count_pattern_in_file(literal, searched_file)
+        with time_budget(timeout):
+            with open_text(searched_file) as file:
+                return _count_compiled_pattern(compiled, file)
 
-    - erased blank lines from begin and end of string
-    - it also remove all non alphanumerical characters
-    - exclude space character
+    compiled = compile_pattern(pattern, re.MULTILINE)
+    with time_budget(timeout):
+        with open_text(searched_file) as file:
+            return len(compiled.findall(file.read()))
 
-    Input: any string text from opened file
+
+def count_regex_in_lines(
+    pattern: str, lines: Iterable[str], timeout: Optional[float] = None
+) -> int:
+    """Counts matches of a regular expression in text lines.
 
     Args:
-        text_file (file): The input text file.
+        pattern (str): The regular expression to search for.
+        lines (iterable): Lines of text, e.g. an opened text file.
+        timeout (float, optional): Seconds allowed for the search.
 
-    Yields:
-        list: Non-blank lines of the text file.
-        example : ['word','','word']
+    Returns:
+        int: The number of matches of the pattern in the lines.
     """
-    for line in text_file:
-        line = line.strip()
-        if line:
-            text = re.split(r"\s+", line)
-            stripped_line = []
-            for item in text:
-                stripped = "".join(ch for ch in item if ch.isalnum())
-                stripped_line.append(stripped)
-            yield stripped_line
+    compiled = compile_pattern(pattern)
+    with time_budget(timeout):
+        return _count_compiled_pattern(compiled, lines)
+
+
+def _count_compiled_pattern(
+    compiled: Pattern[str], lines: Iterable[str]
+) -> int:
+    """Count matches of a compiled pattern, line by line."""
+    findall = compiled.findall
+    return sum(len(findall(line)) for line in lines)
 
 
 def sanitize_pattern(pattern: str) -> str:
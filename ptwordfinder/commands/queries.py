@@ -0,0 +1,228 @@
+"""
+This module provides batches of typed queries counted in a single pass.
+
+A queries file lists one query per line as `type:value`, where the type
+is one of:
+
+* `word`: whole tokens, like the entries of `--words-input-file`,
+* `substring`: any occurrence, like `--single-word`,
+* `regex`: a regular expression matched line by line, like `--pattern`.
+
+Words are stripped of surrounding whitespace, so `word: Tadeusz` is the
+word `Tadeusz`; substrings and regular expressions are kept as written.
+Blank lines and lines starting with `#` are ignored:
+
+```
+# characters
+word:Tadeusz
+word:Zosia
+substring:Soplic
+regex:b[a-z]+na
+```
+
+The searched file is read once. Lines are gathered in batches joined into
+one buffer; the buffer is tokenized once for all word queries and every
+substring query is counted on it with `str.count`, which gives the same
+counts as line by line since substrings never contain a line break.
+Regular expressions are matched on each line of the batch.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import re
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.regex_mode import (
+    compile_pattern,
+    literal_text,
+    time_budget,
+)
+from ptwordfinder.commands.tokenizer import BATCH_LINES, tokenize_text
+from ptwordfinder.commands.word_index import load_fresh_index
+
+QUERY_TYPES = ("word", "substring", "regex")
+
+
+class QuerySet:
+    """Distinct typed queries, grouped by how they are counted.
+
+    Attributes:
+        labels (list): The `type:value` label of every query, in the
+                       order they were given.
+        words (dict): Word -> label of the word queries.
+        substrings (dict): Substring -> labels of the substring queries
+                           and of the plain text regular expressions.
+        regexes (list): (label, compiled pattern) of the other regular
+                        expressions.
+    """
+
+    def __init__(self) -> None:
+        self.labels: List[str] = []
+        self.words: Dict[str, str] = {}
+        self.substrings: Dict[str, List[str]] = {}
+        self.regexes: List = []
+
+    def add(self, query_type: str, value: str) -> None:
+        """Add a query, unless the same query was already added.
+
+        Args:
+            query_type (str): "word", "substring" or "regex".
+            value (str): The word, substring or regular expression.
+
+        Raises:
+            ValueError: If the type is unknown, the value is empty or
+                        holds a line break, a word holds whitespace, or
+                        the regular expression is too complex to be
+                        matched safely.
+            re.error: If the regular expression is not valid.
+        """
+        if query_type not in QUERY_TYPES:
+            raise ValueError(
+                f"Unknown query type '{query_type}', expected one of "
+                f"{', '.join(QUERY_TYPES)}."
+            )
+        if query_type == "word":
+            # Tokens never hold whitespace
+            value = value.strip()
+            if len(value.split()) > 1:
+                raise ValueError(
+                    f"A word query must be a single word, got '{value}'."
+                )
+        if not value or "\n" in value or "\r" in value:
+            raise ValueError(
+                f"A {query_type} query must be a non-empty single line."
+            )
+        label = f"{query_type}:{value}"
+        if label in self.labels:
+            return
+        self.labels.append(label)
+
+        if query_type == "word":
+            self.words[value] = label
+            return
+        if query_type == "regex":
+            compiled = compile_pattern(value)
+            text = literal_text(value)
+            if not text:
+                self.regexes.append((label, compiled))
+                return
+            value = text
+        # Plain text regular expressions count like substrings
+        self.substrings.setdefault(value, []).append(label)
+
+    def empty_counts(self) -> Dict[str, int]:
+        """Return a zero count for every query, in the given order."""
+        return dict.fromkeys(self.labels, 0)
+
+
+def parse_queries(lines: Iterable[str]) -> QuerySet:
+    """Parse the lines of a queries file.
+
+    Args:
+        lines (iterable): Lines of `type:value` queries.
+
+    Returns:
+        QuerySet: The distinct queries.
+
+    Raises:
+        ValueError: If a line is not a valid query.
+        re.error: If a regular expression is not valid.
+    """
+    queries = QuerySet()
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            continue
+        query_type, separator, value = line.partition(":")
+        if not separator:
+            raise ValueError(
+                f"Line {number}: expected 'type:value', got '{line}'."
+            )
+        try:
+            queries.add(query_type.strip(), value)
+        except (ValueError, re.error) as error:
+            raise type(error)(f"Line {number}: {error}") from error
+    return queries
+
+
+def count_queries_in_lines(
+    queries: QuerySet, lines: Iterable[str], timeout: Optional[float] = None
+) -> Dict[str, int]:
+    """Count every query in text lines, in a single pass.
+
+    Args:
+        queries (QuerySet): The queries to count.
+        lines (iterable): Lines of text, e.g. an opened text file.
+        timeout (float, optional): Seconds allowed for the search.
+
+    Returns:
+        dict: The count of every query, keyed by `type:value` label.
+    """
+    counts = queries.empty_counts()
+    words = queries.words
+    word_counts = dict.fromkeys(words, 0)
+    substrings = list(queries.substrings)
+    substring_counts = [0] * len(substrings)
+    regexes = [(label, regex.findall) for label, regex in queries.regexes]
+
+    lines = iter(lines)
+    with time_budget(timeout):
+        while True:
+            batch = []
+            for line in lines:
+                batch.append(line)
+                if len(batch) == BATCH_LINES:
+                    break
+            if not batch:
+                break
+            buffer = "\n".join(batch)
+            if word_counts:
+                for token in tokenize_text(buffer):
+                    if token in word_counts:
+                        word_counts[token] += 1
+            for number, substring in enumerate(substrings):
+                substring_counts[number] += buffer.count(substring)
+            for label, findall in regexes:
+                counts[label] += sum(len(findall(line)) for line in batch)
+
+    for word, label in words.items():
+        counts[label] = word_counts[word]
+    for substring, count in zip(substrings, substring_counts):
+        for label in queries.substrings[substring]:
+            counts[label] = count
+    return counts
+
+
+def count_queries_in_file(
+    queries: QuerySet, searched_file: str, timeout: Optional[float] = None
+) -> Dict[str, int]:
+    """Count every query in a file, reading it once.
+
+    A fresh index built with `ptwordf index build` answers word and
+    substring queries without reading the file, when there is no other
+    query.
+
+    Args:
+        queries (QuerySet): The queries to count.
+        searched_file (str): The path to the text file to search in.
+        timeout (float, optional): Seconds allowed for the search.
+
+    Returns:
+        dict: The count of every query, keyed by `type:value` label.
+    """
+    index = load_fresh_index(searched_file)
+    if index is not None and not queries.regexes:
+        counts = queries.empty_counts()
+        for word, label in queries.words.items():
+            counts[label] = index.term_counts.get(word, 0)
+        for substring, labels in queries.substrings.items():
+            count = index.count_substring(substring)
+            if count is None:
+                break
+            for label in labels:
+                counts[label] = count
+        else:
+            return counts
+
+    with open_text(searched_file) as file:
+        return count_queries_in_lines(queries, file, timeout)
@@ -0,0 +1,158 @@
+"""
+This module provides the safety net of the regular expression mode.
+
+Patterns given with `--pattern` are real regular expressions. Before a
+pattern is used it is:
+
+* checked for complexity: overly long patterns and nested unbounded
+  repetitions such as `(a+)+`, the classic cause of catastrophic
+  backtracking, are rejected,
+* compiled once and kept in a cache.
+
+Matching itself runs under a configurable time budget, whose clock can be
+paused while the matching code waits for its input or its caller.
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional, Pattern
+
+import re
+import signal
+import threading
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore[no-redef]
+
+MAX_PATTERN_LENGTH = 1000
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+if hasattr(sre_parse, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_parse.POSSESSIVE_REPEAT)
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(pattern: str, flags: int = 0) -> Pattern[str]:
+    """Check a pattern for complexity and compile it, once per pattern.
+
+    Args:
+        pattern (str): The regular expression.
+        flags (int): Flags passed to `re.compile`.
+
+    Returns:
+        Pattern: The compiled regular expression.
+
+    Raises:
+        TypeError: If the pattern is not a string.
+        ValueError: If the pattern is too complex to be matched safely.
+        re.error: If the pattern is not a valid regular expression.
+    """
+    if not isinstance(pattern, str):
+        raise TypeError("Input must be a string")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(
+            f"Pattern is longer than {MAX_PATTERN_LENGTH} characters."
+        )
+    if _repeat_height(sre_parse.parse(pattern, flags)) > 1:
+        raise ValueError(
+            f"Pattern '{pattern}' nests repetitions and could take "
+            "exponential time to match."
+        )
+    return re.compile(pattern, flags)
+
+
+def literal_text(pattern: str) -> Optional[str]:
+    """Return the text matched by a pattern made only of literals.
+
+    Args:
+        pattern (str): The regular expression.
+
+    Returns:
+        str: The matched text, or None when the pattern uses any regular
+             expression feature, including inline flags.
+    """
+    parsed = sre_parse.parse(pattern)
+    if parsed.state.flags & ~re.UNICODE:
+        return None
+    if not all(op is sre_parse.LITERAL for op, _ in parsed):
+        return None
+    return "".join(chr(code) for _, code in parsed)
+
+
+@contextmanager
+def time_budget(timeout: Optional[float]) -> Iterator[None]:
+    """Interrupt the enclosed code with TimeoutError after `timeout` seconds.
+
+    The regular expression engine checks for signals while it backtracks,
+    so even a single runaway match is interrupted. The budget is only
+    enforced in the main thread of platforms with `signal.setitimer`.
+
+    Args:
+        timeout (float, optional): Seconds allowed, None or 0 for no limit.
+    """
+    if (
+        not timeout
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError(
+            f"Pattern matching took longer than {timeout} seconds."
+        )
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def paused_budget() -> Iterator[None]:
+    """Stop the clock of the enclosing `time_budget` in the enclosed code.
+
+    The time left is restored when the enclosed code ends, so only the
+    time spent outside of it counts. Generators matching under a budget
+    pause it while they read a line or wait for their caller.
+    """
+    if (
+        not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+    left, _ = signal.setitimer(signal.ITIMER_REAL, 0)
+    try:
+        yield
+    finally:
+        if left:
+            signal.setitimer(signal.ITIMER_REAL, left)
+
+
+def _repeat_height(subpattern) -> int:
+    """Return the deepest nesting of variable repetitions in a pattern."""
+    height = 0
+    for op, av in subpattern:
+        inner = max(
+            (_repeat_height(child) for child in _children(av)), default=0
+        )
+        if op in _REPEATS and av[1] > 1 and av[1] != av[0]:
+            inner += 1
+        height = max(height, inner)
+    return height
+
+
+def _children(av) -> Iterator[object]:
+    """Yield the nested subpatterns of an operation argument."""
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (tuple, list)):
+        for item in av:
+            if isinstance(item, (sre_parse.SubPattern, tuple, list)):
+                yield from _children(item)
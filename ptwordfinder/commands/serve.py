@@ -0,0 +1,554 @@
+"""
+This module provides a long-running query server for searched files.
+
+The `serve` command loads searched files and their word indexes into
+memory once, then answers single word, word list and pattern queries
+without paying for interpreter startup and file reads on every query.
+
+Queries are JSON objects named like the options of `calculate-words`:
+
+```json
+{"single_word": "Tadeusz"}
+{"words": ["Tadeusz", "Zosia"], "per_word": true}
+{"pattern": "b[a-z]+na", "literal": false, "whole_buffer": false}
+```
+
+Word lists are sent inline: the server never opens a path given by a
+client, so it cannot hand out the content of other files.
+
+They are served on a local Unix socket, one JSON object per line in each
+direction, or over HTTP on localhost with `POST /query`. `GET /files`
+lists the loaded files. An asyncio event loop handles concurrent clients
+and counting runs in a thread pool, so slow queries do not block the
+loop. Pattern queries run in a pool of worker processes forked with the
+loaded files instead: there a runaway regular expression is interrupted
+after `--regex-timeout` seconds, like with `calculate-words`, and it can
+never hold the threads that answer the other queries.
+
+**Usage:**
+
+```bash
+ptwordf serve --searched-file pan-tadeusz.txt --port 8765
+curl -d '{"single_word": "Tadeusz"}' http://127.0.0.1:8765/query
+```
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+import click
+
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.multi_file import (
+    STDIN,
+    expand_searched_paths,
+    merge_counts,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_pattern_in_lines,
+    count_regex_in_lines,
+    count_word_in_lines,
+    format_report,
+)
+from ptwordfinder.commands.regex_mode import (
+    compile_pattern,
+    literal_text,
+    time_budget,
+)
+from ptwordfinder.commands.word_index import (
+    WordIndex,
+    build_index,
+    load_fresh_index,
+)
+
+LOCALHOST = "127.0.0.1"
+# Largest accepted request, in bytes
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+QUERY_KEYS = ("single_word", "words", "pattern")
+# Worker processes answering pattern queries
+PATTERN_WORKERS = 4
+
+
+@dataclass
+class LoadedFile:
+    """A searched file kept in memory.
+
+    Attributes:
+        path (str): Path of the file, as given on the command line.
+        lines (list): The lines of the file.
+        index (WordIndex): The word index of the file.
+    """
+
+    path: str
+    lines: List[str]
+    index: WordIndex
+
+
+def load_files(searched_files: List[str]) -> List[LoadedFile]:
+    """Read searched files and their indexes into memory.
+
+    A fresh index built with `ptwordf index build` is reused, otherwise
+    the index is built in memory. Term positions are not kept.
+
+    Args:
+        searched_files (list): Paths to the text files to load.
+
+    Returns:
+        list: The loaded files, in the given order.
+    """
+    loaded = []
+    for searched_file in searched_files:
+        with open_text(searched_file) as file:
+            lines = file.readlines()
+        index = load_fresh_index(searched_file) or build_index(searched_file)
+        index.positions = None
+        loaded.append(LoadedFile(searched_file, lines, index))
+    return loaded
+
+
+def answer(
+    files: List[LoadedFile], request: Dict, timeout: Optional[float] = None
+) -> Dict:
+    """Answer a query over loaded files.
+
+    Args:
+        files (list): The loaded files.
+        request (dict): The query, with exactly one of `single_word`,
+                        `words` or `pattern`, and the
+                        optional flags `per_word`, `literal` and
+                        `whole_buffer`.
+        timeout (float, optional): Seconds allowed to match a pattern in
+                                   one file. Only enforced in the main
+                                   thread, see `answer_pattern`.
+
+    Returns:
+        dict: The count of each file, the total, and the `output` lines
+              `calculate-words` prints for the same query.
+
+    Raises:
+        ValueError: If the query is malformed or its pattern is unsafe.
+        re.error: If the pattern is not a valid regular expression.
+        TimeoutError: If matching the pattern took longer than timeout.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("A query must be a JSON object.")
+    given = [key for key in QUERY_KEYS if request.get(key) is not None]
+    if len(given) != 1:
+        raise ValueError(
+            f"A query needs exactly one of {', '.join(QUERY_KEYS)}."
+        )
+
+    start_time = time.perf_counter()
+    single_word = request.get("single_word")
+    pattern = request.get("pattern")
+    per_word = bool(request.get("per_word"))
+    words_source = None
+
+    if given[0] == "words":
+        words = request["words"]
+        if not isinstance(words, list) or not all(
+            isinstance(word, str) for word in words
+        ):
+            raise ValueError("'words' must be a list of strings.")
+        words_source = "the query"
+
+        def count(loaded: LoadedFile):
+            term_counts = loaded.index.term_counts
+            return {
+                word: term_counts.get(word, 0)
+                for word in dict.fromkeys(words)
+            }
+
+    elif single_word is not None:
+        if not isinstance(single_word, str):
+            raise ValueError("'single_word' must be a string.")
+
+        def count(loaded: LoadedFile):
+            result = loaded.index.count_substring(single_word)
+            if result is None:
+                result = count_word_in_lines(single_word, loaded.lines)
+            return result
+
+    else:
+        if not isinstance(pattern, str):
+            raise ValueError("'pattern' must be a string.")
+        count = _pattern_counter(
+            pattern,
+            bool(request.get("literal")),
+            bool(request.get("whole_buffer")),
+            timeout,
+        )
+
+    results = []
+    output = []
+    total = None
+    for loaded in files:
+        result = count(loaded)
+        total = merge_counts(total, result)
+        output += format_report(
+            result,
+            f"'{loaded.path}'",
+            words_source=words_source,
+            single_word=single_word,
+            pattern=pattern,
+            per_word=per_word,
+        )
+        results.append(_file_result(loaded.path, result, per_word))
+    if len(files) > 1:
+        output += format_report(
+            total,
+            f"{len(files)} files",
+            words_source=words_source,
+            single_word=single_word,
+            pattern=pattern,
+            per_word=per_word,
+        )
+
+    response = _file_result(None, total, per_word)
+    del response["file"]
+    response.update(
+        query=given[0],
+        files=results,
+        output=output,
+        elapsed=time.perf_counter() - start_time,
+    )
+    return response
+
+
+def _pattern_counter(
+    pattern: str,
+    literal: bool,
+    whole_buffer: bool,
+    timeout: Optional[float] = None,
+):
+    """Return the function counting a pattern in a loaded file."""
+    if literal:
+        text: Optional[str] = pattern
+    else:
+        # Validate once, before counting any file
+        compile_pattern(pattern)
+        text = literal_text(pattern)
+
+    if whole_buffer and not literal:
+        compiled = compile_pattern(pattern, re.MULTILINE)
+
+        def count_buffer(loaded: LoadedFile) -> int:
+            with time_budget(timeout):
+                return len(compiled.findall("".join(loaded.lines)))
+
+        return count_buffer
+
+    def count_lines(loaded: LoadedFile) -> int:
+        if text is not None:
+            result = loaded.index.count_substring(text)
+            if result is not None:
+                return result
+            return count_pattern_in_lines(text, loaded.lines)
+        return count_regex_in_lines(pattern, loaded.lines, timeout)
+
+    return count_lines
+
+
+# Files loaded by the serve command, inherited by pattern workers
+_worker_files: List[LoadedFile] = []
+
+
+def _set_worker_files(files: List[LoadedFile]) -> None:
+    """Keep the loaded files in a pattern worker process."""
+    global _worker_files
+    _worker_files = files
+
+
+def make_pattern_pool(
+    files: List[LoadedFile], workers: int = PATTERN_WORKERS
+) -> ProcessPoolExecutor:
+    """Start the worker processes answering pattern queries.
+
+    The workers are started at once, before the event loop runs any
+    thread, and inherit the loaded files when they are forked.
+
+    Args:
+        files (list): The loaded files.
+        workers (int): Number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool, to give to `start_server` and to
+                             shut down once the server is closed.
+    """
+    pool = ProcessPoolExecutor(
+        workers, initializer=_set_worker_files, initargs=(files,)
+    )
+    pool.submit(int).result()
+    return pool
+
+
+def answer_pattern(request: Dict, timeout: Optional[float]) -> Dict:
+    """Answer a pattern query in a worker process of `make_pattern_pool`.
+
+    The worker runs the query in its main thread, where `time_budget`
+    interrupts a regular expression that takes longer than timeout.
+
+    Args:
+        request (dict): The query, see `answer`.
+        timeout (float, optional): Seconds allowed to match the pattern
+                                   in one file, None for no limit.
+
+    Returns:
+        dict: The response, see `answer`.
+    """
+    return answer(_worker_files, request, timeout)
+
+
+def _file_result(path: Optional[str], result, per_word: bool) -> Dict:
+    """Shape the count of one file, or of all files, as JSON."""
+    if isinstance(result, dict):
+        shaped = {"file": path, "count": sum(result.values())}
+        if per_word:
+            shaped["counts"] = result
+        return shaped
+    return {"file": path, "count": result}
+
+
+async def _respond(
+    files: List[LoadedFile],
+    body: bytes,
+    pattern_pool: Optional[ProcessPoolExecutor] = None,
+    timeout: Optional[float] = None,
+) -> Dict:
+    """Decode a request body and answer it.
+
+    Pattern queries are answered in the pattern pool when there is one,
+    the other queries in the default executor.
+    """
+    try:
+        request = json.loads(body)
+        loop = asyncio.get_running_loop()
+        if (
+            pattern_pool is not None
+            and isinstance(request, dict)
+            and request.get("pattern") is not None
+        ):
+            return await loop.run_in_executor(
+                pattern_pool, answer_pattern, request, timeout
+            )
+        return await loop.run_in_executor(None, answer, files, request)
+    except (ValueError, re.error, OSError) as error:
+        # TimeoutError is an OSError
+        return {"error": str(error)}
+
+
+async def _handle_socket_client(
+    files: List[LoadedFile],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    pattern_pool: Optional[ProcessPoolExecutor] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """Answer newline delimited JSON queries until the client disconnects."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            response = await _respond(files, line, pattern_pool, timeout)
+            writer.write(json.dumps(response).encode("utf8") + b"\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _handle_http_client(
+    files: List[LoadedFile],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    pattern_pool: Optional[ProcessPoolExecutor] = None,
+    timeout: Optional[float] = None,
+) -> None:
+    """Answer one HTTP request, then close the connection."""
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            header = (await reader.readline()).decode("latin-1").strip()
+            if not header:
+                break
+            name, _, value = header.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) != 3:
+            status, response = 400, {"error": "Malformed request."}
+        elif request_line[:2] == ["GET", "/files"]:
+            status = 200
+            response = {"files": [loaded.path for loaded in files]}
+        elif request_line[:2] == ["POST", "/query"]:
+            length = int(headers.get("content-length", 0))
+            if not 0 <= length <= MAX_REQUEST_SIZE:
+                raise ValueError("Invalid Content-Length.")
+            response = await _respond(
+                files,
+                await reader.readexactly(length),
+                pattern_pool,
+                timeout,
+            )
+            status = 400 if "error" in response else 200
+        else:
+            status, response = 404, {"error": "Not found."}
+
+        body = json.dumps(response).encode("utf8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    files: List[LoadedFile],
+    socket_path: Optional[str] = None,
+    port: Optional[int] = None,
+    pattern_pool: Optional[ProcessPoolExecutor] = None,
+    timeout: Optional[float] = None,
+) -> asyncio.AbstractServer:
+    """Start serving queries over loaded files.
+
+    Args:
+        files (list): The loaded files.
+        socket_path (str, optional): Path of the Unix socket to listen on.
+        port (int, optional): Port to listen on for HTTP on localhost,
+                              0 to pick a free one. Used when no socket
+                              path is given.
+        pattern_pool (ProcessPoolExecutor, optional): The workers of
+                                                      `make_pattern_pool`
+                                                      answering pattern
+                                                      queries. Without
+                                                      it, patterns are
+                                                      matched in threads,
+                                                      with no time limit.
+        timeout (float, optional): Seconds allowed to match a pattern in
+                                   one file, in the pattern pool.
+
+    Returns:
+        asyncio.AbstractServer: The started server.
+    """
+    if socket_path:
+        return await asyncio.start_unix_server(
+            lambda r, w: _handle_socket_client(
+                files, r, w, pattern_pool, timeout
+            ),
+            path=socket_path,
+            limit=MAX_REQUEST_SIZE,
+        )
+    return await asyncio.start_server(
+        lambda r, w: _handle_http_client(files, r, w, pattern_pool, timeout),
+        host=LOCALHOST,
+        port=port,
+    )
+
+
+@click.command()
+@click.option(
+    "--searched-file",
+    "-s",
+    "searched_files",
+    multiple=True,
+    required=True,
+    callback=lambda ctx, param, value: expand_searched_paths(value),
+    help="Text file, directory or glob pattern to load (can be repeated)",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Unix socket to listen on, one JSON query per line",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(0, 65535),
+    help="Port to listen on for HTTP queries on localhost",
+)
+@click.option(
+    "--regex-timeout",
+    type=click.FloatRange(min=0),
+    default=60.0,
+    show_default=True,
+    help="Seconds allowed to match a pattern query in one file, 0 for no "
+    "limit",
+)
+def serve(
+    searched_files: List[str],
+    socket_path: str,
+    port: Optional[int],
+    regex_timeout: float,
+) -> None:
+    """
+    Keep searched files in memory and answer queries until interrupted.
+
+    Args:
+        searched_files (list): Paths to the text files to load, expanded
+                               from files, directories and glob patterns.
+                               Required.
+        socket_path (str, optional): Unix socket to listen on.
+        port (int, optional): Port to listen on for HTTP on localhost.
+        regex_timeout (float, optional): Seconds allowed to match a
+                                         pattern query in one file, in
+                                         a worker process, 0 for no
+                                         limit. Defaults to 60.
+
+    Note:
+        Exactly one of --socket or --port must be provided. Standard
+        input cannot be served.
+    """
+    if (socket_path is None) == (port is None):
+        click.echo(
+            "Error: Exactly one of --socket or --port must be provided.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if STDIN in searched_files:
+        click.echo("Error: serve cannot read standard input.", err=True)
+        sys.exit(1)
+
+    files = load_files(searched_files)
+    pattern_pool = make_pattern_pool(files)
+
+    async def run() -> None:
+        server = await start_server(
+            files, socket_path, port, pattern_pool, regex_timeout or None
+        )
+        if socket_path:
+            address = socket_path
+        else:
+            address = "http://%s:%d" % server.sockets[0].getsockname()[:2]
+        click.echo(f"Serving {len(files)} files on {address}.")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pattern_pool.shutdown(wait=False, cancel_futures=True)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
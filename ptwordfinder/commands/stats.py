@@ -0,0 +1,170 @@
+"""
+This module provides the timing instrumentation behind `--stats`.
+
+While a `Stats` collector is active, the counting code reports where
+time goes with `time.perf_counter_ns`:
+
+* `open`: opening searched files, decompression setup included,
+* `read`: reading and decoding text, timed per batch of lines,
+* `tokenize`: splitting text into word tokens,
+* `match`: the rest of the counting time, i.e. matching and counting,
+* `output`: printing the results.
+
+With `--lemmatize`, the lookups of the lemma cache and its hits are
+counted as well.
+
+Only work done in the current process is broken down; time spent in
+worker processes (`--jobs`) shows up as `match`. When no collector is
+active, the instrumented functions only pay for one `active_stats()`
+call per file or buffer.
+"""
+
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, TextIO
+
+import time
+
+# Number of lines read at once by `TimedText`
+READ_BATCH_LINES = 4096
+PHASES = ("open", "read", "tokenize", "match", "output")
+
+_active: Optional["Stats"] = None
+
+
+def active_stats() -> Optional["Stats"]:
+    """Return the active collector, or None when stats are not collected."""
+    return _active
+
+
+class Stats:
+    """Collector of phase timings and volume counters.
+
+    Attributes:
+        phases_ns (dict): Phase name -> nanoseconds spent in it.
+        bytes (int): UTF-8 bytes of text read.
+        lines (int): Lines of text read.
+        tokens (int): Tokens produced by the tokenizer.
+        lemma_lookups (int): Tokens looked up by the lemmatizer.
+        lemma_hits (int): Lookups answered by the lemma cache.
+    """
+
+    def __init__(self) -> None:
+        self.phases_ns: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.bytes = 0
+        self.lines = 0
+        self.tokens = 0
+        self.lemma_lookups = 0
+        self.lemma_hits = 0
+
+    @contextmanager
+    def activate(self) -> Iterator["Stats"]:
+        """Make this collector the active one within a `with` block."""
+        global _active
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent within a `with` block to a phase."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases_ns[name] += time.perf_counter_ns() - start
+
+    def add_text(self, text: str, lines: int) -> None:
+        """Count text that was read."""
+        self.bytes += len(text.encode("utf8"))
+        self.lines += lines
+
+    def add_bytes(self, data: bytes) -> None:
+        """Count encoded text that was read."""
+        self.bytes += len(data)
+        self.lines += data.count(b"\n")
+
+    def report(self, count_ns: int, total_ns: int) -> Dict:
+        """Summarize the collected statistics.
+
+        Args:
+            count_ns (int): Nanoseconds spent counting, all phases but
+                            `output` included. `match` is what is left
+                            after `open`, `read` and `tokenize`.
+            total_ns (int): Nanoseconds of the whole run.
+
+        Returns:
+            dict: Phase timings in seconds, volumes and rates per second,
+                  and the hit rate of the lemma cache when tokens were
+                  lemmatized.
+        """
+        phases_ns = dict(self.phases_ns)
+        phases_ns["match"] = max(
+            count_ns
+            - phases_ns["open"]
+            - phases_ns["read"]
+            - phases_ns["tokenize"],
+            0,
+        )
+        seconds = count_ns / 1e9 or float("nan")
+        report = {
+            "phases": {name: ns / 1e9 for name, ns in phases_ns.items()},
+            "total": total_ns / 1e9,
+            "bytes": self.bytes,
+            "lines": self.lines,
+            "tokens": self.tokens,
+            "bytes_per_s": self.bytes / seconds,
+            "lines_per_s": self.lines / seconds,
+            "tokens_per_s": self.tokens / seconds,
+        }
+        if self.lemma_lookups:
+            report["lemma_cache"] = {
+                "lookups": self.lemma_lookups,
+                "hits": self.lemma_hits,
+                "hit_rate": self.lemma_hits / self.lemma_lookups,
+            }
+        return report
+
+
+class TimedText:
+    """A text file whose reads are timed by a `Stats` collector.
+
+    Lines are read in batches, so timing costs little per line.
+    """
+
+    def __init__(self, file: TextIO, stats: Stats) -> None:
+        self.file = file
+        self.stats = stats
+
+    def __enter__(self) -> "TimedText":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.file.close()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self.file.close()
+
+    def __iter__(self) -> Iterator[str]:
+        stats = self.stats
+        while True:
+            with stats.phase("read"):
+                batch = list(islice(self.file, READ_BATCH_LINES))
+                stats.add_text("".join(batch), len(batch))
+            if not batch:
+                return
+            yield from batch
+
+    def readlines(self) -> List[str]:
+        """Read and time all the remaining lines."""
+        return list(self)
+
+    def read(self, size: int = -1) -> str:
+        """Read and time the rest of the file, or `size` characters."""
+        with self.stats.phase("read"):
+            text = self.file.read(size)
+            self.stats.add_text(text, text.count("\n"))
+        return text
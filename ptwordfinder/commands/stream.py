@@ -0,0 +1,125 @@
+"""
+This module provides counting over a text stream, such as standard input.
+
+A stream cannot be seeked, split into ranges or memory-mapped, so it is
+read in fixed-size blocks instead. Each block is cut right after its last
+newline and the remainder is carried over to the next block, so every
+line is counted exactly once by the per-line counting functions and the
+memory used does not depend on the size of the stream.
+
+**Usage:**
+
+```bash
+zcat large_file.txt.gz | ptwordf calculate-words -w Tadeusz -s -
+```
+"""
+
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List
+
+import io
+
+from ptwordfinder.commands.multi_file import merge_counts
+from ptwordfinder.commands.stats import active_stats
+
+# Number of bytes read from the stream at once
+CHUNK_SIZE = 1024 * 1024
+
+
+def iter_line_blocks(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Read a binary stream in blocks that end right after a newline.
+
+    A line longer than `chunk_size` is kept whole, so a block only grows
+    beyond `chunk_size` to hold such a line. The last block ends wherever
+    the stream ends.
+
+    Args:
+        stream (file): A binary stream, e.g. `sys.stdin.buffer`.
+        chunk_size (int): Number of bytes read at once.
+
+    Yields:
+        bytes: The consecutive blocks of the stream.
+    """
+    pending = b""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        data = pending + data
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            pending = data
+            continue
+        pending = data[cut:]
+        yield data[:cut]
+    if pending:
+        yield pending
+
+
+def iter_line_chunks(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[List[str]]:
+    """Read a binary stream in blocks of whole lines.
+
+    Args:
+        stream (file): A binary stream, e.g. `sys.stdin.buffer`.
+        chunk_size (int): Number of bytes read at once.
+
+    Yields:
+        list: The decoded lines of a block, with the same universal newline
+              handling as a file opened in text mode.
+    """
+    for block in iter_line_blocks(stream, chunk_size):
+        yield decode_lines(block)
+
+
+def count_in_stream(
+    lines_function: Callable[[Any, Iterable[str]], Any],
+    query: Any,
+    stream: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+) -> Any:
+    """Count in a stream, one block of whole lines at a time.
+
+    Args:
+        lines_function (callable): A function taking the query and text
+                                   lines, e.g. `count_word_in_lines`.
+        query: The first argument passed to `lines_function`.
+        stream (file): A binary stream, e.g. `sys.stdin.buffer`.
+        chunk_size (int): Number of bytes read at once.
+
+    Returns:
+        The merged result of all blocks, an int or a {word: count} mapping.
+    """
+    total = None
+    stats = active_stats()
+    chunks = iter_line_chunks(stream, chunk_size)
+    while True:
+        if stats is None:
+            lines = next(chunks, None)
+        else:
+            with stats.phase("read"):
+                lines = next(chunks, None)
+                if lines is not None:
+                    stats.add_text("".join(lines), len(lines))
+        if lines is None:
+            break
+        total = merge_counts(total, lines_function(query, lines))
+    if total is None:
+        # An empty stream counts like an empty file
+        total = lines_function(query, [])
+    return total
+
+
+def decode_lines(data: bytes) -> List[str]:
+    """Decode a block of bytes into text lines.
+
+    Args:
+        data (bytes): UTF-8 text, e.g. a block of `iter_line_blocks`.
+
+    Returns:
+        list: The lines, with the same universal newline handling as a
+              file opened in text mode.
+    """
+    return list(io.TextIOWrapper(io.BytesIO(data), encoding="utf8"))
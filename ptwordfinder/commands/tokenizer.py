@@ -0,0 +1,135 @@
+"""
+This module provides the tokenization shared by the counting engines.
+
+A token is a run of non-whitespace characters with every
+non-alphanumerical character removed. Tokens made only of such characters
+are kept as empty strings.
+
+Whole lines or buffers are split with `str.split`. Only tokens that are not
+already alphanumerical are stripped, with a precompiled regular expression
+whose results are cached, since natural text repeats the same punctuated
+tokens ("Tadeusz,", "—") over and over.
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+import re
+
+from ptwordfinder.commands.stats import active_stats
+
+# Everything that is neither alphanumerical nor whitespace
+_NON_ALNUM = re.compile(r"[^\w\s]+|_+")
+# Number of distinct punctuated tokens remembered before starting over
+_CACHE_SIZE = 1 << 16
+# Number of lines joined into one buffer by `tokenize_lines`
+BATCH_LINES = 4096
+
+
+class _StrippedTokens(dict):
+    """Cache of tokens with their non-alphanumerical characters removed."""
+
+    def __missing__(self, token: str) -> str:
+        if len(self) >= _CACHE_SIZE:
+            self.clear()
+        stripped = self[token] = _NON_ALNUM.sub("", token)
+        return stripped
+
+
+_STRIPPED = _StrippedTokens()
+
+
+def tokenize_text(text: str) -> List[str]:
+    """Split a text into alphanumerical tokens.
+
+    Line breaks are whitespace, so tokenizing a whole buffer gives the same
+    tokens as tokenizing each of its lines in turn.
+
+    Args:
+        text (str): Any text, one line or a whole buffer.
+
+    Returns:
+        list: The tokens of the text.
+        example : ['word','','word']
+    """
+    stats = active_stats()
+    if stats is not None:
+        with stats.phase("tokenize"):
+            tokens = split_tokens(text)
+        stats.tokens += len(tokens)
+        return tokens
+    return split_tokens(text)
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split a text into tokens, like `tokenize_text` without `--stats`.
+
+    Args:
+        text (str): Any text, one line or a whole buffer.
+
+    Returns:
+        list: The tokens of the text.
+    """
+    stripped = _STRIPPED
+    return [
+        token if token.isalnum() else stripped[token]
+        for token in text.split()
+    ]
+
+
+def strip_token(token: str) -> str:
+    """Remove the non-alphanumerical characters of one token.
+
+    Args:
+        token (str): A run of non-whitespace characters.
+
+    Returns:
+        str: The token as tokenized, empty when only punctuation.
+    """
+    return token if token.isalnum() else _STRIPPED[token]
+
+
+def tokenize_lines(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Tokenize text lines in batches joined into one buffer.
+
+    This yields the same tokens as `non_blank_lines`, without building one
+    list per line, for callers that do not need the line structure.
+
+    Args:
+        lines (iterable): Lines of text, e.g. an opened text file.
+
+    Yields:
+        list: The tokens of a batch of lines.
+    """
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, BATCH_LINES))
+        if not batch:
+            return
+        yield tokenize_text("\n".join(batch))
+
+
+def non_blank_lines(text_file: Iterable[str]) -> Iterator[List[str]]:
+    """Generate non-blank lines from a text file.
+
+    - erased blank lines from begin and end of string
+    - it also remove all non alphanumerical characters
+    - exclude space character
+
+    Input: any string text from opened file
+
+    Args:
+        text_file (file): The input text file.
+
+    Yields:
+        list: Non-blank lines of the text file.
+        example : ['word','','word']
+    """
+    stripped = _STRIPPED
+    for line in text_file:
+        tokens = line.split()
+        if tokens:
+            yield [
+                token if token.isalnum() else stripped[token]
+                for token in tokens
+            ]
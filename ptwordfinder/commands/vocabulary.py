@@ -0,0 +1,103 @@
+"""
+This module provides a compact vocabulary of token counts.
+
+Every distinct token is interned once and given an integer id; the counts
+are kept by id in an `array('Q')` of unsigned 64-bit integers, instead of
+one Python int object per count in a `dict[str, int]`.
+
+Tokens are counted a batch at a time: `collections.Counter` counts the
+batch in C, then the distinct tokens of the batch are folded into the
+array. Natural text repeats its words, so a batch has far fewer distinct
+tokens than tokens and the per-token work stays out of Python bytecode.
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import sys
+
+
+class Vocabulary:
+    """Interned tokens with integer ids and array-backed counts.
+
+    Attributes:
+        ids (dict): Token -> id, in the order tokens were added.
+        tokens (list): Id -> token.
+        counts (array): Id -> count, as unsigned 64-bit integers.
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()) -> None:
+        self.ids: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        self.counts = array("Q")
+        for token in tokens:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.ids
+
+    def add(self, token: str) -> int:
+        """Add a token with a zero count, unless it is already known.
+
+        Args:
+            token (str): The token.
+
+        Returns:
+            int: The id of the token.
+        """
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token = sys.intern(token)
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+            self.counts.append(0)
+        return token_id
+
+    def update(self, tokens: Iterable[str]) -> None:
+        """Count a batch of tokens, adding the unknown ones.
+
+        Args:
+            tokens (iterable): The tokens, e.g. from `tokenize_text`.
+        """
+        ids = self.ids
+        counts = self.counts
+        for token, count in Counter(tokens).items():
+            token_id = ids.get(token)
+            if token_id is None:
+                token_id = self.add(token)
+            counts[token_id] += count
+
+    def update_known(self, tokens: Iterable[str]) -> None:
+        """Count a batch of tokens, ignoring those not in the vocabulary.
+
+        Args:
+            tokens (iterable): The tokens, e.g. from `tokenize_text`.
+        """
+        ids = self.ids
+        counts = self.counts
+        batch = Counter(tokens)
+        if len(batch) < len(ids):
+            for token, count in batch.items():
+                token_id = ids.get(token)
+                if token_id is not None:
+                    counts[token_id] += count
+        else:
+            for token, token_id in ids.items():
+                counts[token_id] += batch.get(token, 0)
+
+    def count(self, token: str) -> int:
+        """Return the count of a token, 0 when it is unknown."""
+        token_id = self.ids.get(token)
+        return 0 if token_id is None else self.counts[token_id]
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """Yield every token with its count, in the order of their ids."""
+        return zip(self.tokens, self.counts)
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counts as a token -> count mapping."""
+        return dict(self.items())
@@ -0,0 +1,254 @@
+"""
+This module provides the file watching behind `calculate-words --watch`.
+
+On Linux the directories of the searched files are watched with inotify,
+through `ctypes`, so the process sleeps until a searched file is written,
+created or moved into place. Elsewhere, or when inotify is not available,
+the files are polled with `os.stat` once per `POLL_INTERVAL` seconds.
+
+Changed files are counted with `count_incrementally`, so only the lines
+appended since the previous count are read, and a count is emitted again
+only when it changed.
+
+**Usage:**
+
+```bash
+ptwordf calculate-words -w ERROR -s /var/log/app.log --watch
+```
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import os
+import select
+import struct
+import time
+
+# Seconds between two checks of the polling watcher
+POLL_INTERVAL = 1.0
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# struct inotify_event: wd, mask, cookie and len, followed by the name
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher:
+    """Base class of the watchers of a set of files.
+
+    Attributes:
+        paths (dict): Absolute path -> path of every watched file, as given.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        self.paths: Dict[str, str] = {
+            os.path.abspath(path): path for path in paths
+        }
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait until some watched files change.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most, None to wait
+                                       until a change.
+
+        Returns:
+            set: The changed files, as given. It is empty when the timeout
+                 expired, and may be empty after unrelated activity.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+class InotifyWatcher(Watcher):
+    """Watcher waiting for inotify events of the directories of the files.
+
+    Raises:
+        OSError: If inotify is not available.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        super().__init__(paths)
+        # Imported here, ctypes is only needed to watch files
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+        )
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available.")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed.")
+
+        # Watch descriptor -> watched directory
+        self.directories: Dict[int, str] = {}
+        for directory in sorted({os.path.dirname(p) for p in self.paths}):
+            wd = libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), WATCH_MASK
+            )
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, os.strerror(error), directory)
+            self.directories[wd] = directory
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        changed: Set[str] = set()
+        if not ready:
+            return changed
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost, every file may have changed
+                    changed.update(self.paths.values())
+                    continue
+                path = os.path.join(
+                    self.directories.get(wd, ""), os.fsdecode(name)
+                )
+                if path in self.paths:
+                    changed.add(self.paths[path])
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher(Watcher):
+    """Watcher comparing the inode, size and modification time of files.
+
+    Args:
+        paths (iterable): The files to watch.
+        interval (float): Seconds between two checks.
+    """
+
+    def __init__(
+        self, paths: Iterable[str], interval: float = POLL_INTERVAL
+    ) -> None:
+        super().__init__(paths)
+        self.interval = interval
+        self.snapshot = self._stat_all()
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._stat_all()
+            changed = {
+                self.paths[path]
+                for path, state in snapshot.items()
+                if state != self.snapshot[path]
+            }
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return changed
+            time.sleep(delay)
+
+    def _stat_all(self) -> Dict[str, Optional[Tuple[int, int, int]]]:
+        """Return the inode, size and modification time of every file."""
+        snapshot = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                snapshot[path] = None
+            else:
+                snapshot[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+
+def open_watcher(
+    paths: Iterable[str], interval: float = POLL_INTERVAL
+) -> Watcher:
+    """Watch files with inotify when available, by polling otherwise.
+
+    Args:
+        paths (iterable): The files to watch.
+        interval (float): Seconds between two checks when polling.
+
+    Returns:
+        Watcher: The watcher, to be closed when done.
+    """
+    paths = list(paths)
+    try:
+        return InotifyWatcher(paths)
+    except OSError:
+        return PollingWatcher(paths, interval)
+
+
+def follow_counts(
+    count_function: Callable[[Any, str], Any],
+    query: Any,
+    results: Dict[str, Any],
+    watcher: Watcher,
+) -> Iterator[Tuple[str, Any, int]]:
+    """Count watched files again whenever they change.
+
+    Every file is counted once when the generator starts, to catch up
+    with what was written since `results` were computed.
+
+    Args:
+        count_function (callable): A function taking the query and a file
+                                   path, counting incrementally.
+        query: The first argument passed to `count_function`.
+        results (dict): File -> last count of every watched file. It is
+                        updated with the new counts.
+        watcher (Watcher): The watcher of the files.
+
+    Yields:
+        tuple: The file, its new count and the counting time in
+               nanoseconds, when the count changed.
+    """
+    changed = set(results)
+    while True:
+        for searched_file in sorted(changed):
+            start = time.perf_counter_ns()
+            try:
+                result = count_function(query, searched_file)
+            except FileNotFoundError:
+                # Rotated away, counted again once it is created
+                continue
+            except UnicodeDecodeError:
+                # Not text, reported when first counted
+                continue
+            if result != results.get(searched_file):
+                results[searched_file] = result
+                yield searched_file, result, time.perf_counter_ns() - start
+        changed = watcher.changes()
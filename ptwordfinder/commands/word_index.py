@@ -0,0 +1,348 @@
+"""
+This module provides a persistent inverted index for searched files.
+
+Building an index tokenizes a text file once and stores, on disk:
+
+* the count of every whitespace separated raw token, which answers
+  substring queries (`--single-word`, `--pattern`) without rescanning,
+* the count and token positions of every alphanumeric term produced by
+  `non_blank_lines`, which answers `--words-input-file` queries.
+
+The file is read once, in batches of lines. Counts are gathered in a
+`Vocabulary` and positions in one `array('Q')` per term, 8 bytes per
+token instead of a list of Python ints.
+
+An index is keyed by the absolute path of the searched file and remembers
+its size, modification time and content hash. The counting functions in
+`ptwordfinder.commands.pt_word_finder` consult it automatically when it is
+fresh and fall back to scanning the file otherwise.
+
+**Usage:**
+
+```bash
+ptwordf index build --searched-file pan-tadeusz.txt
+```
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import hashlib
+import os
+import pickle
+
+import click
+
+from ptwordfinder.commands.boundaries import count_bounded
+from ptwordfinder.commands.compressed import open_text
+from ptwordfinder.commands.tokenizer import BATCH_LINES, tokenize_text
+from ptwordfinder.commands.vocabulary import Vocabulary
+
+INDEX_FORMAT_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass
+class WordIndex:
+    """In-memory view of the inverted index of one searched file.
+
+    Attributes:
+        path (str): Absolute path of the indexed file.
+        size (int): Size of the file in bytes when it was indexed.
+        mtime_ns (int): Modification time of the file in nanoseconds.
+        digest (str): SHA-256 hex digest of the file content.
+        raw_counts (dict): Whitespace separated token -> occurrences.
+        term_counts (dict): Alphanumeric term -> occurrences.
+        positions (dict): Alphanumeric term -> token positions, as arrays
+                          or lists. Loaded lazily from disk, see
+                          `term_positions`.
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+    raw_counts: Dict[str, int]
+    term_counts: Dict[str, int]
+    positions: Optional[Dict[str, Sequence[int]]] = field(
+        default=None, repr=False
+    )
+
+    def count_substring(
+        self, needle: str, match: str = "substring"
+    ) -> Optional[int]:
+        """Count non-overlapping occurrences of a string in the file.
+
+        A needle without whitespace can never span two raw tokens, so the
+        result equals summing `line.count(needle)` over the whole file.
+        Raw tokens are surrounded by whitespace, so word boundaries are
+        checked within each token.
+
+        Args:
+            needle (str): The string to count.
+            match (str): "substring", or "whole", "prefix" or "suffix" to
+                         count occurrences at word boundaries only, see
+                         `ptwordfinder.commands.boundaries`.
+
+        Returns:
+            int: The number of occurrences, or None when the needle is empty
+                 or contains whitespace and the index cannot answer it.
+        """
+        if needle.split() != [needle]:
+            return None
+        return sum(
+            count_bounded(needle, token, match) * count
+            for token, count in self.raw_counts.items()
+            if needle in token
+        )
+
+    def count_terms(self, words: Iterable[str]) -> int:
+        """Count the occurrences of the given alphanumeric terms.
+
+        Args:
+            words (iterable): Terms to count, as matched against the output
+                              of `non_blank_lines`.
+
+        Returns:
+            int: The total count of occurrences of all terms.
+        """
+        return sum(self.term_counts.get(word, 0) for word in set(words))
+
+    def term_positions(self, term: str) -> List[int]:
+        """Return the token positions of a term, loading them if needed.
+
+        Positions are 0-based ordinals in the token stream produced by
+        `non_blank_lines` over the whole file.
+
+        Args:
+            term (str): The alphanumeric term to look up.
+
+        Returns:
+            list: Sorted token positions of the term.
+        """
+        if self.positions is None:
+            with open(positions_path(self.path), "rb") as file:
+                self.positions = pickle.load(file)
+        return list(self.positions.get(term, ()))
+
+
+def cache_dir() -> str:
+    """Return the directory holding indexes and other cached artifacts.
+
+    The location can be overridden with the `PTWORDFINDER_CACHE_DIR`
+    environment variable.
+
+    Returns:
+        str: Path of the cache directory.
+    """
+    return os.environ.get("PTWORDFINDER_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "ptwordfinder"
+    )
+
+
+def dump_atomic(obj: object, path: str) -> None:
+    """Pickle an object to a temporary file and move it into place.
+
+    Readers of `path` never see a partly written file, and concurrent
+    writers each replace it with a complete one.
+
+    Args:
+        obj (object): The object to store.
+        path (str): The destination, in an existing directory, e.g. in
+                    `cache_dir()`.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def index_path(searched_file: str) -> str:
+    """Return the path of the index file for a searched file.
+
+    Args:
+        searched_file (str): The path to the indexed text file.
+
+    Returns:
+        str: Path of the index file inside `cache_dir()`.
+    """
+    key = hashlib.sha1(
+        os.path.abspath(searched_file).encode("utf8")
+    ).hexdigest()
+    return os.path.join(cache_dir(), f"{key}.idx")
+
+
+def positions_path(searched_file: str) -> str:
+    """Return the path of the term positions file for a searched file.
+
+    Args:
+        searched_file (str): The path to the indexed text file.
+
+    Returns:
+        str: Path of the positions file inside `cache_dir()`.
+    """
+    return index_path(searched_file)[: -len(".idx")] + ".pos"
+
+
+def file_digest(searched_file: str) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in blocks.
+
+    Args:
+        searched_file (str): The path to the file.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(searched_file, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_index(searched_file: str) -> WordIndex:
+    """Tokenize a text file once and build its inverted index.
+
+    Args:
+        searched_file (str): The path to the text file to index.
+
+    Returns:
+        WordIndex: The index, with positions already loaded.
+    """
+    stat = os.stat(searched_file)
+    raw = Vocabulary()
+    terms = Vocabulary()
+    # Term id -> token positions
+    positions: List[array] = []
+    position = 0
+
+    with open_text(searched_file) as file:
+        while True:
+            batch = list(islice(file, BATCH_LINES))
+            if not batch:
+                break
+            buffer = "\n".join(batch)
+            raw.update(buffer.split())
+            tokens = tokenize_text(buffer)
+            term_ids = terms.ids.get
+            for term_position, term in enumerate(tokens, position):
+                term_id = term_ids(term)
+                if term_id is None:
+                    term_id = terms.add(term)
+                    positions.append(array("Q"))
+                positions[term_id].append(term_position)
+            position += len(tokens)
+    position_arrays = dict(zip(terms.tokens, positions))
+    terms.counts = array("Q", map(len, positions))
+
+    return WordIndex(
+        path=os.path.abspath(searched_file),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        digest=file_digest(searched_file),
+        raw_counts=raw.as_dict(),
+        term_counts=terms.as_dict(),
+        positions=position_arrays,
+    )
+
+
+def save_index(index: WordIndex) -> str:
+    """Write an index and its positions to the cache directory.
+
+    Args:
+        index (WordIndex): The index to store. Its positions must be loaded.
+
+    Returns:
+        str: Path of the written index file.
+    """
+    os.makedirs(cache_dir(), exist_ok=True)
+    path = index_path(index.path)
+    header = {
+        "version": INDEX_FORMAT_VERSION,
+        "path": index.path,
+        "size": index.size,
+        "mtime_ns": index.mtime_ns,
+        "digest": index.digest,
+        "raw_counts": index.raw_counts,
+        "term_counts": index.term_counts,
+    }
+    if index.positions is not None:
+        dump_atomic(index.positions, positions_path(index.path))
+    dump_atomic(header, path)
+    return path
+
+
+def load_fresh_index(searched_file: str) -> Optional[WordIndex]:
+    """Load the index of a searched file if it is still up to date.
+
+    The index is fresh when the file size and modification time match the
+    indexed ones. When only the modification time differs, the content
+    hash decides and the stored modification time is refreshed.
+
+    Args:
+        searched_file (str): The path to the searched text file.
+
+    Returns:
+        WordIndex: The fresh index, or None when there is no usable index.
+    """
+    try:
+        stat = os.stat(searched_file)
+        with open(index_path(searched_file), "rb") as file:
+            header = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if header.get("version") != INDEX_FORMAT_VERSION:
+        return None
+    if header["size"] != stat.st_size:
+        return None
+
+    index = WordIndex(
+        path=header["path"],
+        size=header["size"],
+        mtime_ns=header["mtime_ns"],
+        digest=header["digest"],
+        raw_counts=header["raw_counts"],
+        term_counts=header["term_counts"],
+    )
+    if index.mtime_ns != stat.st_mtime_ns:
+        if file_digest(searched_file) != index.digest:
+            return None
+        index.mtime_ns = stat.st_mtime_ns
+        save_index(index)
+    return index
+
+
+@click.group()
+def index() -> None:
+    """Manage persistent word indexes of searched files."""
+
+
+@index.command("build")
+@click.option(
+    "--searched-file",
+    "-s",
+    "searched_files",
+    type=click.Path(exists=True, dir_okay=False),
+    multiple=True,
+    required=True,
+    help="Text file to index (can be repeated)",
+)
+def build(searched_files: List[str]) -> None:
+    """
+    Tokenize text files once and store their inverted indexes.
+
+    Args:
+        searched_files (list): Paths to the text files to index. Required.
+    """
+    for searched_file in searched_files:
+        word_index = build_index(searched_file)
+        path = save_index(word_index)
+        tokens = sum(word_index.term_counts.values())
+        terms = len(word_index.term_counts)
+        click.echo(
+            f"Indexed {tokens} tokens ({terms} distinct terms) "
+            f"from '{searched_file}' into '{path}'."
+        )
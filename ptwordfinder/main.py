@@ -1,10 +1,42 @@
 """ Entrypoint of the CLI """
 
+from importlib import import_module
+
 import click
-from ptwordfinder.commands.PTWordFinder import calculate_words
 
 
-@click.group()
+class LazyGroup(click.Group):
+    """
+    A click group importing the module of a subcommand only when the
+    subcommand is run, so that `ptwordf` starts without importing every
+    command and its dependencies.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Command name -> "module:attribute" of the click command
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        commands = set(super().list_commands(ctx)) | set(self.lazy_commands)
+        return sorted(commands)
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.lazy_commands:
+            return super().get_command(ctx, cmd_name)
+        module_name, attribute = self.lazy_commands[cmd_name].split(":")
+        return getattr(import_module(module_name), attribute)
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_commands={
+        "calculate-words": "ptwordfinder.commands.pt_word_finder:"
+        "calculate_words",
+        "index": "ptwordfinder.commands.word_index:index",
+        "serve": "ptwordfinder.commands.serve:serve",
+    },
+)
 def cli():
     """
     The method cli is decorated with @click.group(),
@@ -14,4 +46,5 @@ def cli():
     pass
 
 
-cli.add_command(calculate_words)
+if __name__ == "__main__":
+    cli()
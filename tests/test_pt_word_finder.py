@@ -19,9 +19,52 @@ This module contains the following test cases:
    of occurrences of a specified pattern in a text file.
 7. `test_file_not_found`: Verifies that a FileNotFoundError is raised when the
    specified searched file does not exist.
+8. `test_count_multiple_words_per_word`: Verifies that the --per-word option
+   reports the count of every word from --words-input-file and the total,
+   and requires --words-input-file.
+9. `test_count_single_word_in_directory`: Verifies that a directory can be
+   searched with several processes and that a total is reported.
+10. `test_count_phrases_aho_corasick`: Verifies that --aho-corasick counts
+    phrases and substrings from --words-input-file, or whole words only.
+11. `test_count_regex_and_literal_pattern`: Verifies that --pattern is a
+    regular expression, that --literal escapes it, that unsafe patterns
+    are rejected and that --literal and --whole-buffer require --pattern.
+12. `test_count_from_stdin`: Verifies that `-s -` counts standard input,
+    alone or next to files.
+13. `test_count_in_compressed_file`: Verifies that a compressed file is
+    decompressed on the fly, also with several jobs.
+14. `test_stats_and_profile`: Verifies that --stats prints phase timings as
+    JSON on stderr and that --profile writes a pstats file.
+15. `test_machine_readable_formats`: Verifies that --format prints one
+    record per file and the total instead of sentences.
+16. `test_count_queries_file`: Verifies that --queries counts typed
+    queries, together with --single-word and --words-input-file.
+17. `test_incremental_count`: Verifies that --incremental counts appended
+    lines from a checkpoint and rejects --whole-buffer.
+18. `test_watch_options`: Verifies that --watch rejects standard input and
+    --engine mmap.
+19. `test_top_words`: Verifies that --top reports the most frequent words
+    of every file and of all files, exactly or with --top-capacity.
+20. `test_phrases_and_ngrams`: Verifies that --phrase and --ngram count
+    words across line breaks, in files and standard input.
+21. `test_ignore_case_and_fold_diacritics`: Verifies that --ignore-case and
+    --fold-diacritics apply to single words, word lists and patterns.
+22. `test_single_word_match_modes`: Verifies that --match counts a single
+    word as a substring, a whole word, a prefix or a suffix.
+23. `test_lemmatize`: Verifies that --lemmatize counts every form of a
+    word, with the bundled or a given dictionary, and reports the lemma
+    cache in --stats.
+24. `test_show_matches`: Verifies that --show-matches lists the hits of
+    every counting mode, stops after --max-matches and rejects the other
+    modes.
+25. `test_undecodable_file`: Verifies that a file that is not UTF-8 text
+    is reported as an error while the other files are counted.
 """
 
+import gzip
+import json
 import os
+import pstats
 import re
 
 from click.testing import CliRunner
@@ -176,3 +219,771 @@ def test_file_not_found():
         ])
     assert result.exit_code == 2
     assert re.search("does not exist.", result.output)
+
+
+def test_count_multiple_words_per_word():
+    """
+    Test calculate_words function with --words-input-file
+    and --per-word options.
+
+    Verifies that:
+    - Every word from the word file is reported with its own count.
+    - The total of matching words is still reported.
+    - --per-word without --words-input-file is rejected.
+    """
+    # Create test files
+    with open("words.txt", "w", encoding="utf8") as f:
+        f.write("hello\nworld\nmissing")
+    with open("text.txt", "w", encoding="utf8") as f:
+        f.write("hello world, hello again.")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        [
+            "--words-input-file", "words.txt",
+            "--searched-file", "text.txt",
+            "--per-word",
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Found 'hello' 2 times in 'text.txt'." in result.output
+    assert "Found 'world' 1 times in 'text.txt'." in result.output
+    assert "Found 'missing' 0 times in 'text.txt'." in result.output
+    assert re.search("Found 3 matching words", result.output)
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "hello", "--searched-file", "text.txt", "--per-word"],
+    )
+    assert result.exit_code == 1
+    assert "--per-word requires --words-input-file" in result.output
+
+    # Clean up test files
+    os.remove("words.txt")
+    os.remove("text.txt")
+
+
+def test_count_single_word_in_directory(tmpdir):
+    """
+    Test the `calculate_words` function with a directory
+    as `--searched-file` and the `--jobs` option.
+
+    Verifies that:
+    - Every file of the directory is reported with its own count.
+    - The total over all files is reported.
+    """
+    tmpdir.join("a.txt").write_text("hello hello\n", encoding="utf8")
+    tmpdir.join("b.txt").write_text("hello world\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        ["--single-word", "hello", "--searched-file", str(tmpdir), "-j", "2"],
+    )
+    assert result.exit_code == 0
+    assert f"Found 'hello' 2 times in '{tmpdir.join('a.txt')}'." in (
+        result.output
+    )
+    assert f"Found 'hello' 1 times in '{tmpdir.join('b.txt')}'." in (
+        result.output
+    )
+    assert "Found 'hello' 3 times in 2 files." in result.output
+
+
+def test_count_phrases_aho_corasick(tmpdir, monkeypatch):
+    """
+    Test calculate_words function with --words-input-file
+    and --aho-corasick options.
+
+    Verifies that:
+    - Phrases and substrings are counted with --match substring.
+    - Only whole words are counted with --match whole.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir))
+    words = tmpdir.join("words.txt")
+    words.write_text("Pan Tadeusz\npan\n", encoding="utf8")
+    text = tmpdir.join("text.txt")
+    text.write_text("Pan Tadeusz i panna\n", encoding="utf8")
+    arguments = [
+        "--words-input-file", str(words),
+        "--searched-file", str(text),
+        "--aho-corasick",
+        "--per-word",
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(calculate_words, arguments)
+    assert result.exit_code == 0
+    assert "Found 'Pan Tadeusz' 1 times" in result.output
+    assert "Found 'pan' 1 times" in result.output
+    assert "Found 2 matching words" in result.output
+
+    result = runner.invoke(calculate_words, arguments + ["--match", "whole"])
+    assert result.exit_code == 0
+    assert "Found 'pan' 0 times" in result.output
+    assert "Found 1 matching words" in result.output
+
+
+def test_count_regex_and_literal_pattern(tmpdir):
+    """
+    Test calculate_words function with --pattern, with and without
+    the --literal option.
+
+    Verifies that:
+    - The pattern is matched as a regular expression by default.
+    - With --literal, the pattern is matched as plain text.
+    - A pattern with nested repetitions is rejected.
+    - --literal and --whole-buffer without --pattern are rejected.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("banana bread with b[a-z]+na\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words, ["--pattern", "b[a-z]+na", "-s", str(text)]
+    )
+    assert result.exit_code == 0
+    assert "Found 1 matches for pattern 'b[a-z]+na'" in result.output
+
+    result = runner.invoke(
+        calculate_words,
+        ["--pattern", "b[a-z]+na", "--literal", "-s", str(text)],
+    )
+    assert result.exit_code == 0
+    assert "Found 1 matches for pattern 'b[a-z]+na'" in result.output
+
+    result = runner.invoke(
+        calculate_words, ["--pattern", "n.", "-s", str(text)]
+    )
+    assert "Found 3 matches" in result.output
+
+    result = runner.invoke(
+        calculate_words, ["--pattern", "n.", "--literal", "-s", str(text)]
+    )
+    assert "Found 0 matches" in result.output
+
+    result = runner.invoke(
+        calculate_words, ["--pattern", "(a+)+b", "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "nests repetitions" in result.output
+
+    for option in ("--literal", "--whole-buffer"):
+        result = runner.invoke(
+            calculate_words, ["-w", "Tadeusz", option, "-s", str(text)]
+        )
+        assert result.exit_code == 1
+        assert f"{option} requires --pattern" in result.output
+
+
+def test_count_from_stdin(tmpdir):
+    """
+    Test calculate_words function reading standard input with `-s -`.
+
+    Verifies that:
+    - Standard input is counted like a file.
+    - Standard input and files are reported with their total.
+    - --whole-buffer is rejected for standard input.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Tadeusz\n", encoding="utf8")
+    stdin = "Tadeusz, Zosia\nTadeusz\n"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words, ["-w", "Tadeusz", "-s", "-"], input=stdin
+    )
+    assert result.exit_code == 0
+    assert "Found 'Tadeusz' 2 times in '-'." in result.output
+
+    result = runner.invoke(
+        calculate_words,
+        ["-p", "Tadeusz", "-s", "-", "-s", str(text)],
+        input=stdin,
+    )
+    assert result.exit_code == 0
+    assert "Found 3 matches for pattern 'Tadeusz' in 2 files." in result.output
+
+    result = runner.invoke(
+        calculate_words, ["-p", "a", "--whole-buffer", "-s", "-"], input=stdin
+    )
+    assert result.exit_code == 1
+
+
+def test_count_in_compressed_file(tmpdir):
+    """
+    Test calculate_words function with a gzip compressed searched file.
+
+    Verifies that:
+    - The count equals the one of the uncompressed text.
+    - With several jobs, the file is not split into byte ranges.
+    """
+    archive = tmpdir.join("text.txt.gz")
+    archive.write_binary(gzip.compress("Tadeusz\n".encode("utf8") * 1000))
+
+    runner = CliRunner()
+    for options in ([], ["-j", "2"], ["--engine", "mmap"]):
+        result = runner.invoke(
+            calculate_words, ["-w", "Tadeusz", "-s", str(archive)] + options
+        )
+        assert result.exit_code == 0
+        assert "Found 'Tadeusz' 1000 times" in result.output
+
+
+def test_stats_and_profile(tmpdir):
+    """
+    Test calculate_words function with the --stats and --profile options.
+
+    Verifies that:
+    - The statistics are printed as JSON on stderr, apart from the results.
+    - The profile can be loaded with pstats.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Tadeusz i Zosia\n" * 10, encoding="utf8")
+    profile = str(tmpdir.join("run.prof"))
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "Zosia", "-s", str(text), "--stats", "--profile", profile],
+    )
+    assert result.exit_code == 0
+    assert "Found 'Zosia' 10 times" in result.stdout
+    stats = json.loads(result.stderr)
+    phases = {"open", "read", "tokenize", "match", "output"}
+    assert set(stats["phases"]) == phases
+    assert stats["lines"] == 10
+    assert stats["bytes"] == 160
+    assert pstats.Stats(profile).total_calls > 0
+
+
+def test_machine_readable_formats(tmpdir):
+    """
+    Test calculate_words function with the --format option.
+
+    Verifies that:
+    - JSON and NDJSON give one record per file, then the total.
+    - CSV gives a header and the same records.
+    - No sentence nor elapsed time is printed.
+    """
+    first = tmpdir.join("first.txt")
+    first.write_text("Tadeusz Tadeusz\n", encoding="utf8")
+    second = tmpdir.join("second.txt")
+    second.write_text("Tadeusz\n", encoding="utf8")
+    options = ["-w", "Tadeusz", "-s", str(first), "-s", str(second)]
+
+    runner = CliRunner()
+    result = runner.invoke(calculate_words, options + ["--format", "json"])
+    assert result.exit_code == 0
+    records = json.loads(result.output)
+    assert [(r["file"], r["count"]) for r in records] == [
+        (str(first), 2),
+        (str(second), 1),
+        (None, 3),
+    ]
+    assert records[2]["bytes"] == 24
+    assert all(r["query_type"] == "single_word" for r in records)
+
+    result = runner.invoke(calculate_words, options + ["--format", "ndjson"])
+    lines = result.output.splitlines()
+    assert [json.loads(line)["count"] for line in lines] == [2, 1, 3]
+
+    result = runner.invoke(calculate_words, options + ["--format", "csv"])
+    lines = result.output.splitlines()
+    assert lines[0] == "file,query_type,query,word,count,bytes,duration"
+    assert lines[1].startswith(f"{first},single_word,Tadeusz,,2,16,")
+    assert "Time elapsed" not in result.output
+
+
+def test_count_queries_file(tmpdir):
+    """
+    Test calculate_words function with the --queries option.
+
+    Verifies that:
+    - Every typed query is reported.
+    - --single-word and --words-input-file are added to the queries
+      instead of being mutually exclusive.
+    - Invalid queries are rejected.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Tadeusz, Tadeuszu\nbanana\n", encoding="utf8")
+    queries = tmpdir.join("queries.txt")
+    queries.write_text("word:Tadeusz\nregex:b[a-z]+a\n", encoding="utf8")
+    words = tmpdir.join("words.txt")
+    words.write_text("banana\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        [
+            "--queries",
+            str(queries),
+            "-w",
+            "Tadeusz",
+            "-i",
+            str(words),
+            "-s",
+            str(text),
+        ],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[:4] == [
+        f"Found word 'Tadeusz' 1 times in '{text}'.",
+        f"Found 1 matches for pattern 'b[a-z]+a' in '{text}'.",
+        f"Found word 'banana' 1 times in '{text}'.",
+        f"Found 'Tadeusz' 2 times in '{text}'.",
+    ]
+
+    queries.write_text("regex:(a+)+\n", encoding="utf8")
+    result = runner.invoke(
+        calculate_words, ["--queries", str(queries), "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "Line 1" in result.output
+
+
+def test_incremental_count(tmpdir, monkeypatch):
+    """
+    Test calculate_words function with the --incremental option.
+
+    Verifies that:
+    - Appended lines are added to the count of the previous run.
+    - A shrunk file is counted from the start.
+    - --whole-buffer is rejected.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    text = tmpdir.join("app.log")
+    text.write_text("Tadeusz\n", encoding="utf8")
+    options = ["-w", "Tadeusz", "-s", str(text), "--incremental"]
+
+    runner = CliRunner()
+    result = runner.invoke(calculate_words, options)
+    assert result.output.startswith(f"Found 'Tadeusz' 1 times in '{text}'.")
+
+    with open(text, "a", encoding="utf8") as file:
+        file.write("Tadeusz i Tadeusz\n")
+    result = runner.invoke(calculate_words, options)
+    assert result.output.startswith(f"Found 'Tadeusz' 3 times in '{text}'.")
+
+    text.write_text("Zosia\n", encoding="utf8")
+    result = runner.invoke(calculate_words, options)
+    assert result.output.startswith(f"Found 'Tadeusz' 0 times in '{text}'.")
+
+    result = runner.invoke(
+        calculate_words, options + ["-p", "T.", "--whole-buffer"]
+    )
+    assert result.exit_code == 1
+    assert "cannot be combined with --whole-buffer" in result.output
+
+
+def test_watch_options(tmpdir):
+    """
+    Test calculate_words function with invalid --watch options.
+
+    Verifies that:
+    - Standard input cannot be watched.
+    - --engine mmap cannot be combined with --watch.
+    """
+    text = tmpdir.join("app.log")
+    text.write_text("Tadeusz\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words, ["-w", "Tadeusz", "-s", "-", "--watch"]
+    )
+    assert result.exit_code == 1
+    assert "--watch cannot read standard input" in result.output
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "Tadeusz", "-s", str(text), "--watch", "--engine", "mmap"],
+    )
+    assert result.exit_code == 1
+    assert "cannot be combined" in result.output
+
+
+def test_top_words(tmpdir):
+    """
+    Test calculate_words function with the --top option.
+
+    Verifies that:
+    - The K most frequent words are reported, most frequent first.
+    - The total of several files is ranked on the merged counts.
+    - --top-capacity gives the same answer on a small vocabulary.
+    - --top cannot be combined with word options.
+    """
+    first = tmpdir.join("first.txt")
+    first.write_text("Tadeusz Zosia Tadeusz i\n", encoding="utf8")
+    second = tmpdir.join("second.txt")
+    second.write_text("Zosia, Zosia! i\n", encoding="utf8")
+
+    runner = CliRunner()
+    options = ["--top", "2", "-s", str(first), "-s", str(second)]
+    result = runner.invoke(calculate_words, options)
+    assert result.exit_code == 0
+    assert result.output.splitlines()[:6] == [
+        f"Found 'Tadeusz' 2 times in '{first}'.",
+        f"Found 'Zosia' 1 times in '{first}'.",
+        f"Found 'Zosia' 2 times in '{second}'.",
+        f"Found 'i' 1 times in '{second}'.",
+        "Found 'Zosia' 3 times in 2 files.",
+        "Found 'Tadeusz' 2 times in 2 files.",
+    ]
+
+    result = runner.invoke(calculate_words, options + ["--top-capacity", "8"])
+    assert result.output.splitlines()[4] == "Found 'Zosia' 3 times in 2 files."
+
+    result = runner.invoke(calculate_words, options + ["-w", "Zosia"])
+    assert result.exit_code == 1
+    assert "--top and --ngram cannot be combined" in result.output
+
+
+def test_phrases_and_ngrams(tmpdir):
+    """
+    Test calculate_words function with the --phrase and --ngram options.
+
+    Verifies that:
+    - Phrases are counted across line breaks and punctuation.
+    - --ngram lists every n-gram, or the most frequent with --top.
+    - Standard input is read as one stream of words.
+    - --incremental is rejected.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Pan Tadeusz, Pan\n\nTadeusz i Zosia\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        ["--phrase", "Pan Tadeusz", "--phrase", "i Zosia", "-s", str(text)],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[:2] == [
+        f"Found 'Pan Tadeusz' 2 times in '{text}'.",
+        f"Found 'i Zosia' 1 times in '{text}'.",
+    ]
+
+    result = runner.invoke(
+        calculate_words, ["--ngram", "2", "--top", "1", "-s", str(text)]
+    )
+    assert result.output.splitlines()[0] == (
+        f"Found 'Pan Tadeusz' 2 times in '{text}'."
+    )
+
+    result = runner.invoke(
+        calculate_words,
+        ["--ngram", "3", "-s", "-"],
+        input="Pan Tadeusz\ni Zosia\n",
+    )
+    assert result.output.splitlines()[:2] == [
+        "Found 'Pan Tadeusz i' 1 times in '-'.",
+        "Found 'Tadeusz i Zosia' 1 times in '-'.",
+    ]
+
+    result = runner.invoke(
+        calculate_words, ["--ngram", "2", "-s", str(text), "--incremental"]
+    )
+    assert result.exit_code == 1
+    assert "cannot be combined with --incremental" in result.output
+
+
+def test_ignore_case_and_fold_diacritics(tmpdir):
+    """
+    Test calculate_words function with --ignore-case and --fold-diacritics.
+
+    Verifies that:
+    - Case and diacritics are ignored in single words, word lists and
+      patterns, on files and on standard input.
+    - The options are rejected with --engine mmap.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Żołnierz ŻOŁNIERZ\nzolnierz Tadeusz\n", encoding="utf8")
+    words = tmpdir.join("words.txt")
+    words.write_text("ZOLNIERZ\ntadeusz\n", encoding="utf8")
+
+    runner = CliRunner()
+    options = ["--ignore-case", "--fold-diacritics"]
+    cases = [
+        (["-w", "zolnierz"], f"Found 'zolnierz' 3 times in '{text}'."),
+        (
+            ["-i", str(words), "--per-word"],
+            f"Found 'zolnierz' 3 times in '{text}'.",
+        ),
+        (
+            ["-p", "Zol.ierz\\b"],
+            f"Found 3 matches for pattern 'Zol.ierz\\b' in '{text}'.",
+        ),
+        (
+            ["-p", "ŻOŁNIERZ", "--literal"],
+            f"Found 3 matches for pattern 'ŻOŁNIERZ' in '{text}'.",
+        ),
+    ]
+    for arguments, expected in cases:
+        result = runner.invoke(
+            calculate_words, arguments + options + ["-s", str(text)]
+        )
+        assert result.exit_code == 0
+        assert result.output.splitlines()[0] == expected
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "żołnierz", "--ignore-case", "-s", "-"],
+        input=text.read_text("utf8"),
+    )
+    assert result.output.splitlines()[0] == "Found 'żołnierz' 2 times in '-'."
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "Zolnierz", "--fold-diacritics", "-s", str(text)],
+    )
+    assert result.output.splitlines()[0] == (
+        f"Found 'Zolnierz' 1 times in '{text}'."
+    )
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "zolnierz", "--ignore-case", "--engine", "mmap"]
+        + ["-s", str(text)],
+    )
+    assert result.exit_code == 1
+    assert "cannot be combined with" in result.output
+
+
+def test_single_word_match_modes(tmpdir):
+    """
+    Test calculate_words function with --single-word and --match.
+
+    Verifies that:
+    - Every match mode gives its count, with both engines.
+    - --match is rejected without --single-word or --aho-corasick, and
+      prefix and suffix with --aho-corasick.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Pan panna\nTadeuszpan, pan.\n", encoding="utf8")
+
+    runner = CliRunner()
+    expected = {"substring": 3, "whole": 1, "prefix": 2, "suffix": 2}
+    for match, count in expected.items():
+        for engine in ["lines", "mmap"]:
+            result = runner.invoke(
+                calculate_words,
+                ["-w", "pan", "--match", match, "--engine", engine]
+                + ["-s", str(text)],
+            )
+            assert result.exit_code == 0
+            assert result.output.splitlines()[0] == (
+                f"Found 'pan' {count} times in '{text}'."
+            )
+
+    result = runner.invoke(
+        calculate_words, ["-p", "pan", "--match", "whole", "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "--match requires --single-word" in result.output
+
+    words = tmpdir.join("words.txt")
+    words.write_text("pan\n", encoding="utf8")
+    result = runner.invoke(
+        calculate_words,
+        ["-i", str(words), "--aho-corasick", "--match", "prefix"]
+        + ["-s", str(text)],
+    )
+    assert result.exit_code == 1
+    assert "cannot be combined with --match prefix" in result.output
+
+
+def test_lemmatize(tmpdir):
+    """
+    Test calculate_words function with the --lemmatize option.
+
+    Verifies that:
+    - A single word and the words of a list are counted by lemma.
+    - --lemma-dictionary replaces the bundled dictionary.
+    - --stats reports the hit rate of the lemma cache.
+    - --pattern, several words with --single-word and malformed
+      dictionaries are rejected, phrases are counted with --phrase.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Dom, domu i domem.\nKot w domach\n", encoding="utf8")
+    words = tmpdir.join("words.txt")
+    words.write_text("domy\nkot\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words, ["-w", "domu", "--lemmatize", "-s", str(text)]
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0] == (
+        f"Found 'domu' 4 times in '{text}'."
+    )
+
+    result = runner.invoke(
+        calculate_words,
+        ["-i", str(words), "--per-word", "--lemmatize", "--stats"]
+        + ["-s", str(text)],
+    )
+    assert result.stdout.splitlines()[:2] == [
+        f"Found 'dom' 4 times in '{text}'.",
+        f"Found 'kot' 0 times in '{text}'.",
+    ]
+    report = json.loads(result.stderr)
+    assert report["lemma_cache"]["lookups"] == 7
+
+    dictionary = str(tmpdir.join("lemmas.tsv"))
+    with open(dictionary, "w", encoding="utf8") as file:
+        file.write("kot\tkot\nkota\tkot\n")
+    for option, count in [(["--lemmatize"], 0), ("--lemma-dictionary", 1)]:
+        if option == "--lemma-dictionary":
+            option = [option, dictionary]
+        result = runner.invoke(
+            calculate_words, ["-w", "kota", "-s", str(text)] + option
+        )
+        assert result.output.splitlines()[0] == (
+            f"Found 'kota' {count} times in '{text}'."
+        )
+
+    result = runner.invoke(
+        calculate_words, ["-p", "dom", "--lemmatize", "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "--lemmatize cannot be combined" in result.output
+
+    result = runner.invoke(
+        calculate_words, ["-w", "Dom kot", "--lemmatize", "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "--single-word must be one word with --lemmatize" in (
+        result.output
+    )
+    result = runner.invoke(
+        calculate_words,
+        ["--phrase", "domem Kot", "--lemmatize", "--ignore-case"]
+        + ["-s", str(text)],
+    )
+    assert result.output.splitlines()[0] == (
+        f"Found 'dom kot' 1 times in '{text}'."
+    )
+
+    with open(dictionary, "w", encoding="utf8") as file:
+        file.write("kot kot\n")
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "kota", "--lemma-dictionary", dictionary]
+        + ["-s", str(text)],
+    )
+    assert result.exit_code == 1
+    assert "Invalid lemma dictionary" in result.output
+
+
+def test_show_matches(tmpdir):
+    """
+    Test calculate_words function with the --show-matches option.
+
+    Verifies that:
+    - Hits of a single word, a word list and a pattern are listed with
+      their file, line, column and context, then their number.
+    - --max-matches stops after N hits, also on standard input.
+    - --format ndjson writes one record per hit.
+    - A long --literal pattern is listed like it is counted.
+    - --max-matches without --show-matches, and --show-matches with
+      --top, are rejected.
+    """
+    text = tmpdir.join("text.txt")
+    text.write_text("Pan Tadeusz, pan.\n\n(pan) panna\n", encoding="utf8")
+    words = tmpdir.join("words.txt")
+    words.write_text("pan\nTadeusz\n", encoding="utf8")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "pan", "--match", "whole", "--show-matches", "-s", str(text)],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[:3] == [
+        f"{text}:1:14: Pan Tadeusz, pan.",
+        f"{text}:3:2: (pan) panna",
+        f"Showed 2 matches in '{text}'.",
+    ]
+
+    result = runner.invoke(
+        calculate_words,
+        ["-i", str(words), "--show-matches", "-s", str(text)],
+    )
+    assert [line.split(": ")[0] for line in result.output.splitlines()][
+        :3
+    ] == [f"{text}:1:5", f"{text}:1:14", f"{text}:3:2"]
+
+    result = runner.invoke(
+        calculate_words,
+        ["-p", r"pan\w*", "--show-matches", "--max-matches", "1"]
+        + ["--format", "ndjson", "-s", "-"],
+        input="Pan Tadeusz\n" * 1000 + "panna\n",
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {
+        "file": "-",
+        "line": 1001,
+        "column": 1,
+        "match": "panna",
+        "context": "panna",
+    }
+
+    dots = tmpdir.join("dots.txt")
+    dots.write_text("." * 600 + "\n", encoding="utf8")
+    result = runner.invoke(
+        calculate_words,
+        ["-p", "." * 600, "--literal", "--show-matches", "-s", str(dots)],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[1] == f"Showed 1 matches in '{dots}'."
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "pan", "--max-matches", "1", "-s", str(text)],
+    )
+    assert result.exit_code == 1
+    assert "--max-matches requires --show-matches" in result.output
+
+    result = runner.invoke(
+        calculate_words, ["--top", "3", "--show-matches", "-s", str(text)]
+    )
+    assert result.exit_code == 1
+    assert "--show-matches cannot be combined" in result.output
+
+
+def test_undecodable_file(tmpdir):
+    """
+    Test calculate_words function with a binary file among the searched
+    files.
+
+    Verifies that:
+    - The binary file is reported as an error, without a traceback.
+    - The other files are reported and make up the total.
+    - The exit code is 1.
+    """
+    tmpdir.join("a.txt").write_text("Tadeusz\n", encoding="utf8")
+    tmpdir.join("b.bin").write_binary(b"\xff\xfeTadeusz\n")
+    runner = CliRunner()
+    for options in (["-w", "Tadeusz"], ["--top", "1"], ["-p", "T", "-j", "2"]):
+        result = runner.invoke(
+            calculate_words, options + ["-s", str(tmpdir)]
+        )
+        assert result.exit_code == 1
+        assert result.exception is None or isinstance(
+            result.exception, SystemExit
+        )
+        assert result.stderr == (
+            f"Error: '{tmpdir.join('b.bin')}' is not UTF-8 text "
+            "(invalid start byte).\n"
+        )
+        assert f"in '{tmpdir.join('a.txt')}'." in result.stdout
+        assert "1 times in 2 files." in result.stdout or (
+            "1 matches for pattern 'T' in 2 files." in result.stdout
+        )
+
+    result = runner.invoke(
+        calculate_words,
+        ["-w", "Tadeusz", "--show-matches", "-s", str(tmpdir)],
+    )
+    assert result.exit_code == 1
+    assert "Error: A searched file is not UTF-8 text" in result.stderr
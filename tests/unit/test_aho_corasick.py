@@ -0,0 +1,132 @@
+"""
+Test module for the `ptwordfinder.commands.aho_corasick` module.
+
+This module contains the following test cases:
+1. `cache` fixture: Points the automaton cache to a temporary directory.
+2. `test_count_matches_brute_force`: Verifies that all occurrences,
+   overlapping ones included, are found as by a brute force search.
+3. `test_count_whole_words`: Verifies that whole word matching ignores
+   occurrences inside longer words and supports phrases.
+4. `test_empty_and_duplicate_words`: Verifies that empty entries are ignored
+   and duplicates are matched once.
+5. `test_load_automaton_cached`: Verifies that automatons are pickled into
+   the cache directory and reused.
+6. `test_count_matches_in_file`: Verifies counting in a file on the bundled
+   Pan Tadeusz text against `str.count` for non self-overlapping words.
+"""
+
+import os
+
+import pytest
+
+from ptwordfinder.commands.aho_corasick import (
+    AhoCorasick,
+    count_matches_in_file,
+    load_automaton,
+)
+
+CORPUS = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "pan-tadeusz-czyli-ostatni-zajazd-na-litwie.txt",
+)
+
+
+@pytest.fixture
+def cache(tmpdir, monkeypatch):
+    """
+    Given a temporary directory,
+    Use it as the cache directory.
+
+    Returns:
+    str: Path of the cache directory.
+    """
+    cache_path = str(tmpdir.mkdir("cache"))
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", cache_path)
+    return cache_path
+
+
+def brute_force(word, text):
+    """Count the occurrences of a word, overlapping ones included."""
+    return sum(text.startswith(word, i) for i in range(len(text)))
+
+
+def test_count_matches_brute_force():
+    """
+    When an automaton of overlapping words is matched,
+
+    Verifies that:
+    - Every word count equals the brute force count.
+    """
+    words = ["he", "she", "his", "hers", "aa", "a", "ushe"]
+    text = "ushers said his hershey aaa she"
+
+    counts = AhoCorasick(words).count(text)
+
+    assert counts == [brute_force(word, text) for word in words]
+
+
+def test_count_whole_words():
+    """
+    When only whole words are counted,
+
+    Verifies that:
+    - Occurrences inside longer words are skipped.
+    - Phrases with spaces are matched.
+    """
+    automaton = AhoCorasick(["pan", "Pan Tadeusz", "panna"])
+    text = "Pan Tadeusz, pan i panna; panpan Pan Tadeuszowi"
+
+    assert automaton.count(text) == [4, 2, 1]
+    assert automaton.count(text, whole_words=True) == [1, 1, 1]
+
+
+def test_empty_and_duplicate_words():
+    """
+    When the word list has empty and duplicated entries,
+
+    Verifies that:
+    - Empty entries are ignored and duplicates appear once.
+    """
+    automaton = AhoCorasick(["", "ab", "ab", "b"])
+
+    assert automaton.words == ["ab", "b"]
+    assert automaton.count("abab") == [2, 2]
+
+
+def test_load_automaton_cached(cache):
+    """
+    When an automaton is loaded twice for the same word list,
+
+    Verifies that:
+    - It is pickled into the cache directory on the first load.
+    - The second load gives an equivalent automaton.
+    """
+    first = load_automaton(["Tadeusz", "Zosia"])
+    assert len(os.listdir(cache)) == 1
+
+    second = load_automaton(["Tadeusz", "Zosia", "Tadeusz"])
+    assert len(os.listdir(cache)) == 1
+    assert second.goto == first.goto
+    assert second.count("Zosia Tadeusz") == [1, 1]
+
+
+def test_count_matches_in_file(cache):
+    """
+    When the bundled text is searched with an automaton,
+
+    Verifies that:
+    - Substring counts equal str.count for non self-overlapping words.
+    - Whole word counts are lower or equal.
+    """
+    words = ["Tadeusz", "Soplica", "Pan Sędzia", "ż"]
+    with open(CORPUS, encoding="utf8") as file:
+        text = file.read()
+
+    counts = count_matches_in_file(load_automaton(words), CORPUS)
+    whole = count_matches_in_file(load_automaton(words), CORPUS, True)
+
+    assert counts == {word: text.count(word) for word in words}
+    assert all(whole[word] <= counts[word] for word in words)
+    assert whole["ż"] == 0
@@ -0,0 +1,84 @@
+"""
+Test module for the `ptwordfinder.commands.boundaries` module.
+
+This module contains the following test cases:
+1. `test_count_bounded`: Verifies that every match mode counts the
+   occurrences at the right word boundaries, and finds as many.
+2. `test_count_word_match_modes`: Verifies that the line engine, the mmap
+   engine and a fresh index agree in every match mode.
+"""
+
+import pytest
+
+from ptwordfinder.commands.boundaries import (
+    MATCH_MODES,
+    count_bounded,
+    find_bounded,
+)
+from ptwordfinder.commands.mmap_engine import count_word_mmap
+from ptwordfinder.commands.pt_word_finder import (
+    count_word_in_file,
+    count_word_in_lines,
+)
+from ptwordfinder.commands.word_index import build_index, save_index
+
+TEXT = "pan panna Tadeuszpan, pan.\n(pan) pani_pan żupan panpan\npan"
+
+
+@pytest.mark.parametrize(
+    "match, expected",
+    [("substring", 11), ("whole", 5), ("prefix", 8), ("suffix", 8)],
+)
+def test_count_bounded(match, expected):
+    """
+    Test count_bounded and find_bounded functions.
+
+    Verifies that:
+    - Punctuation, underscores and line breaks are boundaries, non-ASCII
+      letters are not.
+    - Occurrences do not overlap, like with `str.count`.
+    - An empty word is only counted as a substring, and never found.
+    - find_bounded yields the start of every counted occurrence.
+    """
+    assert count_bounded("pan", TEXT, match) == expected
+    starts = list(find_bounded("pan", TEXT, match))
+    assert len(starts) == expected
+    assert all(TEXT.startswith("pan", start) for start in starts)
+    assert list(find_bounded("aa", "aaa aa", match)) == {
+        "whole": [4],
+        "suffix": [1, 4],
+    }.get(match, [0, 4])
+    assert list(find_bounded("", "pan", match)) == []
+    assert count_bounded("aa", "aaa aa", match) == (
+        1 if match == "whole" else 2
+    )
+    assert count_bounded("", "pan", match) == (
+        4 if match == "substring" else 0
+    )
+
+
+def test_count_word_match_modes(tmpdir, monkeypatch):
+    """
+    Test count_word_in_file and count_word_mmap functions with --match.
+
+    Verifies that:
+    - Lines, the mmap engine and a fresh index give the counts of
+      count_bounded over the whole text.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.mkdir("cache")))
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(TEXT, encoding="utf8")
+    path = str(searched_file)
+    expected = {
+        match: count_bounded("pan", TEXT, match) for match in MATCH_MODES
+    }
+
+    lines = TEXT.splitlines(keepends=True)
+    for match in MATCH_MODES:
+        assert count_word_in_lines("pan", lines, match) == expected[match]
+        assert count_word_in_file("pan", path, match) == expected[match]
+        assert count_word_mmap("pan", path, match) == expected[match]
+
+    save_index(build_index(path))
+    for match in MATCH_MODES:
+        assert count_word_in_file("pan", path, match) == expected[match]
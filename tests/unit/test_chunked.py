@@ -0,0 +1,107 @@
+"""
+Test module for the `ptwordfinder.commands.chunked` module.
+
+This module contains the following test cases:
+1. `test_split_file_aligned_to_lines`: Verifies that the ranges cover the
+   whole file and start right after a newline.
+2. `test_count_in_chunks_matches_sequential`: Verifies that chunked counting
+   over a process pool gives the same results as the sequential scan on the
+   bundled Pan Tadeusz text for all counting modes.
+3. `test_count_in_chunks_crlf`: Verifies that Windows line endings are
+   handled like in a file opened in text mode.
+"""
+
+import os
+
+import pytest
+
+from ptwordfinder.commands.chunked import count_in_chunks, split_file
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_each_word_in_lines,
+    count_multiple_words_in_file,
+    count_multiple_words_in_lines,
+    count_pattern_in_file,
+    count_pattern_in_lines,
+    count_word_in_file,
+    count_word_in_lines,
+)
+
+CORPUS = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "pan-tadeusz-czyli-ostatni-zajazd-na-litwie.txt",
+)
+
+
+def test_split_file_aligned_to_lines():
+    """
+    When the bundled text is split into ranges,
+
+    Verifies that:
+    - The ranges are contiguous and cover the whole file.
+    - Every range but the first starts right after a newline.
+    """
+    ranges = split_file(CORPUS, 13)
+
+    with open(CORPUS, "rb") as file:
+        data = file.read()
+    assert len(ranges) == 13
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1:start] == b"\n"
+
+
+@pytest.mark.parametrize(
+    "lines_function, count_function, query",
+    [
+        (count_word_in_lines, count_word_in_file, "Tadeusz"),
+        (count_pattern_in_lines, count_pattern_in_file, "ie, "),
+        (
+            count_multiple_words_in_lines,
+            count_multiple_words_in_file,
+            {"Pan", "Sędzia", "i"},
+        ),
+        (
+            count_each_word_in_lines,
+            count_each_word_in_file,
+            ["Pan", "Sędzia", "i"],
+        ),
+    ],
+)
+def test_count_in_chunks_matches_sequential(
+    lines_function, count_function, query
+):
+    """
+    When the bundled text is counted in chunks by two processes,
+
+    Verifies that:
+    - The result is identical to the sequential per-file function.
+    """
+    expected = count_function(query, CORPUS)
+
+    result = count_in_chunks(lines_function, query, CORPUS, jobs=2, parts=9)
+
+    assert result == expected
+
+
+def test_count_in_chunks_crlf(tmpdir):
+    """
+    When a file with Windows line endings is counted in chunks,
+
+    Verifies that:
+    - Lines split at CRLF give the same counts as the sequential scan.
+    """
+    test_file = str(tmpdir.join("crlf.txt"))
+    with open(test_file, "wb") as file:
+        file.write(b"ala ma kota\r\n" * 50 + b"kot ma ale\r\n" * 50)
+
+    result = count_in_chunks(
+        count_each_word_in_lines, ["ma", "kota"], test_file, jobs=2, parts=6
+    )
+
+    assert result == count_each_word_in_file(["ma", "kota"], test_file)
+    assert result == {"ma": 100, "kota": 50}
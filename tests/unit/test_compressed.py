@@ -0,0 +1,152 @@
+"""
+Test module for the `ptwordfinder.commands.compressed` module.
+
+This module contains the following test cases:
+1. `compressed_files` fixture: Writes a text file and its gzip, bzip2 and
+   xz versions, named without their usual extensions.
+2. `test_sniff_codec`: Verifies that formats are detected from content.
+3. `test_open_text`: Verifies that compressed files read as the plain text.
+4. `test_counting_compressed_files`: Verifies that every counting function
+   gives the same result on compressed and plain files.
+5. `test_zstandard_missing`: Verifies that a helpful ImportError is raised
+   for Zstandard files when `zstandard` is not installed.
+6. `test_zstandard`: Verifies that Zstandard files are read when
+   `zstandard` is installed.
+"""
+
+import bz2
+import gzip
+import lzma
+import sys
+from functools import partial
+
+import pytest
+
+from ptwordfinder.commands.aho_corasick import (
+    AhoCorasick,
+    count_matches_in_file,
+)
+from ptwordfinder.commands.compressed import open_text, sniff_codec
+from ptwordfinder.commands.mmap_engine import (
+    count_each_word_mmap,
+    count_word_mmap,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_pattern_in_file,
+    count_regex_in_file,
+    count_word_in_file,
+)
+
+TEXT = "Tadeusz, Zosia i Telimena\r\nżółw Tadeusz\n\n" * 50 + "koniec"
+CODECS = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+@pytest.fixture
+def compressed_files(tmpdir, monkeypatch):
+    """
+    Given a temporary directory,
+    Write a text file and one compressed copy per codec.
+
+    Returns:
+    dict: Path of each version, keyed by codec, "plain" for the text file.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    data = TEXT.encode("utf8")
+    paths = {"plain": str(tmpdir.join("plain.txt"))}
+    with open(paths["plain"], "wb") as file:
+        file.write(data)
+    for codec, compress in CODECS.items():
+        paths[codec] = str(tmpdir.join(f"{codec}.txt"))
+        with open(paths[codec], "wb") as file:
+            file.write(compress(data))
+    return paths
+
+
+def test_sniff_codec(compressed_files):
+    """
+    Test sniff_codec function with files named like plain text files.
+
+    Verifies that:
+    - Each compression format is detected from the file content.
+    - Plain and missing files give None.
+    """
+    for codec in CODECS:
+        assert sniff_codec(compressed_files[codec]) == codec
+    assert sniff_codec(compressed_files["plain"]) is None
+    assert sniff_codec("nonexistent_file.txt") is None
+
+
+def test_open_text(compressed_files):
+    """
+    Test open_text function with every version of the file.
+
+    Verifies that:
+    - Lines are those of the plain file opened in text mode.
+    """
+    with open(compressed_files["plain"], "r", encoding="utf8") as file:
+        expected = file.readlines()
+    for path in compressed_files.values():
+        with open_text(path) as file:
+            assert file.readlines() == expected
+
+
+@pytest.mark.parametrize(
+    "count_function, query",
+    [
+        (count_word_in_file, "Tadeusz"),
+        (count_word_mmap, "Tadeusz"),
+        (count_each_word_in_file, ["Tadeusz", "żółw", "koniec"]),
+        (count_each_word_mmap, ["Tadeusz", "żółw", "koniec"]),
+        (count_pattern_in_file, "sz, Z"),
+        (count_regex_in_file, r"[TZ]\w+a\b"),
+        (partial(count_regex_in_file, whole_buffer=True), r"w\s+Tad"),
+        (
+            partial(count_matches_in_file, whole_words=True),
+            AhoCorasick(["Tadeusz", "ż"]),
+        ),
+    ],
+)
+def test_counting_compressed_files(compressed_files, count_function, query):
+    """
+    Test counting functions with compressed files.
+
+    Verifies that:
+    - The result equals the one of the plain file.
+    """
+    expected = count_function(query, compressed_files["plain"])
+    for codec in CODECS:
+        assert count_function(query, compressed_files[codec]) == expected
+
+
+def test_zstandard_missing(tmpdir, monkeypatch):
+    """
+    Test open_text function with a Zstandard file, without `zstandard`.
+
+    Verifies that:
+    - An ImportError naming the package is raised.
+    """
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    path = tmpdir.join("text.zst")
+    path.write_binary(b"\x28\xb5\x2f\xfd" + b"\x00" * 8)
+
+    assert sniff_codec(str(path)) == "zstd"
+    with pytest.raises(ImportError, match="zstandard"):
+        open_text(str(path))
+
+
+def test_zstandard(tmpdir):
+    """
+    Test open_text function with a Zstandard file.
+
+    Verifies that:
+    - Lines are those of the plain text.
+    """
+    zstandard = pytest.importorskip("zstandard")
+    path = tmpdir.join("text.zst")
+    path.write_binary(
+        zstandard.ZstdCompressor().compress(TEXT.encode("utf8"))
+    )
+
+    with open_text(str(path)) as file:
+        assert file.read() == TEXT.replace("\r\n", "\n")
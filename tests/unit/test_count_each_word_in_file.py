@@ -0,0 +1,117 @@
+"""
+Test module for the `count_each_word_in_file` function
+from the `ptwordfinder.commands.pt_word_finder` module.
+
+This module contains the following test cases:
+1. `test_file` fixture: Creates a temporary file with mock content for testing.
+2. `test_count_each_word_in_file_given_word_list`:
+    Verifies that every word gets its own count, in the given order.
+3. `test_count_each_word_in_file_matches_total`:
+    Verifies that the counts sum up to `count_multiple_words_in_file`.
+4. `test_count_each_word_in_file_given_duplicates`:
+    Verifies that duplicated words are reported and counted once.
+5. `test_count_each_word_in_file_nonexistent_file`:
+    Verifies that a FileNotFoundError is raised for a non-existent file.
+"""
+
+import pytest
+
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_multiple_words_in_file,
+)
+
+
+# Mocking a file content for testing
+mock_file_content = """
+This is a sample file.
+It contains words that we will search for.
+Sample file has words to count.
+"""
+
+
+@pytest.fixture
+def test_file(tmpdir):
+    """
+    Given a temporary directory,
+    Create a temporary file with some content for testing.
+
+    Returns:
+    str: Path of the temporary file.
+    """
+    test_file_path = tmpdir.join("test-file.txt")
+    with open(test_file_path, "w", encoding="utf8") as f:
+        f.write(mock_file_content)
+    return str(test_file_path)
+
+
+def test_count_each_word_in_file_given_word_list(test_file):
+    """
+    When counting each word of a word list in a file,
+
+    Args:
+    test_file (str): Path of the test file.
+
+    Verifies that:
+    - Every word is mapped to its count, missing words map to 0.
+    - The words keep the order of the word list.
+    """
+    # Given
+    word_list = ["words", "sample", "missing", "file"]
+
+    # When
+    result = count_each_word_in_file(word_list, test_file)
+
+    # Then
+    assert result == {"words": 2, "sample": 1, "missing": 0, "file": 2}
+    assert list(result) == word_list
+
+
+def test_count_each_word_in_file_matches_total(test_file):
+    """
+    When the per-word counts are summed,
+
+    Args:
+    test_file (str): Path of the test file.
+
+    Verifies that:
+    - The total equals the result of count_multiple_words_in_file.
+    """
+    # Given
+    word_set = {"sample", "file", "count", "It"}
+
+    # When
+    result = count_each_word_in_file(word_set, test_file)
+
+    # Then
+    assert sum(result.values()) == count_multiple_words_in_file(
+        word_set, test_file
+    )
+
+
+def test_count_each_word_in_file_given_duplicates(test_file):
+    """
+    When the word list contains duplicates,
+
+    Args:
+    test_file (str): Path of the test file.
+
+    Verifies that:
+    - Each word appears once in the result with its real count.
+    """
+    # When
+    result = count_each_word_in_file(["file", "file"], test_file)
+
+    # Then
+    assert result == {"file": 2}
+
+
+def test_count_each_word_in_file_nonexistent_file():
+    """
+    When counting words in a non-existent file,
+
+    Verifies that:
+    - FileNotFoundError is raised.
+    """
+    with pytest.raises(FileNotFoundError):
+        count_each_word_in_file(["word"], "nonexistent_file.txt")
@@ -0,0 +1,105 @@
+"""
+Test module for the `count_regex_in_file` function from the
+`ptwordfinder.commands.pt_word_finder` module.
+
+This module contains the following test cases:
+1. `test_file` fixture: Creates a temporary file with mock content.
+2. `test_count_regex_in_file_per_line`: Verifies that regular expression
+   features are honoured, unlike in `count_pattern_in_file`.
+3. `test_count_regex_in_file_literal`: Verifies that plain text patterns
+   give the same count as `count_pattern_in_file`.
+4. `test_count_regex_in_file_whole_buffer`: Verifies that matches can span
+   lines in whole buffer mode while `^` still matches at every line.
+5. `test_count_regex_in_file_unsafe_pattern`: Verifies that unsafe patterns
+   are rejected before the file is read.
+6. `test_count_regex_in_file_nonexistent_file`: Verifies that a
+   FileNotFoundError is raised for a non-existent file.
+"""
+
+import pytest
+
+from ptwordfinder.commands.pt_word_finder import (
+    count_pattern_in_file,
+    count_regex_in_file,
+)
+
+mock_file_content = """banana bread tastes better with ripe banana slices.
+A bandana and a banner.
+Bananas end here
+and start there.
+"""
+
+
+@pytest.fixture
+def test_file(tmpdir):
+    """
+    Given a temporary directory,
+    Create a temporary file with some content for testing.
+
+    Returns:
+    str: Path of the temporary file.
+    """
+    test_file_path = tmpdir.join("test-file.txt")
+    with open(test_file_path, "w", encoding="utf8") as f:
+        f.write(mock_file_content)
+    return str(test_file_path)
+
+
+def test_count_regex_in_file_per_line(test_file):
+    """
+    Test count_regex_in_file function with a regular expression.
+
+    Verifies that:
+    - Character classes and repetitions are matched.
+    - The escaped pattern of count_pattern_in_file finds nothing.
+    """
+    assert count_regex_in_file(r"b[a-z]+na", test_file) == 3
+    assert count_pattern_in_file(r"b[a-z]+na", test_file) == 0
+
+
+def test_count_regex_in_file_literal(test_file):
+    """
+    Test count_regex_in_file function with a plain text pattern.
+
+    Verifies that:
+    - The count equals the one of count_pattern_in_file.
+    """
+    assert count_regex_in_file("ana", test_file) == count_pattern_in_file(
+        "ana", test_file
+    )
+
+
+def test_count_regex_in_file_whole_buffer(test_file):
+    """
+    Test count_regex_in_file function in whole buffer mode.
+
+    Verifies that:
+    - Matches spanning a line break are only found in whole buffer mode.
+    - `^` matches at the start of every line in whole buffer mode.
+    """
+    pattern = r"here\s+and"
+    assert count_regex_in_file(pattern, test_file) == 0
+    assert count_regex_in_file(pattern, test_file, whole_buffer=True) == 1
+    assert count_regex_in_file("^[Bb]an", test_file, whole_buffer=True) == 2
+
+
+def test_count_regex_in_file_unsafe_pattern(test_file):
+    """
+    Test count_regex_in_file function with a nested repetition.
+
+    Verifies that:
+    - A ValueError is raised.
+    """
+    with pytest.raises(ValueError):
+        count_regex_in_file(r"(a+)+$", test_file, timeout=1)
+
+
+def test_count_regex_in_file_nonexistent_file():
+    """
+    Test count_regex_in_file function with a non-existent file.
+
+    Verifies that:
+    - FileNotFoundError is raised.
+    """
+    with pytest.raises(FileNotFoundError):
+        count_regex_in_file(r"\w+", "nonexistent_file.txt")
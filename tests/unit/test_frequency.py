@@ -0,0 +1,136 @@
+"""
+Test module for the `ptwordfinder.commands.frequency` module.
+
+This module contains the following test cases:
+1. `test_exact_frequencies`: Verifies that every word is counted exactly,
+   without punctuation-only tokens, also from a fresh index.
+2. `test_space_saving_bounds`: Verifies that Space-Saving tracks at most
+   its capacity, overestimates within its error and keeps heavy hitters.
+3. `test_most_common`: Verifies that the K most frequent words are kept,
+   ties sorted alphabetically.
+4. `test_merge_bounded_counts`: Verifies that merged Space-Saving tables
+   keep their capacity and upper bounds over every part.
+"""
+
+import random
+from collections import Counter
+
+from ptwordfinder.commands.frequency import (
+    BoundedCounts,
+    SpaceSaving,
+    count_frequencies_in_file,
+    count_frequencies_in_lines,
+    merge_bounded_counts,
+    most_common,
+)
+from ptwordfinder.commands.multi_file import merge_counts
+from ptwordfinder.commands.word_index import build_index, save_index
+
+TEXT = "Tadeusz, Zosia — Tadeusz!\n\nZosia i Tadeusz\n"
+
+
+def test_exact_frequencies(tmpdir, monkeypatch):
+    """
+    Test count_frequencies_in_lines and count_frequencies_in_file.
+
+    Verifies that:
+    - Every word is counted and "—" is left out.
+    - A fresh index gives the same counts.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    expected = {"Tadeusz": 3, "Zosia": 2, "i": 1}
+    assert count_frequencies_in_lines(None, TEXT.splitlines(True)) == expected
+
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(TEXT, encoding="utf8")
+    assert count_frequencies_in_file(None, str(searched_file)) == expected
+    save_index(build_index(str(searched_file)))
+    assert count_frequencies_in_file(None, str(searched_file)) == expected
+
+
+def test_space_saving_bounds():
+    """
+    Test SpaceSaving class on a skewed stream.
+
+    Verifies that:
+    - No more than `capacity` words are tracked.
+    - Every estimate is an upper bound within its recorded error, which
+      is at most the number of tokens divided by the capacity.
+    - The heavy hitters are all tracked.
+    """
+    generator = random.Random(0)
+    words = [f"w{rank}" for rank in range(2000)]
+    weights = [1 / (rank + 1) for rank in range(2000)]
+    tokens = generator.choices(words, weights, k=50000)
+    exact = Counter(tokens)
+
+    summary = SpaceSaving(100)
+    for start in range(0, len(tokens), 1000):
+        summary.update(tokens[start:start + 1000])
+
+    assert len(summary.counts) == 100
+    bound = len(tokens) // 100
+    for word, count in summary.counts.items():
+        assert exact[word] <= count <= exact[word] + summary.errors[word]
+        assert summary.errors[word] <= bound
+    for word, count in exact.most_common(5):
+        assert word in summary.counts
+    assert most_common(summary.counts, 3).keys() == {"w0", "w1", "w2"}
+
+
+def test_most_common():
+    """
+    Test most_common function.
+
+    Verifies that:
+    - The most frequent words come first.
+    - Ties are sorted alphabetically.
+    """
+    counts = {"i": 2, "Zosia": 5, "w": 2, "Tadeusz": 5, "z": 1}
+    assert list(most_common(counts, 3).items()) == [
+        ("Tadeusz", 5),
+        ("Zosia", 5),
+        ("i", 2),
+    ]
+    assert most_common(counts, 10) == dict(
+        sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    )
+
+
+def test_merge_bounded_counts():
+    """
+    Test merge_bounded_counts function, through merge_counts.
+
+    Verifies that:
+    - Tables that fit in the capacity are summed exactly.
+    - A word missing from a full table is given the table floor.
+    - Merging many parts never tracks more than `capacity` words, and
+      every count stays an upper bound of the count over all parts.
+    """
+    small = count_frequencies_in_lines(10, ["a b a\n"])
+    other = count_frequencies_in_lines(10, ["b c\n"])
+    assert isinstance(small, BoundedCounts) and small.floor == 0
+    merged = merge_bounded_counts(merge_counts(None, small), other)
+    assert merged == {"a": 2, "b": 2, "c": 1}
+    assert small == {"a": 2, "b": 1}
+
+    full = BoundedCounts({"a": 5, "b": 3}, 2, 2)
+    merged = merge_bounded_counts(full, BoundedCounts({"c": 4}, 2, 0))
+    assert merged == {"a": 5, "c": 6}
+    assert merged.capacity == 2 and merged.floor == 5
+
+    generator = random.Random(1)
+    words = [f"w{rank}" for rank in range(500)]
+    weights = [1 / (rank + 1) for rank in range(500)]
+    exact = Counter()
+    total = None
+    for _ in range(20):
+        tokens = generator.choices(words, weights, k=1000)
+        exact.update(tokens)
+        total = merge_counts(
+            total, count_frequencies_in_lines(30, [" ".join(tokens)])
+        )
+        assert len(total) <= 30
+    for word, count in exact.items():
+        assert count <= total.get(word, total.floor)
+    assert most_common(total, 3).keys() == {"w0", "w1", "w2"}
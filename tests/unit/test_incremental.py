@@ -0,0 +1,172 @@
+"""
+Test module for the `ptwordfinder.commands.incremental` module.
+
+This module contains the following test cases:
+1. `test_count_appended_lines`: Verifies that only appended lines are read
+   and that the total matches a full count, in several modes.
+2. `test_partial_last_line`: Verifies that a last line without a line
+   break is counted but read again once it is completed.
+3. `test_truncated_or_replaced_file`: Verifies that a shrunk file, a file
+   with a new inode or rewritten first bytes is counted from the start.
+4. `test_query_key`: Verifies that equal queries share their checkpoint
+   and different ones do not.
+5. `test_bounded_checkpoint`: Verifies that Space-Saving counts stay
+   within their capacity across appends.
+"""
+
+from functools import partial
+
+import os
+
+import pytest
+
+from ptwordfinder.commands import incremental
+from ptwordfinder.commands.frequency import count_frequencies_in_lines
+from ptwordfinder.commands.incremental import count_incrementally, query_key
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_lines,
+    count_regex_in_lines,
+    count_word_in_lines,
+)
+from ptwordfinder.commands.stream import decode_lines
+
+TEXT = "Tadeusz, Zosia\nTadeusz\n"
+APPENDED = "Tadeusz i Zosia\nżółw\n"
+
+
+@pytest.fixture(autouse=True)
+def cache(tmpdir, monkeypatch):
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+
+
+@pytest.mark.parametrize(
+    "lines_function, query",
+    [
+        (count_word_in_lines, "Tadeusz"),
+        (count_each_word_in_lines, ["Tadeusz", "Zosia", "żółw"]),
+        (partial(count_regex_in_lines, timeout=None), "Z[a-z]+"),
+    ],
+)
+def test_count_appended_lines(tmpdir, monkeypatch, lines_function, query):
+    """
+    Test count_incrementally function after an append.
+
+    Verifies that:
+    - The first and second counts equal the counts of the whole file.
+    - The second run only reads the appended bytes.
+    """
+    searched_file = tmpdir.join("app.log")
+    searched_file.write_text(TEXT, encoding="utf8")
+    assert count_incrementally(
+        lines_function, query, str(searched_file)
+    ) == lines_function(query, TEXT.splitlines(True))
+
+    read = []
+
+    def record_lines(data):
+        read.append(data)
+        return decode_lines(data)
+
+    monkeypatch.setattr(incremental, "decode_lines", record_lines)
+    with open(searched_file, "a", encoding="utf8") as file:
+        file.write(APPENDED)
+    result = count_incrementally(lines_function, query, str(searched_file))
+    assert result == lines_function(query, (TEXT + APPENDED).splitlines(True))
+    assert read == [APPENDED.encode("utf8")]
+
+
+def test_partial_last_line(tmpdir):
+    """
+    Test count_incrementally function when a line is written in two parts.
+
+    Verifies that:
+    - The unfinished line is counted.
+    - A word split across the two writes is counted once complete.
+    """
+    searched_file = tmpdir.join("app.log")
+    searched_file.write_text("Tadeusz\nTade", encoding="utf8")
+    assert count_incrementally(
+        count_word_in_lines, "Tade", str(searched_file)
+    ) == 2
+    assert count_incrementally(
+        count_word_in_lines, "Tadeusz", str(searched_file)
+    ) == 1
+
+    with open(searched_file, "a", encoding="utf8") as file:
+        file.write("usz\n")
+    assert count_incrementally(
+        count_word_in_lines, "Tadeusz", str(searched_file)
+    ) == 2
+
+
+def test_truncated_or_replaced_file(tmpdir):
+    """
+    Test count_incrementally function when the file is rewritten.
+
+    Verifies that:
+    - A file smaller than the checkpoint is counted from the start.
+    - A file replaced by a new one is counted from the start.
+    - A file whose first bytes changed is counted from the start.
+    """
+    searched_file = tmpdir.join("app.log")
+    path = str(searched_file)
+    searched_file.write_text(TEXT, encoding="utf8")
+    assert count_incrementally(count_word_in_lines, "Tadeusz", path) == 2
+
+    searched_file.write_text("Tadeusz\n", encoding="utf8")
+    assert count_incrementally(count_word_in_lines, "Tadeusz", path) == 1
+
+    rotated = tmpdir.join("app.log.new")
+    rotated.write_text("Zosia\nZosia\nTadeusz\n", encoding="utf8")
+    os.replace(rotated, path)
+    assert count_incrementally(count_word_in_lines, "Tadeusz", path) == 1
+
+    # Rewritten in place, without changing size nor inode
+    with open(path, "r+", encoding="utf8") as file:
+        file.write("Tadeusz")
+    assert count_incrementally(count_word_in_lines, "Tadeusz", path) == 2
+
+
+def test_query_key():
+    """
+    Test query_key function.
+
+    Verifies that:
+    - Sets give the same key whatever their order.
+    - The function and its arguments are part of the key.
+    """
+    words = ["Tadeusz", "Zosia", "Hrabia", "Telimena"]
+    assert query_key(count_word_in_lines, set(words)) == query_key(
+        count_word_in_lines, set(reversed(words))
+    )
+    assert query_key(count_word_in_lines, "Tadeusz") != query_key(
+        count_each_word_in_lines, "Tadeusz"
+    )
+    assert query_key(
+        partial(count_regex_in_lines, timeout=1.0), "T"
+    ) != query_key(partial(count_regex_in_lines, timeout=2.0), "T")
+
+
+def test_bounded_checkpoint(tmpdir):
+    """
+    Test count_incrementally function with a Space-Saving capacity.
+
+    Verifies that:
+    - The stored and returned tables never track more than the capacity.
+    - Their counts stay upper bounds of the counts over the whole file.
+    """
+    searched_file = tmpdir.join("app.log")
+    text = ""
+    for append in range(4):
+        words = " ".join(f"w{append}_{index}" for index in range(20))
+        line = f"Tadeusz Tadeusz Tadeusz {words}\n"
+        text += line
+        with open(searched_file, "a", encoding="utf8") as file:
+            file.write(line)
+        result = count_incrementally(
+            count_frequencies_in_lines, 10, str(searched_file)
+        )
+        assert len(result) <= 10
+        assert "Tadeusz" in result
+        for word in text.split():
+            assert result.get(word, result.floor) >= text.split().count(word)
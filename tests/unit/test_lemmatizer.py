@@ -0,0 +1,106 @@
+"""
+Test module for the `ptwordfinder.commands.lemmatizer` module.
+
+This module contains the following test cases:
+1. `test_load_dictionary`: Verifies that the bundled dictionary is read,
+   comments skipped, and that malformed lines are rejected.
+2. `test_lemmatizer`: Verifies that tokens are mapped to their lemmas
+   regardless of case, through the LRU cache.
+3. `test_lemmatize_text_stats`: Verifies that the lookups and cache hits
+   are reported by an active `Stats` collector.
+4. `test_count_lemmatized_words`: Verifies that words are counted by
+   lemma, also together with case folding.
+"""
+
+import pytest
+
+from ptwordfinder.commands.lemmatizer import (
+    DEFAULT_DICTIONARY,
+    Lemmatizer,
+    lemmatize_text,
+    load_dictionary,
+)
+from ptwordfinder.commands.normalize import (
+    count_normalized_in_file,
+    make_normalizer,
+)
+from ptwordfinder.commands.pt_word_finder import count_each_word_in_lines
+from ptwordfinder.commands.stats import Stats
+
+
+def test_load_dictionary(tmpdir):
+    """
+    Test load_dictionary function.
+
+    Verifies that:
+    - The bundled dictionary maps forms, lowercased, to their lemmas.
+    - Comments and blank lines are skipped.
+    - A line without a tab raises ValueError with its number.
+    """
+    dictionary = load_dictionary(DEFAULT_DICTIONARY)
+    assert dictionary["domu"] == "dom"
+    assert dictionary["tadeusza"] == "Tadeusz"
+    assert not any(form.startswith("#") for form in dictionary)
+
+    path = tmpdir.join("lemmas.tsv")
+    path.write_text("# form\tlemma\n\nkota\tkot\nkotem kot\n", encoding="utf8")
+    with pytest.raises(ValueError, match="Line 4"):
+        load_dictionary(str(path))
+
+
+def test_lemmatizer():
+    """
+    Test Lemmatizer class.
+
+    Verifies that:
+    - Known forms map to their lemma, whatever their case.
+    - Unknown tokens are kept as they are.
+    - Repeated tokens are answered by the cache.
+    """
+    lemmatizer = Lemmatizer({"domu": "dom", "domem": "dom"}, cache_size=8)
+    assert lemmatizer.lemmatize(["Domu", "domem", "Kot", "domem"]) == [
+        "dom",
+        "dom",
+        "Kot",
+        "dom",
+    ]
+    info = lemmatizer.lemma.cache_info()
+    assert (info.hits, info.misses) == (1, 3)
+
+
+def test_lemmatize_text_stats():
+    """
+    Test lemmatize_text function with an active Stats collector.
+
+    Verifies that:
+    - Punctuation is dropped and words are replaced by their lemmas.
+    - Every word is a lookup, repeated words are cache hits.
+    """
+    stats = Stats()
+    with stats.activate():
+        text = lemmatize_text("Do domu, do domu! —\n", DEFAULT_DICTIONARY)
+    assert text == "Do dom do dom"
+    assert stats.lemma_lookups == 4
+    assert stats.lemma_hits >= 1
+    report = stats.report(1, 1)
+    assert report["lemma_cache"]["lookups"] == 4
+
+
+@pytest.mark.parametrize("ignore_case", [False, True])
+def test_count_lemmatized_words(tmpdir, ignore_case):
+    """
+    Test count_normalized_in_file function with a lemma dictionary.
+
+    Verifies that:
+    - Every form of a word is counted for its lemma.
+    - Case folding applies to the lemmas.
+    """
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(
+        "Dom, domu i domem.\nTadeusza w domach Tadeusz\n", encoding="utf8"
+    )
+    normalize = make_normalizer(ignore_case, False, DEFAULT_DICTIONARY)
+    words = [normalize("domach"), normalize("Tadeuszem")]
+    assert count_normalized_in_file(
+        count_each_word_in_lines, normalize, words, str(searched_file)
+    ) == dict(zip(words, [4, 2]))
@@ -0,0 +1,171 @@
+"""
+Test module for the `ptwordfinder.commands.matches` module.
+
+This module contains the following test cases:
+1. `test_spans`: Verifies the hits found in one line by a single word, a
+   word list and a pattern.
+2. `test_iter_matches_agree_with_counts`: Verifies that every counting
+   mode lists as many hits as it counts, with their line, column and
+   context.
+3. `test_find_in_lines_is_lazy`: Verifies that hits are yielded as soon
+   as their line is read and that the time budget only counts searching.
+4. `test_surrounding_text`: Verifies that long lines are cut around a hit.
+"""
+
+from functools import partial
+from itertools import islice, repeat
+
+import time
+
+import pytest
+
+from ptwordfinder.commands.boundaries import MATCH_MODES
+from ptwordfinder.commands.matches import (
+    Match,
+    find_in_lines,
+    iter_matches,
+    pattern_spans,
+    surrounding_text,
+    token_spans,
+    word_spans,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_multiple_words_in_file,
+    count_pattern_in_file,
+    count_regex_in_file,
+    count_word_in_file,
+    sanitize_pattern,
+)
+from ptwordfinder.commands.regex_mode import compile_pattern
+
+TEXT = (
+    "Pan Tadeusz, pan.\n"
+    "\n"
+    "(pan) panna Tadeuszpan\n"
+    "Tadeusz — i pan Sędzia, ie, ie.\n"
+)
+
+
+def test_spans():
+    """
+    Test word_spans, token_spans and pattern_spans functions.
+
+    Verifies that:
+    - Single words are found as substrings or at word boundaries.
+    - Tokens of a word list are found without their leading and trailing
+      punctuation, and with the punctuation inside them.
+    - Every match of a pattern is found.
+    """
+    line = "(pan) panna Tadeuszpan,"
+    assert word_spans("pan", line) == [(1, 4), (6, 9), (19, 22)]
+    assert word_spans("pan", line, "whole") == [(1, 4)]
+    assert word_spans("pan", line, "suffix") == [(1, 4), (19, 22)]
+    assert word_spans("kot", line) == []
+
+    assert token_spans({"pan", "Tadeuszpan"}, line) == [(1, 4), (12, 22)]
+    assert token_spans({"Pan"}, line) == []
+    assert token_spans({"ab"}, "x (a-b), y") == [(3, 6)]
+
+    assert pattern_spans(compile_pattern(r"pan\w*"), line) == [
+        (1, 4),
+        (6, 11),
+        (19, 22),
+    ]
+
+
+def test_iter_matches_agree_with_counts(tmpdir):
+    """
+    Test iter_matches function.
+
+    Verifies that:
+    - Single words in every match mode, word lists, literal patterns and
+      regular expressions give as many hits as their counts.
+    - Hits carry their file, line number, column and context.
+    - Several files are searched one after another.
+    """
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(TEXT, encoding="utf8")
+    path = str(searched_file)
+
+    for match in MATCH_MODES:
+        spans = partial(word_spans, match=match)
+        hits = list(iter_matches(spans, "pan", [path]))
+        assert len(hits) == count_word_in_file("pan", path, match)
+    words = {"pan", "Tadeusz"}
+    hits = list(iter_matches(token_spans, words, [path]))
+    assert len(hits) == count_multiple_words_in_file(words, path)
+    literal = compile_pattern(sanitize_pattern("ie, "))
+    hits = list(iter_matches(pattern_spans, literal, [path]))
+    assert len(hits) == count_pattern_in_file("ie, ", path)
+    regex = r"\bp\w+"
+    hits = list(iter_matches(pattern_spans, compile_pattern(regex), [path]))
+    assert len(hits) == count_regex_in_file(regex, path)
+
+    hits = list(iter_matches(token_spans, {"Tadeusz"}, [path, path]))
+    assert hits[1] == Match(
+        path, 4, 1, "Tadeusz", "Tadeusz — i pan Sędzia, ie, ie."
+    )
+    assert [hit.file for hit in hits] == [path] * 4
+    assert str(hits[0]) == f"{path}:1:5: Pan Tadeusz, pan."
+    assert hits[0].as_record()["match"] == "Tadeusz"
+
+    searched_file.write_text("Pan-Tadeusz, pan_\n", encoding="utf8")
+    hits = list(iter_matches(token_spans, {"PanTadeusz", "pan"}, [path]))
+    assert [hit.text for hit in hits] == ["Pan-Tadeusz", "pan"]
+
+
+def test_find_in_lines_is_lazy():
+    """
+    Test find_in_lines function.
+
+    Verifies that:
+    - Hits of endless lines are yielded without reading further lines.
+    - Searching longer than the timeout raises TimeoutError.
+    - Waiting between hits, and for lines when blocking, do not count in
+      the budget.
+    """
+    hits = find_in_lines(word_spans, "pan", repeat("Pan pan\n"))
+    assert list(islice(hits, 3)) == [
+        (1, 4, 7, "Pan pan\n"),
+        (2, 4, 7, "Pan pan\n"),
+        (3, 4, 7, "Pan pan\n"),
+    ]
+
+    def one_line_then_fail():
+        yield "pan\n"
+        raise AssertionError("A second line was read.")
+
+    for timeout in (None, 1.0):
+        hits = find_in_lines(word_spans, "pan", one_line_then_fail(), timeout)
+        assert next(hits) == (1, 0, 3, "pan\n")
+
+    def slow_lines():
+        for _ in range(3):
+            time.sleep(0.05)
+            yield "pan\n"
+
+    hits = find_in_lines(
+        word_spans, "pan", slow_lines(), timeout=0.04, blocking=True
+    )
+    for _ in hits:
+        time.sleep(0.05)
+
+    def slow_spans(query, line):
+        time.sleep(0.01)
+        return []
+
+    with pytest.raises(TimeoutError):
+        list(find_in_lines(slow_spans, "pan", ["pan\n"] * 10, timeout=0.02))
+
+
+def test_surrounding_text():
+    """
+    Test surrounding_text function.
+
+    Verifies that:
+    - Short lines are kept whole, without their line break.
+    - Long lines are cut around the hit and the cuts are marked.
+    """
+    assert surrounding_text("Pan Tadeusz\n", 4, 11) == "Pan Tadeusz"
+    line = "a" * 50 + "Tadeusz" + "b" * 50 + "\n"
+    assert surrounding_text(line, 50, 57, width=3) == "...aaaTadeuszbbb..."
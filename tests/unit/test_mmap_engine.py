@@ -0,0 +1,136 @@
+"""
+Test module for the `ptwordfinder.commands.mmap_engine` module.
+
+This module contains the following test cases:
+1. `small_windows` fixture: Shrinks the window size so that the bundled
+   text is processed in many windows.
+2. `test_mmap_engine_matches_line_engine`: Verifies that the mmap engine
+   gives the same results as the line engine on the bundled Pan Tadeusz text
+   for all counting modes.
+3. `test_mmap_engine_crlf`: Verifies that Windows line endings give the same
+   results as the line engine.
+4. `test_mmap_engine_empty_file`: Verifies that an empty file counts as 0.
+5. `test_mmap_engine_line_break_needle`: Verifies that needles containing a
+   line break are delegated to the line engine.
+6. `test_mmap_engine_nonexistent_file`: Verifies that a FileNotFoundError is
+   raised for a non-existent file.
+"""
+
+import os
+
+import pytest
+
+from ptwordfinder.commands import mmap_engine
+from ptwordfinder.commands.mmap_engine import (
+    count_each_word_mmap,
+    count_multiple_words_mmap,
+    count_pattern_mmap,
+    count_word_mmap,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_multiple_words_in_file,
+    count_pattern_in_file,
+    count_word_in_file,
+)
+
+CORPUS = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "pan-tadeusz-czyli-ostatni-zajazd-na-litwie.txt",
+)
+
+
+@pytest.fixture
+def small_windows(monkeypatch):
+    """Process files in windows of about 4 KiB."""
+    monkeypatch.setattr(mmap_engine, "WINDOW_SIZE", 4096)
+
+
+@pytest.mark.parametrize(
+    "mmap_function, line_function, query",
+    [
+        (count_word_mmap, count_word_in_file, "Tadeusz"),
+        (count_word_mmap, count_word_in_file, "ż"),
+        (count_pattern_mmap, count_pattern_in_file, "ie, "),
+        (
+            count_multiple_words_mmap,
+            count_multiple_words_in_file,
+            {"Pan", "Sędzia", "i", ""},
+        ),
+        (
+            count_each_word_mmap,
+            count_each_word_in_file,
+            ["Pan", "Sędzia", "Hrabia"],
+        ),
+    ],
+)
+def test_mmap_engine_matches_line_engine(
+    small_windows, mmap_function, line_function, query
+):
+    """
+    When the bundled text is counted by both engines,
+
+    Verifies that:
+    - The mmap engine result is identical to the line engine result.
+    """
+    assert mmap_function(query, CORPUS) == line_function(query, CORPUS)
+
+
+def test_mmap_engine_crlf(small_windows, tmpdir):
+    """
+    When a file with Windows line endings is counted,
+
+    Verifies that:
+    - The counts equal those of the line engine.
+    """
+    test_file = str(tmpdir.join("crlf.txt"))
+    with open(test_file, "wb") as file:
+        file.write(b"ala ma kota,\r\nkot ma ale\r\n" * 500)
+
+    assert count_word_mmap("ma", test_file) == 1000
+    assert count_each_word_mmap(["kota", "ale"], test_file) == (
+        count_each_word_in_file(["kota", "ale"], test_file)
+    )
+
+
+def test_mmap_engine_empty_file(tmpdir):
+    """
+    When an empty file is counted,
+
+    Verifies that:
+    - Every mode returns 0.
+    """
+    test_file = str(tmpdir.join("empty.txt"))
+    open(test_file, "wb").close()
+
+    assert count_word_mmap("word", test_file) == 0
+    assert count_pattern_mmap("word", test_file) == 0
+    assert count_multiple_words_mmap({"word"}, test_file) == 0
+
+
+def test_mmap_engine_line_break_needle(tmpdir):
+    """
+    When the needle contains a line break,
+
+    Verifies that:
+    - The result equals the line engine, where matches cannot span lines.
+    """
+    test_file = str(tmpdir.join("lines.txt"))
+    with open(test_file, "w", encoding="utf8") as file:
+        file.write("end\nstart end\n")
+
+    assert count_word_mmap("end\nstart", test_file) == 0
+    assert count_word_mmap("end\n", test_file) == 2
+
+
+def test_mmap_engine_nonexistent_file():
+    """
+    When counting in a non-existent file,
+
+    Verifies that:
+    - FileNotFoundError is raised.
+    """
+    with pytest.raises(FileNotFoundError):
+        count_word_mmap("word", "nonexistent_file.txt")
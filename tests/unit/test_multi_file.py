@@ -0,0 +1,124 @@
+"""
+Test module for the `ptwordfinder.commands.multi_file` module.
+
+This module contains the following test cases:
+1. `corpus` fixture: Creates a directory tree with a few text files and
+   hidden ones.
+2. `test_expand_searched_paths`: Verifies that files, directories and glob
+   patterns are expanded into a sorted list of files without duplicates
+   or hidden files.
+3. `test_expand_searched_paths_missing`: Verifies that a missing path or an
+   unmatched pattern raises click.BadParameter.
+4. `test_count_in_files_process_pool`: Verifies that counting over a process
+   pool gives the same results as counting sequentially.
+5. `test_merge_counts`: Verifies that int and mapping results are merged.
+"""
+
+import os
+
+import click
+import pytest
+
+from ptwordfinder.commands.multi_file import (
+    count_in_files,
+    expand_searched_paths,
+    merge_counts,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_word_in_file,
+)
+
+
+@pytest.fixture
+def corpus(tmpdir):
+    """
+    Given a temporary directory,
+    Create text files in it and in a nested directory, and hidden files
+    in it and in a hidden directory.
+
+    Returns:
+    str: Path of the corpus directory.
+    """
+    books = tmpdir.mkdir("books")
+    books.join("a.txt").write_text("pan pan tadeusz\n", encoding="utf8")
+    books.join("b.txt").write_text("pan zosia\n", encoding="utf8")
+    nested = books.mkdir("nested")
+    nested.join("c.txt").write_text("tadeusz\n", encoding="utf8")
+    books.join(".DS_Store").write_binary(b"\x00\x00\x00\x01Bud1")
+    books.mkdir(".git").join("config").write_text("[core]\n", "utf8")
+    return str(books)
+
+
+def test_expand_searched_paths(corpus):
+    """
+    When files, directories and glob patterns are expanded,
+
+    Verifies that:
+    - Directories are walked recursively in sorted order.
+    - Hidden files and directories are skipped.
+    - Glob patterns are expanded.
+    - Files listed twice appear once.
+    - `-` is kept for standard input.
+    """
+    a_file = os.path.join(corpus, "a.txt")
+    c_file = os.path.join(corpus, "nested", "c.txt")
+
+    assert expand_searched_paths([corpus]) == [
+        a_file,
+        os.path.join(corpus, "b.txt"),
+        c_file,
+    ]
+    assert expand_searched_paths(
+        [os.path.join(corpus, "**", "c.*"), a_file, c_file]
+    ) == [c_file, a_file]
+    assert expand_searched_paths(["-", a_file]) == ["-", a_file]
+
+
+def test_expand_searched_paths_missing(corpus):
+    """
+    When a path does not exist or a pattern does not match,
+
+    Verifies that:
+    - click.BadParameter is raised.
+    """
+    with pytest.raises(click.BadParameter, match="does not exist"):
+        expand_searched_paths([os.path.join(corpus, "missing.txt")])
+    with pytest.raises(click.BadParameter, match="does not match"):
+        expand_searched_paths([os.path.join(corpus, "*.md")])
+
+
+def test_count_in_files_process_pool(corpus):
+    """
+    When files are counted over a process pool,
+
+    Verifies that:
+    - The results and their order equal the sequential ones.
+    """
+    files = expand_searched_paths([corpus])
+
+    sequential = list(count_in_files(count_word_in_file, "pan", files))
+    parallel = list(count_in_files(count_word_in_file, "pan", files, jobs=2))
+
+    assert parallel == sequential
+    assert [count for _, count in parallel] == [2, 1, 0]
+
+
+def test_merge_counts(corpus):
+    """
+    When the results of several files are merged,
+
+    Verifies that:
+    - Int counts are summed.
+    - Per-word mappings are summed word by word.
+    """
+    files = expand_searched_paths([corpus])
+
+    total = None
+    for _, result in count_in_files(
+        count_each_word_in_file, ["pan", "tadeusz"], files, jobs=2
+    ):
+        total = merge_counts(total, result)
+
+    assert total == {"pan": 3, "tadeusz": 2}
+    assert merge_counts(merge_counts(None, 2), 3) == 5
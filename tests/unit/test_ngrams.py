@@ -0,0 +1,91 @@
+"""
+Test module for the `ptwordfinder.commands.ngrams` module.
+
+This module contains the following test cases:
+1. `test_rolling_key`: Verifies that the rolling key of a window encodes
+   exactly its ids, whatever the batches the ids come in.
+2. `test_count_phrases_in_lines`: Verifies that phrases are counted
+   across line breaks and batches, tokenized like the text.
+3. `test_count_ngrams_in_lines`: Verifies that every n-gram is counted
+   exactly, or within the Space-Saving bounds with a capacity.
+"""
+
+from collections import Counter
+
+import pytest
+
+from ptwordfinder.commands import tokenizer
+from ptwordfinder.commands.ngrams import (
+    RollingKey,
+    count_ngrams_in_lines,
+    count_phrases_in_lines,
+    decode_key,
+)
+
+LINES = [
+    "Pan Tadeusz, czyli ostatni zajazd\n",
+    "\n",
+    "— Pan\n",
+    "Tadeusz w Soplicowie. Pan Tadeusz\n",
+]
+
+
+@pytest.mark.parametrize("batch", [1, 2, 7])
+def test_rolling_key(batch):
+    """
+    Test RollingKey class and decode_key function.
+
+    Verifies that:
+    - One key is produced per complete window.
+    - Every key decodes to the ids of its window.
+    """
+    ids = [5, 0, 2**32 - 1, 7, 7, 1, 3]
+    rolling = RollingKey(3)
+    keys = []
+    for start in range(0, len(ids), batch):
+        keys += rolling.feed(ids[start:start + batch])
+    assert [decode_key(key, 3) for key in keys] == [
+        tuple(ids[start:start + 3]) for start in range(len(ids) - 2)
+    ]
+
+
+def test_count_phrases_in_lines(monkeypatch):
+    """
+    Test count_phrases_in_lines function.
+
+    Verifies that:
+    - A phrase split by a line break or "—" is counted.
+    - Punctuation and spacing of the phrase do not matter.
+    - A batch boundary inside a phrase does not lose it.
+    """
+    monkeypatch.setattr(tokenizer, "BATCH_LINES", 1)
+    counts = count_phrases_in_lines(
+        ["Pan Tadeusz", "Tadeusz w  Soplicowie!", "zajazd Pan", "czyli", "—"],
+        LINES,
+    )
+    assert counts == {
+        "Pan Tadeusz": 3,
+        "Tadeusz w  Soplicowie!": 1,
+        "zajazd Pan": 1,
+        "czyli": 1,
+        "—": 0,
+    }
+
+
+def test_count_ngrams_in_lines():
+    """
+    Test count_ngrams_in_lines function.
+
+    Verifies that:
+    - Every bigram of the word stream is counted exactly.
+    - With a capacity, at most that many bigrams are kept and counts are
+      upper bounds.
+    """
+    words = "Pan Tadeusz czyli ostatni zajazd Pan Tadeusz w Soplicowie Pan "
+    words = (words + "Tadeusz").split()
+    exact = Counter(" ".join(pair) for pair in zip(words, words[1:]))
+    assert count_ngrams_in_lines((2, None), LINES) == exact
+
+    approximate = count_ngrams_in_lines((2, 3), LINES)
+    assert len(approximate) == 3
+    assert all(count >= exact[ngram] for ngram, count in approximate.items())
@@ -0,0 +1,128 @@
+"""
+Test module for the `ptwordfinder.commands.normalize` module.
+
+This module contains the following test cases:
+1. `test_normalize_text`: Verifies that case and diacritics are folded,
+   Polish letters and combining marks included, like `str.translate`
+   with the table would.
+2. `test_normalize_pattern`: Verifies that a regular expression is made
+   case-insensitive without touching its escapes.
+3. `test_normalize_lines`: Verifies that lines are normalized batch by
+   batch and keep their line breaks.
+4. `test_count_normalized_in_file`: Verifies that every counting mode
+   finds the normalized query in the normalized text of a file.
+"""
+
+import re
+
+import pytest
+
+from ptwordfinder.commands import normalize
+from ptwordfinder.commands.normalize import (
+    count_normalized_in_file,
+    diacritics_table,
+    make_normalizer,
+    normalize_lines,
+    normalize_pattern,
+    normalize_text,
+    remove_diacritics,
+)
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_lines,
+    count_pattern_in_lines,
+    count_regex_in_lines,
+    count_word_in_lines,
+)
+
+TEXT = "Żołnierz ŻOŁNIERZ żołnierz\nzolnierz Zołnierz\n"
+
+
+def test_normalize_text():
+    """
+    Test normalize_text function.
+
+    Verifies that:
+    - Nothing is changed by default.
+    - --ignore-case casefolds, "ß" becoming "ss".
+    - --fold-diacritics removes diacritics, "ł" included, and keeps case.
+    - Decomposed letters lose their combining marks.
+    - The result is that of `str.translate` with the table.
+    """
+    assert normalize_text("Żółć") == "Żółć"
+    assert normalize_text("Żółć Straße", ignore_case=True) == "żółć strasse"
+    assert (
+        normalize_text("Żółć ąćęłńóśźż ŁĘ", fold_diacritics=True)
+        == "Zolc acelnoszz LE"
+    )
+    assert normalize_text("Żólc", fold_diacritics=True) == "Zolc"
+    both = make_normalizer(ignore_case=True, fold_diacritics=True)
+    assert both("ŻÓŁW") == "zolw"
+    text = "Pójdźże, kiń tę chmurność w głąb flaszy! Ǖ ĳ ß \u2603"
+    table = str.maketrans(diacritics_table())
+    assert remove_diacritics(text) == text.translate(table)
+
+
+def test_normalize_pattern():
+    """
+    Test normalize_pattern function.
+
+    Verifies that:
+    - Escapes keep their case.
+    - The pattern matches casefolded text regardless of its own case.
+    """
+    pattern = normalize_pattern(r"ŻOŁ\D+\d", True, True)
+    assert pattern == r"(?i)ZOL\D+\d"
+    assert re.findall(pattern, "zolnierz1 zolnierz") == ["zolnierz1"]
+
+
+@pytest.mark.parametrize("batch", [1, 2, 4096])
+def test_normalize_lines(monkeypatch, batch):
+    """
+    Test normalize_lines function.
+
+    Verifies that:
+    - Every line is normalized and keeps its line break.
+    - Blank lines and a last line without a line break are kept.
+    """
+    monkeypatch.setattr(normalize, "BATCH_LINES", batch)
+    lines = ["Ala\n", "\n", "MA Kota\n", "ŁÓDŹ"]
+    assert list(normalize_lines(make_normalizer(True, True), lines)) == [
+        "ala\n",
+        "\n",
+        "ma kota\n",
+        "lodz",
+    ]
+
+
+@pytest.mark.parametrize(
+    "lines_function, query, expected",
+    [
+        (count_word_in_lines, "zolnierz", 5),
+        (count_pattern_in_lines, "zolnierz zo", 2),
+        (count_regex_in_lines, normalize_pattern("ZOL", True, True), 5),
+        (
+            count_each_word_in_lines,
+            ["zolnierz", "zol"],
+            {"zolnierz": 5, "zol": 0},
+        ),
+    ],
+)
+def test_count_normalized_in_file(tmpdir, lines_function, query, expected):
+    """
+    Test count_normalized_in_file function.
+
+    Verifies that:
+    - Single words, literal patterns, regular expressions and word lists
+      are counted on the normalized text.
+    """
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(TEXT, encoding="utf8")
+    assert (
+        count_normalized_in_file(
+            lines_function,
+            make_normalizer(True, True),
+            query,
+            str(searched_file),
+        )
+        == expected
+    )
@@ -0,0 +1,157 @@
+"""
+Test module for the `ptwordfinder.commands.output` module.
+
+This module contains the following test cases:
+1. `test_build_record`: Verifies the records of int and per-word results.
+2. `test_ndjson_writer`: Verifies that every record is one JSON line.
+3. `test_json_writer`: Verifies that records form a JSON array, empty too.
+4. `test_csv_writer`: Verifies that per-word records give one row per word
+   followed by the total row.
+5. `test_writers_flush_every_record`: Verifies that records are flushed as
+   soon as they are written.
+6. `test_match_writers`: Verifies that the records of hits are written
+   with their own CSV columns.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from ptwordfinder.commands.output import build_record, make_writer
+
+RECORD = build_record("a.txt", 3, "single_word", "Tadeusz", False, 10, 0.5)
+PER_WORD = build_record(
+    None, {"Pan": 1, "Tadeusz": 2}, "words_input_file", "w.txt", True, None, 1
+)
+
+
+def test_build_record():
+    """
+    Test build_record function.
+
+    Verifies that:
+    - Int results are kept as the count.
+    - Per-word results are summed, and kept only with per_word.
+    """
+    assert RECORD == {
+        "file": "a.txt",
+        "query_type": "single_word",
+        "query": "Tadeusz",
+        "count": 3,
+        "bytes": 10,
+        "duration": 0.5,
+    }
+    assert PER_WORD["count"] == 3
+    assert PER_WORD["counts"] == {"Pan": 1, "Tadeusz": 2}
+    total = build_record(None, {"a": 1}, "words_input_file", "w", False, 0, 1)
+    assert "counts" not in total
+
+
+def test_ndjson_writer():
+    """
+    Test the NDJSON writer.
+
+    Verifies that:
+    - Every record is written as one JSON object per line.
+    """
+    stream = io.StringIO()
+    writer = make_writer("ndjson", stream)
+    writer.write(RECORD)
+    writer.write(PER_WORD)
+    writer.close()
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [RECORD, PER_WORD]
+
+
+@pytest.mark.parametrize("records", [[], [RECORD], [RECORD, PER_WORD]])
+def test_json_writer(records):
+    """
+    Test the JSON writer.
+
+    Verifies that:
+    - The output is a JSON array of the records.
+    """
+    stream = io.StringIO()
+    writer = make_writer("json", stream)
+    for record in records:
+        writer.write(record)
+    writer.close()
+
+    assert json.loads(stream.getvalue()) == records
+
+
+def test_csv_writer():
+    """
+    Test the CSV writer.
+
+    Verifies that:
+    - Per-word records give one row per word, then the total row.
+    - Missing files and sizes are written as empty fields.
+    """
+    stream = io.StringIO()
+    writer = make_writer("csv", stream)
+    writer.write(RECORD)
+    writer.write(PER_WORD)
+
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [(row["file"], row["word"], row["count"]) for row in rows] == [
+        ("a.txt", "", "3"),
+        ("", "Pan", "1"),
+        ("", "Tadeusz", "2"),
+        ("", "", "3"),
+    ]
+    assert rows[0]["bytes"] == "10"
+    assert rows[1]["bytes"] == ""
+
+
+@pytest.mark.parametrize("output_format", ["json", "csv", "ndjson"])
+def test_writers_flush_every_record(output_format):
+    """
+    Test that writers flush their stream after every record.
+
+    Verifies that:
+    - The stream is flushed once per written record.
+    """
+
+    class CountingStream(io.StringIO):
+        flushes = 0
+
+        def flush(self):
+            self.flushes += 1
+
+    stream = CountingStream()
+    writer = make_writer(output_format, stream)
+    writer.write(RECORD)
+    writer.write(RECORD)
+
+    assert stream.flushes == 2
+
+
+def test_match_writers():
+    """
+    Test the writers of the records of hits.
+
+    Verifies that:
+    - CSV rows have the file, line, column, match and context columns.
+    - JSON writers are the same as for counts.
+    """
+    record = {
+        "file": "a.txt",
+        "line": 3,
+        "column": 5,
+        "match": "Tadeusz",
+        "context": "Pan Tadeusz, pan.",
+    }
+    stream = io.StringIO()
+    writer = make_writer("csv", stream, matches=True)
+    writer.write(record)
+    assert list(csv.DictReader(io.StringIO(stream.getvalue()))) == [
+        {key: str(value) for key, value in record.items()}
+    ]
+
+    stream = io.StringIO()
+    make_writer("ndjson", stream, matches=True).write(record)
+    assert json.loads(stream.getvalue()) == record
@@ -0,0 +1,153 @@
+"""
+Test module for the `ptwordfinder.commands.queries` module.
+
+This module contains the following test cases:
+1. `test_file` fixture: Creates a temporary file with mock content.
+2. `test_parse_queries`: Verifies that typed queries are parsed, comments
+   and duplicates skipped, words stripped, and plain text regexes counted
+   as substrings.
+3. `test_parse_queries_invalid`: Verifies that invalid lines are reported
+   with their line number.
+4. `test_count_queries_in_file`: Verifies that every query gives the count
+   of the matching single query function.
+5. `test_count_queries_in_file_with_index`: Verifies that a fresh index
+   gives the same counts.
+"""
+
+import re
+
+import pytest
+
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_file,
+    count_regex_in_file,
+    count_word_in_file,
+)
+from ptwordfinder.commands.queries import (
+    count_queries_in_file,
+    parse_queries,
+)
+from ptwordfinder.commands.word_index import build_index, save_index
+
+mock_file_content = """banana bread, banana!
+Tadeusz and Zosia: "Tadeusz"
+bandana
+
+Tadeuszu, banany
+"""
+
+QUERIES = [
+    "# comment",
+    "word:Tadeusz",
+    "word:banana",
+    "substring:Tadeusz",
+    "substring:ana",
+    "regex:b[a-z]+na",
+    "regex:Zosia",
+    "regex:^ban",
+    "",
+    "word:Tadeusz",
+]
+
+
+@pytest.fixture
+def test_file(tmpdir, monkeypatch):
+    """
+    Given a temporary directory,
+    Create a temporary file with some content for testing.
+
+    Returns:
+    str: Path of the temporary file.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    test_file_path = tmpdir.join("test-file.txt")
+    with open(test_file_path, "w", encoding="utf8") as f:
+        f.write(mock_file_content)
+    return str(test_file_path)
+
+
+def test_parse_queries():
+    """
+    Test parse_queries function with every query type.
+
+    Verifies that:
+    - Comments, blank lines and duplicates are skipped.
+    - Regular expressions of plain text are counted as substrings.
+    - Words are stripped of surrounding whitespace, substrings are not.
+    """
+    queries = parse_queries(QUERIES)
+
+    assert queries.labels == [line for line in QUERIES[1:-2]]
+    assert queries.words == {
+        "Tadeusz": "word:Tadeusz",
+        "banana": "word:banana",
+    }
+    assert queries.substrings["Zosia"] == ["regex:Zosia"]
+    assert [label for label, _ in queries.regexes] == [
+        "regex:b[a-z]+na",
+        "regex:^ban",
+    ]
+
+    queries = parse_queries(["word: Tadeusz \n", "substring: Zosia\n"])
+    assert queries.labels == ["word:Tadeusz", "substring: Zosia"]
+    assert queries.words == {"Tadeusz": "word:Tadeusz"}
+
+
+@pytest.mark.parametrize(
+    "line, error, message",
+    [
+        ("Tadeusz", ValueError, "Line 2: expected 'type:value'"),
+        ("phrase:Pan Tadeusz", ValueError, "Line 2: Unknown query type"),
+        ("substring:", ValueError, "Line 2: A substring query"),
+        ("word:  ", ValueError, "Line 2: A word query"),
+        ("word: Pan Tadeusz", ValueError, "Line 2: .*single word"),
+        ("regex:(a+)+", ValueError, "Line 2: .*nests repetitions"),
+        ("regex:b[a-", re.error, "Line 2"),
+    ],
+)
+def test_parse_queries_invalid(line, error, message):
+    """
+    Test parse_queries function with invalid lines.
+
+    Verifies that:
+    - The error names the line number.
+    """
+    with pytest.raises(error, match=message):
+        parse_queries(["word:Tadeusz", line])
+
+
+def test_count_queries_in_file(test_file):
+    """
+    Test count_queries_in_file function with every query type.
+
+    Verifies that:
+    - Every count equals the one of the matching single query function.
+    """
+    counts = count_queries_in_file(parse_queries(QUERIES), test_file)
+
+    for label, count in counts.items():
+        query_type, _, value = label.partition(":")
+        if query_type == "word":
+            expected = count_each_word_in_file([value], test_file)[value]
+        elif query_type == "substring":
+            expected = count_word_in_file(value, test_file)
+        else:
+            expected = count_regex_in_file(value, test_file)
+        assert count == expected, label
+    assert counts["word:Tadeusz"] == 2
+    assert counts["substring:Tadeusz"] == 3
+
+
+def test_count_queries_in_file_with_index(test_file):
+    """
+    Test count_queries_in_file function with a fresh index.
+
+    Verifies that:
+    - Word and substring queries give the same counts from the index.
+    """
+    lines = [line for line in QUERIES if not line.startswith("regex:^")]
+    queries = parse_queries(lines)
+    expected = count_queries_in_file(queries, test_file)
+    save_index(build_index(test_file))
+
+    assert count_queries_in_file(queries, test_file) == expected
@@ -0,0 +1,139 @@
+"""
+Test module for the `ptwordfinder.commands.regex_mode` module.
+
+This module contains the following test cases:
+1. `test_compile_pattern_cached`: Verifies that a pattern is compiled once.
+2. `test_compile_pattern_rejects_nested_repeats`: Verifies that nested
+   unbounded repetitions are rejected and safe patterns are accepted.
+3. `test_compile_pattern_rejects_long_pattern`: Verifies that overly long
+   patterns are rejected.
+4. `test_compile_pattern_invalid`: Verifies that invalid patterns and
+   non-string input raise errors.
+5. `test_literal_text`: Verifies that plain text patterns are recognized.
+6. `test_time_budget_interrupts_backtracking`: Verifies that a runaway
+   match is interrupted with a TimeoutError.
+7. `test_paused_budget`: Verifies that time spent with the budget paused
+   does not count.
+"""
+
+import re
+import time
+
+import pytest
+
+from ptwordfinder.commands.regex_mode import (
+    compile_pattern,
+    literal_text,
+    paused_budget,
+    time_budget,
+)
+
+
+def test_compile_pattern_cached():
+    """
+    Test compile_pattern function called twice with the same pattern.
+
+    Verifies that:
+    - The same compiled object is returned.
+    """
+    assert compile_pattern(r"b[a-z]+na") is compile_pattern(r"b[a-z]+na")
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"(a+)+b", r"(\w*\s?)*$", r"(?:x|y+)*z", r"((ab)*c)+"]
+)
+def test_compile_pattern_rejects_nested_repeats(pattern):
+    """
+    Test compile_pattern function with catastrophic backtracking patterns.
+
+    Verifies that:
+    - A ValueError is raised.
+    """
+    with pytest.raises(ValueError, match="nests repetitions"):
+        compile_pattern(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern", [r"b[a-z]+na", r"(ab)+", r"(a{2})+", r"(colou?r)+", r"\d{3}"]
+)
+def test_compile_pattern_accepts_safe_patterns(pattern):
+    """
+    Test compile_pattern function with patterns of a single repeat level.
+
+    Verifies that:
+    - The pattern is compiled.
+    """
+    assert compile_pattern(pattern).pattern == pattern
+
+
+def test_compile_pattern_rejects_long_pattern():
+    """
+    Test compile_pattern function with a very long pattern.
+
+    Verifies that:
+    - A ValueError is raised.
+    """
+    with pytest.raises(ValueError, match="longer than"):
+        compile_pattern("a" * 1001)
+
+
+def test_compile_pattern_invalid():
+    """
+    Test compile_pattern function with invalid input.
+
+    Verifies that:
+    - An invalid pattern raises re.error.
+    - A non-string pattern raises TypeError.
+    """
+    with pytest.raises(re.error):
+        compile_pattern("b[a-z")
+    with pytest.raises(TypeError):
+        compile_pattern(123)
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("world", "world"),
+        (r"a\.b", "a.b"),
+        ("b[a-z]+na", None),
+        ("(?i)world", None),
+        ("", ""),
+    ],
+)
+def test_literal_text(pattern, expected):
+    """
+    Test literal_text function with plain and regular patterns.
+
+    Verifies that:
+    - Plain text patterns give the text they match, others give None.
+    """
+    assert literal_text(pattern) == expected
+
+
+def test_time_budget_interrupts_backtracking():
+    """
+    Test time_budget with a pattern that backtracks exponentially.
+
+    Verifies that:
+    - The match is interrupted with a TimeoutError.
+    """
+    runaway = re.compile(r"(a+)+$")
+    with pytest.raises(TimeoutError):
+        with time_budget(0.2):
+            runaway.match("a" * 40 + "b")
+
+
+def test_paused_budget():
+    """
+    Test paused_budget within a time_budget.
+
+    Verifies that:
+    - Waiting with the budget paused does not raise TimeoutError.
+    - The clock runs again once the pause ends.
+    """
+    with pytest.raises(TimeoutError):
+        with time_budget(0.1):
+            with paused_budget():
+                time.sleep(0.2)
+            time.sleep(0.2)
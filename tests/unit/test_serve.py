@@ -0,0 +1,253 @@
+"""
+Test module for the `ptwordfinder.commands.serve` module.
+
+This module contains the following test cases:
+1. `loaded` fixture: Loads two temporary files into memory.
+2. `test_answer_matches_calculate_words`: Verifies that the output lines of
+   every kind of query are those printed by `calculate_words`.
+3. `test_answer_per_word`: Verifies the per-word counts of a word list.
+4. `test_answer_invalid_queries`: Verifies that malformed queries, unsafe
+   patterns and paths of word lists are rejected.
+5. `test_unix_socket_server`: Verifies that several queries are answered
+   over one Unix socket connection.
+6. `test_http_server`: Verifies the HTTP endpoints.
+7. `test_serve_rejects_stdin`: Verifies that `-s -` is rejected before
+   anything is loaded.
+8. `test_pattern_pool_timeout`: Verifies that runaway patterns are stopped
+   in the pattern workers while other queries are still answered.
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+from click.testing import CliRunner
+
+from ptwordfinder.commands.pt_word_finder import calculate_words
+from ptwordfinder.commands.serve import (
+    answer,
+    load_files,
+    answer_pattern,
+    make_pattern_pool,
+    serve,
+    start_server,
+)
+
+FIRST = "banana bread, banana!\nTadeusz and Zosia\n"
+SECOND = "Tadeusz Tadeusz\nbandana\n"
+
+
+@pytest.fixture
+def loaded(tmpdir, monkeypatch):
+    """
+    Given a temporary directory,
+    Create two text files and load them into memory.
+
+    Returns:
+    list: The loaded files.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    first = tmpdir.join("first.txt")
+    first.write_text(FIRST, encoding="utf8")
+    second = tmpdir.join("second.txt")
+    second.write_text(SECOND, encoding="utf8")
+    return load_files([str(first), str(second)])
+
+
+@pytest.mark.parametrize(
+    "request_, options",
+    [
+        ({"single_word": "ban"}, ["-w", "ban"]),
+        ({"pattern": "b[a-z]+na"}, ["-p", "b[a-z]+na"]),
+        ({"pattern": "na.", "literal": True}, ["-p", "na.", "--literal"]),
+        (
+            {"pattern": r"!\s+T", "whole_buffer": True},
+            ["-p", r"!\s+T", "--whole-buffer"],
+        ),
+    ],
+)
+def test_answer_matches_calculate_words(loaded, request_, options):
+    """
+    Test answer function against calculate_words with the same query.
+
+    Verifies that:
+    - The output lines are those printed by calculate_words.
+    - The total is the sum of the counts of each file.
+    """
+    response = answer(loaded, request_)
+    searched = []
+    for file in loaded:
+        searched += ["-s", file.path]
+    result = CliRunner().invoke(calculate_words, options + searched)
+
+    assert result.exit_code == 0
+    assert response["output"] == result.output.splitlines()[:-1]
+    assert response["count"] == sum(f["count"] for f in response["files"])
+
+
+def test_answer_per_word(loaded):
+    """
+    Test answer function with an inline word list.
+
+    Verifies that:
+    - Every word is counted in every file.
+    - The total is kept without per_word.
+    """
+    response = answer(loaded, {"words": ["Tadeusz", "bread"], "per_word": 1})
+    assert response["counts"] == {"Tadeusz": 3, "bread": 1}
+    assert response["files"][1]["counts"] == {"Tadeusz": 2, "bread": 0}
+
+    total = answer(loaded, {"words": ["Tadeusz", "bread"]})
+    assert total["count"] == response["count"] == 4
+    assert "counts" not in total
+
+
+@pytest.mark.parametrize(
+    "request_, error",
+    [
+        (["Tadeusz"], ValueError),
+        ({}, ValueError),
+        ({"single_word": "a", "pattern": "a"}, ValueError),
+        ({"words": "Tadeusz"}, ValueError),
+        ({"words_input_file": "/etc/passwd", "per_word": True}, ValueError),
+        ({"pattern": "(a+)+$"}, ValueError),
+        ({"pattern": "b[a-z"}, re.error),
+    ],
+)
+def test_answer_invalid_queries(loaded, request_, error):
+    """
+    Test answer function with invalid queries.
+
+    Verifies that:
+    - The expected error is raised.
+    """
+    with pytest.raises(error):
+        answer(loaded, request_)
+
+
+def test_unix_socket_server(loaded, tmpdir):
+    """
+    Test the Unix socket server with several queries on one connection.
+
+    Verifies that:
+    - Every query gets a response line, errors included.
+    """
+    socket_path = str(tmpdir.join("ptwordf.sock"))
+
+    async def exchange():
+        server = await start_server(loaded, socket_path=socket_path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            responses = []
+            for query in ({"single_word": "Tadeusz"}, {"pattern": "(a+)+"}):
+                writer.write(json.dumps(query).encode("utf8") + b"\n")
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            return responses
+
+    counted, failed = asyncio.run(exchange())
+    assert counted["count"] == 3
+    assert "nests repetitions" in failed["error"]
+
+
+def test_http_server(loaded):
+    """
+    Test the HTTP server on localhost.
+
+    Verifies that:
+    - POST /query answers a query.
+    - GET /files lists the loaded files.
+    - Unknown paths get a 404 response.
+    """
+
+    async def request(port, head, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head.encode("latin-1") + body)
+        response = await reader.read()
+        writer.close()
+        status, _, payload = response.partition(b"\r\n\r\n")
+        return int(status.split()[1]), json.loads(payload)
+
+    async def exchange():
+        server = await start_server(loaded, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            body = json.dumps({"single_word": "ban"}).encode("utf8")
+            return (
+                await request(
+                    port,
+                    "POST /query HTTP/1.1\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n",
+                    body,
+                ),
+                await request(port, "GET /files HTTP/1.1\r\n\r\n"),
+                await request(port, "GET /nothing HTTP/1.1\r\n\r\n"),
+            )
+
+    query, files, missing = asyncio.run(exchange())
+    assert query[0] == 200
+    assert query[1]["count"] == 3
+    assert files == (200, {"files": [file.path for file in loaded]})
+    assert missing[0] == 404
+
+
+def test_serve_rejects_stdin(tmpdir):
+    """
+    Test the serve command with standard input as a searched file.
+
+    Verifies that:
+    - `-s -` is reported as an error with exit code 1, next to files too.
+    """
+    searched_file = tmpdir.join("text.txt")
+    searched_file.write_text(FIRST, encoding="utf8")
+    for searched in (["-s", "-"], ["-s", str(searched_file), "-s", "-"]):
+        result = CliRunner().invoke(serve, searched + ["--port", "0"])
+        assert result.exit_code == 1
+        assert "Error: serve cannot read standard input." in result.output
+
+
+def test_pattern_pool_timeout(tmpdir, monkeypatch):
+    """
+    Test the server with a pattern pool and a regex timeout.
+
+    Verifies that:
+    - A backtracking pattern gets a timeout error instead of hanging.
+    - A single word query sent meanwhile is answered at once.
+    - Pattern queries are still counted in the workers.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    searched_file = tmpdir.join("a.txt")
+    searched_file.write_text("a" * 40 + "\n", encoding="utf8")
+    files = load_files([str(searched_file)])
+    socket_path = str(tmpdir.join("ptwordf.sock"))
+    pool = make_pattern_pool(files, workers=2)
+
+    async def query(request):
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(json.dumps(request).encode("utf8") + b"\n")
+        response = json.loads(await reader.readline())
+        writer.close()
+        return response
+
+    async def exchange():
+        server = await start_server(
+            files, socket_path=socket_path, pattern_pool=pool, timeout=0.5
+        )
+        async with server:
+            runaway = [
+                asyncio.ensure_future(query({"pattern": "(a|a)*b"}))
+                for _ in range(4)
+            ]
+            await asyncio.sleep(0.1)
+            word = await asyncio.wait_for(query({"single_word": "a"}), 1)
+            return word, await asyncio.gather(*runaway)
+
+    try:
+        word, runaway = asyncio.run(exchange())
+        assert word["count"] == 40
+        assert all("longer than 0.5 seconds" in r["error"] for r in runaway)
+        future = pool.submit(answer_pattern, {"pattern": "a{2}"}, 1.0)
+        assert future.result()["count"] == 20
+    finally:
+        pool.shutdown()
@@ -0,0 +1,96 @@
+"""
+Test module for the startup cost of the `ptwordf` entry point.
+
+This module contains the following test cases:
+1. `test_main_defers_heavy_imports`: Verifies that importing
+   `ptwordfinder.main` imports no command module and none of the heavy
+   standard library modules the commands need.
+2. `test_main_import_budget`: Verifies that importing `ptwordfinder.main`
+   stays within the startup budget.
+3. `test_help_lists_lazy_commands`: Verifies that `ptwordf --help` lists
+   every subcommand.
+"""
+
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from ptwordfinder.main import cli
+
+# Generous budget of the cumulative import time of `ptwordfinder.main`,
+# in microseconds, about three times what it takes on a laptop
+IMPORT_BUDGET_US = 150_000
+
+DEFERRED_MODULES = {
+    "asyncio",
+    "bz2",
+    "concurrent.futures",
+    "cProfile",
+    "lzma",
+    "multiprocessing",
+    "ptwordfinder.commands.pt_word_finder",
+    "ptwordfinder.commands.serve",
+    "ptwordfinder.commands.word_index",
+}
+
+
+def import_times(code: str) -> dict:
+    """Run code in a fresh interpreter and return its import times.
+
+    Args:
+        code (str): The Python code to run.
+
+    Returns:
+        dict: Imported module -> cumulative import time in microseconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_main_defers_heavy_imports():
+    """
+    Test the modules imported by `ptwordfinder.main`.
+
+    Verifies that:
+    - No command module is imported.
+    - asyncio, multiprocessing and the compression codecs are not imported.
+    """
+    imported = set(import_times("import ptwordfinder.main"))
+    assert "ptwordfinder.main" in imported
+    assert imported.isdisjoint(DEFERRED_MODULES)
+
+
+def test_main_import_budget():
+    """
+    Test the import time of `ptwordfinder.main`.
+
+    Verifies that:
+    - The cumulative import time is below `IMPORT_BUDGET_US`.
+    """
+    times = import_times("import ptwordfinder.main")
+    assert times["ptwordfinder.main"] < IMPORT_BUDGET_US
+
+
+def test_help_lists_lazy_commands():
+    """
+    Test `ptwordf --help`.
+
+    Verifies that:
+    - Every subcommand is listed, the lazy ones included.
+    """
+    result = CliRunner().invoke(cli, ["--help"])
+    assert result.exit_code == 0
+    for command in ("calculate-words", "index", "serve"):
+        assert command in result.output
@@ -0,0 +1,95 @@
+"""
+Test module for the `ptwordfinder.commands.stats` module.
+
+This module contains the following test cases:
+1. `test_stats_inactive_by_default`: Verifies that no collector is active
+   outside of `Stats.activate`.
+2. `test_stats_phases_and_volumes`: Verifies that reading and tokenizing a
+   file are timed and counted while a collector is active.
+3. `test_stats_report`: Verifies that the match phase is what is left of
+   the counting time and that rates are computed.
+4. `test_timed_text_read`: Verifies that whole buffer reads are counted.
+"""
+
+import io
+
+from ptwordfinder.commands.pt_word_finder import count_each_word_in_file
+from ptwordfinder.commands.stats import Stats, TimedText, active_stats
+
+TEXT = "Tadeusz, Zosia\nżółw\n\nTadeusz\n"
+
+
+def test_stats_inactive_by_default():
+    """
+    Test active_stats function around Stats.activate.
+
+    Verifies that:
+    - The collector is only active within the `with` block.
+    """
+    stats = Stats()
+    assert active_stats() is None
+    with stats.activate():
+        assert active_stats() is stats
+    assert active_stats() is None
+
+
+def test_stats_phases_and_volumes(tmpdir, monkeypatch):
+    """
+    Test counting a word list while a collector is active.
+
+    Verifies that:
+    - Bytes, lines and tokens read are counted.
+    - The open, read and tokenize phases are timed.
+    - The result is unchanged.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    path = tmpdir.join("text.txt")
+    path.write_text(TEXT, encoding="utf8")
+    stats = Stats()
+
+    with stats.activate():
+        counts = count_each_word_in_file(["Tadeusz", "żółw"], str(path))
+
+    assert counts == {"Tadeusz": 2, "żółw": 1}
+    assert stats.bytes == len(TEXT.encode("utf8"))
+    assert stats.lines == 4
+    assert stats.tokens == 4
+    for phase in ("open", "read", "tokenize"):
+        assert stats.phases_ns[phase] > 0
+
+
+def test_stats_report():
+    """
+    Test Stats.report method.
+
+    Verifies that:
+    - The match phase is the counting time left after the other phases.
+    - Rates are per second of counting time.
+    """
+    stats = Stats()
+    stats.phases_ns.update(open=1, read=2, tokenize=3, output=4)
+    stats.bytes, stats.lines, stats.tokens = 100, 10, 20
+
+    report = stats.report(count_ns=10**9, total_ns=2 * 10**9)
+
+    assert report["phases"]["match"] == (10**9 - 6) / 1e9
+    assert report["phases"]["output"] == 4 / 1e9
+    assert report["total"] == 2.0
+    assert report["bytes_per_s"] == 100
+    assert report["lines_per_s"] == 10
+    assert report["tokens_per_s"] == 20
+
+
+def test_timed_text_read():
+    """
+    Test TimedText.read method.
+
+    Verifies that:
+    - The whole text is returned and counted.
+    """
+    stats = Stats()
+    with TimedText(io.StringIO(TEXT), stats) as file:
+        assert file.read() == TEXT
+    assert stats.bytes == len(TEXT.encode("utf8"))
+    assert stats.lines == 4
+    assert stats.phases_ns["read"] > 0
@@ -0,0 +1,80 @@
+"""
+Test module for the `ptwordfinder.commands.stream` module.
+
+This module contains the following test cases:
+1. `test_iter_line_chunks`: Verifies that small blocks give back every
+   line exactly once, long lines and line endings included.
+2. `test_count_in_stream`: Verifies that counting a stream in small blocks
+   gives the same result as counting the whole text, in all modes.
+3. `test_count_in_stream_empty`: Verifies that an empty stream counts like
+   an empty file.
+"""
+
+import io
+
+import pytest
+
+from ptwordfinder.commands.pt_word_finder import (
+    count_each_word_in_lines,
+    count_regex_in_lines,
+    count_word_in_lines,
+)
+from ptwordfinder.commands.stream import count_in_stream, iter_line_chunks
+
+TEXT = (
+    "Tadeusz, Tadeusz!\r\n"
+    + "banana " * 40
+    + "\nZosia\n\nżółw Tadeusz\nno newline at the end"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_iter_line_chunks(chunk_size):
+    """
+    Test iter_line_chunks function with several block sizes.
+
+    Verifies that:
+    - The lines are those of the text read in text mode.
+    - No block is empty.
+    """
+    stream = io.BytesIO(TEXT.encode("utf8"))
+    chunks = list(iter_line_chunks(stream, chunk_size))
+    expected = list(io.TextIOWrapper(io.BytesIO(TEXT.encode("utf8"))))
+
+    assert [line for chunk in chunks for line in chunk] == expected
+    assert all(chunks)
+
+
+@pytest.mark.parametrize(
+    "lines_function, query",
+    [
+        (count_word_in_lines, "Tadeusz"),
+        (count_word_in_lines, "ana"),
+        (count_each_word_in_lines, ["Tadeusz", "banana", "żółw"]),
+        (count_regex_in_lines, r"b[a-z]+a\b"),
+    ],
+)
+def test_count_in_stream(lines_function, query):
+    """
+    Test count_in_stream function with every kind of query.
+
+    Verifies that:
+    - The result equals counting the whole text at once.
+    """
+    expected = lines_function(query, io.StringIO(TEXT, newline=None))
+    stream = io.BytesIO(TEXT.encode("utf8"))
+
+    assert count_in_stream(lines_function, query, stream, 16) == expected
+
+
+def test_count_in_stream_empty():
+    """
+    Test count_in_stream function with an empty stream.
+
+    Verifies that:
+    - Counts are zero, for every word of a word list too.
+    """
+    assert count_in_stream(count_word_in_lines, "a", io.BytesIO()) == 0
+    assert count_in_stream(
+        count_each_word_in_lines, ["a", "b"], io.BytesIO()
+    ) == {"a": 0, "b": 0}
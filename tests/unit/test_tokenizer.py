@@ -0,0 +1,119 @@
+"""
+Test module for the `ptwordfinder.commands.tokenizer` module.
+
+This module contains the following test cases:
+1. `test_non_blank_lines_matches_reference_on_corpus`: Verifies that
+   `non_blank_lines` yields token-for-token the same lines as the previous
+   per-character implementation on the bundled Pan Tadeusz text.
+2. `test_tokenize_text_matches_reference`: Verifies the same equality on
+   lines with punctuation only tokens, underscores, digits and Unicode
+   whitespace.
+3. `test_tokenize_text_whole_buffer`: Verifies that tokenizing a whole
+   buffer gives the tokens of all its lines.
+4. `test_tokenize_lines_matches_non_blank_lines`: Verifies that batched
+   tokenization yields the tokens of `non_blank_lines` in order.
+"""
+
+import os
+import re
+
+import pytest
+
+from ptwordfinder.commands import tokenizer
+from ptwordfinder.commands.tokenizer import (
+    non_blank_lines,
+    tokenize_lines,
+    tokenize_text,
+)
+
+CORPUS = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "pan-tadeusz-czyli-ostatni-zajazd-na-litwie.txt",
+)
+
+
+def reference_non_blank_lines(text_file):
+    """The per-character implementation `non_blank_lines` replaced."""
+    for line in text_file:
+        line = line.strip()
+        if line:
+            text = re.split(r"\s+", line)
+            stripped_line = []
+            for item in text:
+                stripped = "".join(ch for ch in item if ch.isalnum())
+                stripped_line.append(stripped)
+            yield stripped_line
+
+
+def test_non_blank_lines_matches_reference_on_corpus():
+    """
+    Test non_blank_lines function on the bundled text.
+
+    Verifies that:
+    - Every yielded line equals the one of the reference implementation.
+    """
+    with open(CORPUS, encoding="utf-8") as file:
+        lines = file.readlines()
+
+    result = list(non_blank_lines(lines))
+    expected = list(reference_non_blank_lines(lines))
+
+    assert len(result) == len(expected)
+    for tokens, expected_tokens in zip(result, expected):
+        assert tokens == expected_tokens
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "Litwo! Ojczyzno moja! ty jesteś jak zdrowie;\n",
+        "— Tak — rzekł — ... a to!\n",
+        "-- -- --",
+        "snake_case __init__ _ a_1 ½ 2³ x²\n",
+        "a b c\x1cd\te\r\n",
+        "  ,leading and trailing,  ",
+        "é ́ 漢字!日本語",
+    ],
+)
+def test_tokenize_text_matches_reference(line):
+    """
+    Test tokenize_text function with tricky lines.
+
+    Verifies that:
+    - The tokens equal those of the reference implementation.
+    """
+    expected = list(reference_non_blank_lines([line]))
+    assert list(non_blank_lines([line])) == expected
+    assert [tokenize_text(line)] == expected
+
+
+def test_tokenize_text_whole_buffer():
+    """
+    Test tokenize_text function with a buffer of several lines.
+
+    Verifies that:
+    - The tokens are those of every line, in order.
+    """
+    buffer = "Pan Tadeusz —\n\n— i Zosia.\n"
+
+    assert tokenize_text(buffer) == ["Pan", "Tadeusz", "", "", "i", "Zosia"]
+
+
+def test_tokenize_lines_matches_non_blank_lines(monkeypatch):
+    """
+    Test tokenize_lines function on the bundled text, in small batches.
+
+    Verifies that:
+    - The concatenated batches equal the tokens of non_blank_lines,
+      even for lines without a trailing newline.
+    """
+    monkeypatch.setattr(tokenizer, "BATCH_LINES", 7)
+    with open(CORPUS, encoding="utf-8") as file:
+        lines = [line.rstrip("\n") for line in file]
+
+    batches = [token for batch in tokenize_lines(lines) for token in batch]
+    tokens = [token for line in non_blank_lines(lines) for token in line]
+
+    assert batches == tokens
@@ -0,0 +1,57 @@
+"""
+Test module for the `ptwordfinder.commands.vocabulary` module.
+
+This module contains the following test cases:
+1. `test_vocabulary_update`: Verifies that every token is interned once
+   and counted in the array, in the order tokens first appear.
+2. `test_vocabulary_update_known`: Verifies that only known tokens are
+   counted, whether the batch or the vocabulary is the smaller one.
+"""
+
+from array import array
+
+from ptwordfinder.commands.vocabulary import Vocabulary
+
+
+def test_vocabulary_update():
+    """
+    Test Vocabulary.update method.
+
+    Verifies that:
+    - Ids follow the order tokens first appear.
+    - Counts accumulate over batches in an unsigned 64-bit array.
+    - Equal tokens share a single string object.
+    """
+    vocabulary = Vocabulary()
+    vocabulary.update(["Tadeusz", "Zosia", "Tadeusz"])
+    vocabulary.update("".join(["Tade", "usz"]) for _ in range(2))
+
+    assert vocabulary.tokens == ["Tadeusz", "Zosia"]
+    assert vocabulary.counts == array("Q", [4, 1])
+    assert vocabulary.counts.typecode == "Q"
+    assert vocabulary.as_dict() == {"Tadeusz": 4, "Zosia": 1}
+    assert vocabulary.count("Zosia") == 1
+    assert vocabulary.count("Hrabia") == 0
+    assert "Zosia" in vocabulary and len(vocabulary) == 2
+    token = "".join(["Tade", "usz"])
+    assert vocabulary.tokens[vocabulary.add(token)] is vocabulary.tokens[0]
+
+
+def test_vocabulary_update_known():
+    """
+    Test Vocabulary.update_known method.
+
+    Verifies that:
+    - Unknown tokens are neither added nor counted.
+    - Duplicate words of the initial tokens are added once.
+    - Both ways of folding a batch give the same counts.
+    """
+    few = Vocabulary(["Tadeusz", "Zosia", "Tadeusz"])
+    few.update_known(["Tadeusz", "i", "Zosia", "i", "w", "Tadeusz"])
+    assert few.as_dict() == {"Tadeusz": 2, "Zosia": 1}
+
+    many = Vocabulary(["Tadeusz", "Zosia", "i", "w", "Hrabia", "Sędzia"])
+    many.update_known(["Tadeusz", "Zosia", "Tadeusz", "Telimena"])
+    assert len(many) == 6
+    assert many.count("Tadeusz") == 2
+    assert many.count("Telimena") == 0
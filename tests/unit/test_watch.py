@@ -0,0 +1,127 @@
+"""
+Test module for the `ptwordfinder.commands.watch` module.
+
+This module contains the following test cases:
+1. `test_inotify_watcher`: Verifies that inotify reports appends to a
+   watched file and its replacement, but not other files.
+2. `test_polling_watcher`: Verifies that polling reports appends and that
+   the timeout expires without changes.
+3. `test_follow_counts`: Verifies that changed files are counted again
+   incrementally and only changed counts are yielded.
+"""
+
+from functools import partial
+
+import os
+import sys
+
+import pytest
+
+from ptwordfinder.commands.incremental import count_incrementally
+from ptwordfinder.commands.pt_word_finder import count_word_in_lines
+from ptwordfinder.commands.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    Watcher,
+    follow_counts,
+)
+
+
+class ScriptedWatcher(Watcher):
+    """Watcher returning the given changes, one set per call."""
+
+    def __init__(self, paths, script):
+        super().__init__(paths)
+        self.script = iter(script)
+
+    def changes(self, timeout=None):
+        return next(self.script)
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="inotify is Linux only")
+def test_inotify_watcher(tmpdir):
+    """
+    Test InotifyWatcher class.
+
+    Verifies that:
+    - Nothing is reported before a change.
+    - An append to a watched file is reported with the path as given.
+    - A file moved in place of a watched file is reported.
+    - Changes to other files of the directory are ignored.
+    """
+    searched_file = tmpdir.join("app.log")
+    searched_file.write_text("Tadeusz\n", encoding="utf8")
+    path = str(searched_file)
+
+    with InotifyWatcher([path]) as watcher:
+        assert watcher.changes(0) == set()
+        with open(path, "a", encoding="utf8") as file:
+            file.write("Zosia\n")
+        assert watcher.changes(1) == {path}
+
+        tmpdir.join("other.log").write_text("Zosia\n", encoding="utf8")
+        assert watcher.changes(0.1) == set()
+
+        rotated = tmpdir.join("app.log.new")
+        rotated.write_text("Hrabia\n", encoding="utf8")
+        os.replace(rotated, path)
+        assert watcher.changes(1) == {path}
+
+
+def test_polling_watcher(tmpdir):
+    """
+    Test PollingWatcher class.
+
+    Verifies that:
+    - The timeout expires when nothing changes.
+    - An append is reported.
+    - A deleted file is reported.
+    """
+    searched_file = tmpdir.join("app.log")
+    searched_file.write_text("Tadeusz\n", encoding="utf8")
+    path = str(searched_file)
+
+    with PollingWatcher([path], interval=0.01) as watcher:
+        assert watcher.changes(0.05) == set()
+        with open(path, "a", encoding="utf8") as file:
+            file.write("Zosia\n")
+        assert watcher.changes(1) == {path}
+        os.remove(path)
+        assert watcher.changes(1) == {path}
+
+
+def test_follow_counts(tmpdir, monkeypatch):
+    """
+    Test follow_counts function.
+
+    Verifies that:
+    - Files are counted again when the generator starts.
+    - Only files whose count changed are yielded.
+    - A missing file is skipped until it is created again.
+    """
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", str(tmpdir.join("cache")))
+    first = tmpdir.join("first.log")
+    second = tmpdir.join("second.log")
+    first.write_text("Tadeusz\n", encoding="utf8")
+    second.write_text("Zosia\n", encoding="utf8")
+    paths = [str(first), str(second)]
+    count_function = partial(count_incrementally, count_word_in_lines)
+    results = {path: count_function("Tadeusz", path) for path in paths}
+
+    with open(first, "a", encoding="utf8") as file:
+        file.write("Tadeusz\n")
+    watcher = ScriptedWatcher(paths, [set(paths), {str(second)}])
+    updates = follow_counts(count_function, "Tadeusz", results, watcher)
+
+    searched_file, result, duration_ns = next(updates)
+    assert (searched_file, result) == (str(first), 2)
+    assert duration_ns >= 0
+
+    os.remove(second)
+    with open(first, "a", encoding="utf8") as file:
+        file.write("Tadeusz\n")
+    assert next(updates)[:2] == (str(first), 3)
+
+    second.write_text("Tadeusz\n", encoding="utf8")
+    assert next(updates)[:2] == (str(second), 1)
+    assert results == {str(first): 3, str(second): 1}
@@ -0,0 +1,186 @@
+"""
+Test module for the `ptwordfinder.commands.word_index` module.
+
+This module contains the following test cases:
+1. `cache` fixture: Points the index cache to a temporary directory.
+2. `test_file` fixture: Creates a temporary file with mock content.
+3. `test_index_counts_match_scan`: Verifies that counts answered from the
+   index equal the counts of a full scan of the file.
+4. `test_index_positions`: Verifies that term positions are stored and
+   lazily loaded back from disk.
+5. `test_stale_index_is_ignored`: Verifies that an index is not used after
+   the searched file changes.
+6. `test_touched_file_keeps_index`: Verifies that an index stays fresh when
+   only the modification time changes.
+7. `test_substring_with_whitespace_not_answered`: Verifies that the index
+   refuses needles it cannot answer.
+8. `test_index_build_command`: Verifies the `index build` CLI command.
+"""
+
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from ptwordfinder.commands import pt_word_finder
+from ptwordfinder.commands.word_index import (
+    build_index,
+    index,
+    load_fresh_index,
+    save_index,
+)
+
+mock_file_content = """
+This is a sample file.
+It contains words that we will search for.
+Sample file has words to count, file-by-file.
+"""
+
+
+@pytest.fixture
+def cache(tmpdir, monkeypatch):
+    """
+    Given a temporary directory,
+    Use it as the index cache directory.
+
+    Returns:
+    str: Path of the cache directory.
+    """
+    cache_path = str(tmpdir.mkdir("cache"))
+    monkeypatch.setenv("PTWORDFINDER_CACHE_DIR", cache_path)
+    return cache_path
+
+
+@pytest.fixture
+def test_file(tmpdir):
+    """
+    Given a temporary directory,
+    Create a temporary file with some content for testing.
+
+    Returns:
+    str: Path of the temporary file.
+    """
+    test_file_path = tmpdir.join("test-file.txt")
+    with open(test_file_path, "w", encoding="utf8") as f:
+        f.write(mock_file_content)
+    return str(test_file_path)
+
+
+def test_index_counts_match_scan(cache, test_file):
+    """
+    When an index is built for a file,
+
+    Verifies that:
+    - Substring, pattern and term counts equal those of a full scan.
+    - The counting functions answer from the index.
+    """
+    # Given
+    expected_word = pt_word_finder.count_word_in_file("file", test_file)
+    expected_pattern = pt_word_finder.count_pattern_in_file("e-b", test_file)
+    expected_terms = pt_word_finder.count_multiple_words_in_file(
+        {"file", "words"}, test_file
+    )
+
+    # When
+    save_index(build_index(test_file))
+
+    # Then
+    assert load_fresh_index(test_file) is not None
+    assert pt_word_finder.count_word_in_file("file", test_file) == (
+        expected_word
+    )
+    assert pt_word_finder.count_pattern_in_file("e-b", test_file) == (
+        expected_pattern
+    )
+    assert pt_word_finder.count_multiple_words_in_file(
+        {"file", "words"}, test_file
+    ) == expected_terms
+
+
+def test_index_positions(cache, test_file):
+    """
+    When positions of a term are requested from a loaded index,
+
+    Verifies that:
+    - They are read from disk and match the token stream.
+    """
+    # Given
+    save_index(build_index(test_file))
+
+    # When
+    loaded = load_fresh_index(test_file)
+
+    # Then
+    assert loaded.positions is None
+    assert loaded.term_positions("This") == [0]
+    assert loaded.term_positions("file") == [4, 14]
+    assert loaded.term_positions("missing") == []
+
+
+def test_stale_index_is_ignored(cache, test_file):
+    """
+    When the searched file changes after indexing,
+
+    Verifies that:
+    - The index is no longer used and counts reflect the new content.
+    """
+    # Given
+    save_index(build_index(test_file))
+
+    # When
+    with open(test_file, "a", encoding="utf8") as f:
+        f.write("file\n")
+
+    # Then
+    assert load_fresh_index(test_file) is None
+    assert pt_word_finder.count_word_in_file("file", test_file) == 5
+
+
+def test_touched_file_keeps_index(cache, test_file):
+    """
+    When only the modification time of the file changes,
+
+    Verifies that:
+    - The content hash keeps the index fresh.
+    """
+    # Given
+    save_index(build_index(test_file))
+    stat = os.stat(test_file)
+
+    # When
+    os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    # Then
+    assert load_fresh_index(test_file) is not None
+
+
+def test_substring_with_whitespace_not_answered(cache, test_file):
+    """
+    When the needle is empty or contains whitespace,
+
+    Verifies that:
+    - The index does not answer and the scan result is returned.
+    """
+    # Given
+    word_index = build_index(test_file)
+    save_index(word_index)
+
+    # Then
+    assert word_index.count_substring("sample file") is None
+    assert word_index.count_substring("") is None
+    assert pt_word_finder.count_word_in_file("sample file", test_file) == 1
+
+
+def test_index_build_command(cache, test_file):
+    """
+    When the `index build` command is invoked,
+
+    Verifies that:
+    - It succeeds and reports the indexed file.
+    - The written index is fresh.
+    """
+    runner = CliRunner()
+    result = runner.invoke(index, ["build", "--searched-file", test_file])
+    assert result.exit_code == 0
+    assert f"from '{test_file}'" in result.output
+    assert load_fresh_index(test_file) is not None